@@ -27,10 +27,16 @@ SETTINGS_DFLTS = {
     "name-expenses": "Expenses",
     "print-stream": "stdout",
     "extension": "beancount",
+    "lock-timeout": "10",
+    "holidays": "",
+    "exp-rules": "",
 }
 _comments = {
     "print-stream": "from ('stdout', 'stderr')",
     "extension": "Default extension for beancount files",
+    "lock-timeout": "Seconds to wait to acquire a file lock",
+    "holidays": "Path to file of holiday dates, one per line",
+    "exp-rules": "Rules to administer expired txns, e.g. remove,days=30;roll",
 }
 _lines = [
     f"{k} = {v}" + (("  # " + _comments[k]) if k in _comments else "")
@@ -123,6 +129,9 @@ class Settings:
     name_expenses: str
     print_stream: PrintStream
     extension: str
+    lock_timeout: float = 10.0
+    holidays: str = ""
+    exp_rules: str = ""
 
     @property
     def print_to(self):
@@ -130,6 +139,19 @@ class Settings:
         return sys.stdout if self.print_stream is PrintStream.STDOUT else sys.stderr
 
 
+def _parse_lock_timeout(value: str) -> float:
+    """Parse value of the 'lock-timeout' option."""
+    try:
+        timeout = float(value)
+    except ValueError:
+        timeout = -1.0
+    if timeout < 0:
+        key = "lock-timeout"
+        warnings.warn(ConfigInvalidValueWarning(key, value, SETTINGS_DFLTS[key]))  # noqa: B028
+        timeout = float(SETTINGS_DFLTS[key])
+    return timeout
+
+
 def parse_config(config: configparser.SectionProxy) -> Settings:
     """Verify configuration settings."""
     invalid_keys = set(config) - set(SETTINGS_DFLTS)
@@ -153,6 +175,8 @@ def parse_config(config: configparser.SectionProxy) -> Settings:
             v = PrintStream(v)  # noqa: PLW2901
         if k == "extension" and not v.startswith("."):
             v = "." + v  # noqa: PLW2901
+        if k == "lock-timeout":
+            v = _parse_lock_timeout(v)  # noqa: PLW2901
         settings[k.replace("-", "_")] = v
     return Settings(**settings)
 
@@ -179,22 +203,97 @@ def get_settings_from_config() -> Settings:
     return parse_config(load_config())
 
 
+def _get_config_file_state() -> tuple[int, int] | None:
+    """Get state of configuration file as (mtime, size), None if no file."""
+    try:
+        stat = CONFIG_FILE.stat()
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
 SETTINGS: Settings = get_settings_from_config()
+# State of the configuration file when SETTINGS were last read from it.
+_config_file_state = _get_config_file_state()
+
+# Incremented whenever settings are changed via this module. Allows other
+# modules to invalidate any cache evaluated from the settings.
+SETTINGS_VERSION = 0
+
+ACCOUNT_ROOT_NAME_KEYS = tuple(BC_DEFAULT_ACCOUNT_ROOT_NAMES)
+
+_root_names_cache: tuple[int, Settings, dict[str, str]] | None = None
+
+
+def _settings_changed():
+    """Register that settings have been changed."""
+    global SETTINGS_VERSION  # noqa: PLW0603
+    SETTINGS_VERSION += 1
+
+
+def get_settings_state() -> tuple[int, Settings]:
+    """Get state of settings.
+
+    Returns
+    -------
+    2-tuple
+        [0] Settings version. Incremented whenever settings are changed via
+        `reset_settings` or `set_account_root_names`.
+        [1] Current settings instance.
+
+    Any cache evaluated from the settings should be invalidated whenever
+    the state changes (the settings instance is compared to account for
+    any direct replacement of `SETTINGS`).
+    """
+    return SETTINGS_VERSION, SETTINGS
 
 
 def reset_settings():
     """Set settings according to configuration file."""
-    global SETTINGS  # noqa: PLW0603
+    global SETTINGS, _config_file_state  # noqa: PLW0603
     SETTINGS = get_settings_from_config()
+    _config_file_state = _get_config_file_state()
+    _settings_changed()
+
+
+def refresh_settings() -> bool:
+    """Reset settings if the configuration file has changed since last read.
+
+    Settings are otherwise read from the configuration file only on import.
+    A long-running process should call this function before each operation
+    so that settings reflect the current configuration file. NB any
+    settings set via `set_account_root_names` are lost if the settings are
+    reset.
+
+    Returns
+    -------
+    bool
+        True if settings were reset, False if the configuration file has
+        not changed.
+    """
+    if _get_config_file_state() == _config_file_state:
+        return False
+    reset_settings()
+    return True
+
+
+def _get_account_root_names() -> dict[str, str]:
+    """Get cached account root names.
+
+    Returned dictionary should not be modified.
+    """
+    global _root_names_cache  # noqa: PLW0603
+    version, settings = get_settings_state()
+    cache = _root_names_cache
+    if cache is None or cache[0] != version or cache[1] is not settings:
+        names = {k: getattr(settings, k) for k in ACCOUNT_ROOT_NAME_KEYS}
+        cache = _root_names_cache = (version, settings, names)
+    return cache[2]
 
 
 def get_account_root_names() -> dict[str, str]:
     """Get account root names."""
-    return {
-        k.replace("-", "_"): getattr(SETTINGS, k.replace("-", "_"))
-        for k in SETTINGS_DFLTS
-        if k.startswith("name")
-    }
+    return _get_account_root_names().copy()
 
 
 def set_account_root_names(names: dict):
@@ -224,3 +323,4 @@ def set_account_root_names(names: dict):
         )
     for k, v in names.items():
         setattr(SETTINGS, k, v)
+    _settings_changed()
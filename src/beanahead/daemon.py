@@ -0,0 +1,287 @@
+"""Serve beanahead operations from a long-running process.
+
+A daemon listens on a local Unix socket and administers requests to add
+regular expected transactions, reconcile new transactions, administer
+expired transactions and inject new transactions. As the process persists
+between requests, imports and caches remain warm, including loaded ledgers
+(see `utils.enable_load_cache`), compiled frequencies and account root
+names.
+
+Before each request the date is refreshed (see `utils.refresh_today`) and
+settings are reread if the configuration file has changed (see
+`config.refresh_settings`).
+
+Protocol
+--------
+Requests and responses are JSON objects, one per line. A connection can
+carry any number of requests, each of which receives a response.
+
+Request keys:
+    cmd : str
+        Operation, one of "addrx", "recon", "exp", "inject", "ping" or
+        "shutdown".
+
+    args : dict, optional
+        Keyword arguments of the function underlying the operation (see
+        `OPERATIONS`). Paths relative to `cwd`.
+
+    cwd : str, optional
+        Working directory against which to evaluate relative paths. By
+        default, the working directory of the daemon.
+
+    main : str, optional
+        Path to a main ledger that defines the account root names to be
+        used when administering the request. Relative to `cwd`. For
+        "addrx" requests defaults to the 'main' argument. By default,
+        account root names are as set on the daemon. Account root names
+        set for a request are reverted once the request is administered.
+
+    input : list of str, optional
+        Responses to any request for user input, in the order requested
+        (as `utils.scripted_input`). If input is requested when no
+        response remains then the request fails.
+
+Response keys:
+    ok : bool
+        True if the request was administered without error.
+
+    output : str
+        Output printed whilst administering the request.
+
+    result
+        Value returned by the function underlying the operation.
+
+    error : str | None
+        Description of any error, None if `ok`.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import io
+import json
+import os
+import socket
+import socketserver
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+from . import config, expired, reconcile, rx_txns, utils
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterator
+
+SOCKET_PATH_DFLT = config.CONFIG_DIR / "beanahead.sock"
+
+
+def add_rx_txns(defs: str, ledger: str, main: str, end: str | None = None) -> int:
+    """Add Regular Expected Transactions, as `rx_txns.Admin.add_txns`."""
+    return rx_txns.Admin(defs, ledger, main).add_txns(end)
+
+
+OPERATIONS: dict[str, Callable[..., Any]] = {
+    "addrx": add_rx_txns,
+    "recon": reconcile.reconcile_new_txns,
+    "exp": expired.admin_expired_txns,
+    "inject": utils.inject_txns,
+}
+
+
+@contextlib.contextmanager
+def _working_dir(path: str | None) -> Iterator[None]:
+    """Context manager to change the working directory, if `path` passed."""
+    if path is None:
+        yield
+        return
+    prev = Path.cwd()
+    os.chdir(path)
+    try:
+        yield
+    finally:
+        os.chdir(prev)
+
+
+@contextlib.contextmanager
+def _account_root_names(main: str | None) -> Iterator[None]:
+    """Context manager to set account root names as defined on `main`.
+
+    Prior account root names are restored on exit. Account root names are
+    left unchanged if `main` is None.
+    """
+    if main is None:
+        yield
+        return
+    prev = config.get_account_root_names()
+    try:
+        utils.set_account_root_names(main)
+        yield
+    finally:
+        config.set_account_root_names(prev)
+
+
+def handle_request(request: dict) -> dict:
+    """Administer a request.
+
+    Parameters
+    ----------
+    request
+        Request, see module docstring.
+
+    Returns
+    -------
+    dict
+        Response, see module docstring.
+    """
+    cmd = request.get("cmd")
+    if cmd in ("ping", "shutdown"):
+        return {"ok": True, "output": "", "result": None, "error": None}
+    if cmd not in OPERATIONS:
+        msg = f"'{cmd}' is not a valid cmd. Valid cmds: {list(OPERATIONS)}."
+        return {"ok": False, "output": "", "result": None, "error": msg}
+
+    buffer = io.StringIO()
+    result, error = None, None
+    try:
+        utils.refresh_today()
+        config.refresh_settings()
+        args = request.get("args", {})
+        if not isinstance(args, dict):
+            raise TypeError("args must be a JSON object.")  # noqa: TRY301
+        main = request.get("main")
+        if main is None and cmd == "addrx":
+            main = args.get("main")
+        with (
+            contextlib.redirect_stdout(buffer),
+            contextlib.redirect_stderr(buffer),
+            _working_dir(request.get("cwd")),
+            _account_root_names(main),
+            utils.scripted_input(request.get("input", [])),
+        ):
+            result = OPERATIONS[cmd](**args)
+    except Exception as err:  # noqa: BLE001
+        error = f"{type(err).__name__}: {err}"
+    return {
+        "ok": error is None,
+        "output": buffer.getvalue(),
+        "result": result,
+        "error": error,
+    }
+
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+    """Handle a connection, responding to each request received."""
+
+    server: Server
+
+    def handle(self):
+        for line in self.rfile:
+            if not line.strip():
+                continue
+            try:
+                request = json.loads(line)
+                if not isinstance(request, dict):
+                    raise TypeError("request must be a JSON object.")  # noqa: TRY301
+            except (ValueError, TypeError) as err:
+                msg = f"Invalid request: {err}"
+                response = {"ok": False, "output": "", "result": None, "error": msg}
+            else:
+                response = handle_request(request)
+            content = json.dumps(response, default=str) + "\n"
+            self.wfile.write(content.encode(config.ENCODING))
+            self.wfile.flush()
+            if response["ok"] and request.get("cmd") == "shutdown":
+                self.server.stopping = True
+                return
+
+
+class Server(socketserver.UnixStreamServer):
+    """Server to administer requests received on a Unix socket.
+
+    Requests are administered sequentially, one at a time.
+
+    Parameters
+    ----------
+    path
+        Path to socket. Any stale socket at the path is replaced.
+
+    Raises
+    ------
+    OSError
+        If Unix sockets are not supported on the platform or another
+        daemon is already listening on `path`.
+    """
+
+    def __init__(self, path: Path = SOCKET_PATH_DFLT):
+        if not hasattr(socket, "AF_UNIX"):
+            raise OSError("Unix sockets are not supported on this platform.")
+        self.path = Path(path)
+        self.stopping = False
+        if self.path.exists():
+            if is_serving(self.path):
+                msg = f"A daemon is already listening on '{self.path}'."
+                raise OSError(msg)
+            self.path.unlink()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        super().__init__(str(self.path), _RequestHandler)
+        self.path.chmod(0o600)
+
+    def serve(self):
+        """Serve requests until a 'shutdown' request is received."""
+        utils.enable_load_cache()
+        try:
+            while not self.stopping:
+                self.handle_request()
+        finally:
+            utils.enable_load_cache(False)  # noqa: FBT003
+            self.server_close()
+            self.path.unlink(missing_ok=True)
+
+
+def is_serving(path: Path = SOCKET_PATH_DFLT) -> bool:
+    """Query if a daemon is listening on a socket."""
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        try:
+            sock.connect(str(path))
+        except OSError:
+            return False
+    return True
+
+
+def serve(path: Path = SOCKET_PATH_DFLT):
+    """Serve requests on a Unix socket until a 'shutdown' request is received.
+
+    Parameters
+    ----------
+    path
+        Path to socket.
+    """
+    server = Server(path)
+    utils.print_it(f"beanahead daemon listening on '{server.path}'.")
+    server.serve()
+
+
+def send_request(request: dict, path: Path = SOCKET_PATH_DFLT) -> dict:
+    """Send a request to a daemon.
+
+    Parameters
+    ----------
+    request
+        Request, see module docstring. If request does not define 'cwd'
+        then will be defined as the current working directory.
+
+    path
+        Path to the socket on which the daemon is listening.
+
+    Returns
+    -------
+    dict
+        Response, see module docstring.
+    """
+    request = {"cwd": str(Path.cwd()), **request}
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.connect(str(path))
+        with sock.makefile("rwb") as file:
+            file.write((json.dumps(request) + "\n").encode(config.ENCODING))
+            file.flush()
+            line = file.readline()
+    return json.loads(line)
@@ -39,6 +39,33 @@ class BeanaheadLedgerFileExistsError(FileExistsError):
         return self._msg
 
 
+class BeanaheadLockTimeoutError(TimeoutError):
+    """A lock on a file could not be acquired within the timeout."""
+
+    def __init__(self, path: Path, timeout: float):
+        self._msg = (
+            f"Unable to acquire a lock on '{path}' within {timeout} seconds. The"
+            " file is locked by another beanahead process. The timeout can be"
+            " set with the 'lock-timeout' option of the configuration file."
+        )
+
+    def __str__(self) -> str:
+        return self._msg
+
+
+class BeanaheadInputError(Exception):
+    """User input was requested although no further input is available."""
+
+    def __init__(self, text: str):
+        self._msg = (
+            "Input was requested although no further input is available. The"
+            f" request was:\n{text}"
+        )
+
+    def __str__(self) -> str:
+        return self._msg
+
+
 class BeancountLoaderErrors(Exception):  # noqa: N818
     """Errors returned when loading ledger file."""
 
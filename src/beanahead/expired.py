@@ -3,11 +3,14 @@
 from __future__ import annotations
 
 import datetime
+import enum
 import re
+from collections import Counter
+from dataclasses import dataclass
 from datetime import timedelta
 from typing import TYPE_CHECKING
 
-from . import utils
+from . import config, locks, profiling, utils
 from .errors import BeanaheadWriteError
 
 if TYPE_CHECKING:
@@ -18,6 +21,15 @@ if TYPE_CHECKING:
 TODAY = utils.TODAY
 TOMORROW = TODAY + timedelta(1)
 
+
+@utils.on_today_change
+def _set_today(today: datetime.date):
+    """Reevaluate `TODAY` and `TOMORROW`."""
+    global TODAY, TOMORROW  # noqa: PLW0603
+    TODAY = today
+    TOMORROW = today + timedelta(1)
+
+
 DATE_FORMATS = "(YYYY-MM-DD or MM-DD or DD)"
 VALID_DATE_FORMAT_REGEXES = [
     re.compile(r"^\d{4}-\d{1,2}-\d{1,2}$"),
@@ -161,7 +173,188 @@ def _update_txn(txn: Transaction, path: Path) -> Transaction | None:
     return txn._replace(date=date)
 
 
-def overwrite_ledgers(contents: dict[Path, str]):
+class Action(enum.Enum):
+    """Action to take on an expired transaction."""
+
+    ROLL = "roll"  # move forwards to tomorrow
+    REMOVE = "remove"
+    LEAVE = "leave"
+
+
+@dataclass(frozen=True)
+class Rule:
+    """Rule defining the action to take on matching expired transactions.
+
+    Rules are defined from strings (see `from_string`).
+
+    Attributes
+    ----------
+    action
+        Action to take on a matching expired transaction.
+
+    days
+        Only match transactions dated at least this number of days before
+        today. None to not filter by age.
+
+    tag
+        Only match transactions with this tag. None to not filter by tag.
+
+    account
+        Only match transactions with a posting to this account or any
+        subaccount. None to not filter by account.
+    """
+
+    action: Action
+    days: int | None = None
+    tag: str | None = None
+    account: str | None = None
+
+    @classmethod
+    def from_string(cls, string: str) -> Rule:
+        """Create a rule from a string.
+
+        Parameters
+        ----------
+        string
+            Action followed by any number of comma separated key=value
+            filters. Action from 'roll', 'remove' and 'leave'. Filters
+            from 'days', 'tag' and 'account'. For example,
+            "remove,days=30,tag=trip".
+
+        Raises
+        ------
+        ValueError
+            If `string` does not define a valid rule.
+
+        Examples
+        --------
+        >>> Rule.from_string("remove,days=30,tag=trip")
+        Rule(action=<Action.REMOVE: 'remove'>, days=30, tag='trip', account=None)
+        >>> str(Rule.from_string(" leave , account=Assets:US "))
+        'leave,account=Assets:US'
+        """
+        action, *filters = (part.strip() for part in string.split(","))
+        valid_actions = [a.value for a in Action]
+        if action.lower() not in valid_actions:
+            msg = (
+                f"'{action}' is not a valid action of the rule '{string}'. Valid"
+                f" actions are {valid_actions}."
+            )
+            raise ValueError(msg)
+        kwargs: dict[str, int | str] = {}
+        for filter_ in filters:
+            key, sep, value = (s.strip() for s in filter_.partition("="))
+            if not sep or not value or key not in RULE_FILTERS:
+                msg = (
+                    f"'{filter_}' is not a valid filter of the rule '{string}'."
+                    f" Filters should be defined as key=value with key from"
+                    f" {list(RULE_FILTERS)}."
+                )
+                raise ValueError(msg)
+            if key == "days":
+                if not value.isdigit():
+                    msg = f"'days' must be a non-negative integer, not '{value}'."
+                    raise ValueError(msg)
+                kwargs[key] = int(value)
+            else:
+                kwargs[key] = value
+        return cls(Action(action.lower()), **kwargs)
+
+    def __str__(self) -> str:
+        parts = [self.action.value]
+        parts += [
+            f"{key}={value}"
+            for key in RULE_FILTERS
+            if (value := getattr(self, key)) is not None
+        ]
+        return ",".join(parts)
+
+    def matches(self, txn: Transaction) -> bool:
+        """Query if rule matches an expired transaction."""
+        if self.days is not None and (TODAY - txn.date).days < self.days:
+            return False
+        if self.tag is not None and self.tag not in txn.tags:
+            return False
+        if self.account is not None:
+            acc = self.account
+            return any(
+                p.account == acc or p.account.startswith(acc + ":")
+                for p in txn.postings
+            )
+        return True
+
+
+RULE_FILTERS = ("days", "tag", "account")
+
+
+def parse_rules(string: str) -> list[Rule]:
+    """Parse rules from a string.
+
+    Parameters
+    ----------
+    string
+        Rules separated by ';', for example "remove,days=30;roll". See
+        `Rule.from_string`.
+    """
+    return [Rule.from_string(rule) for rule in string.split(";") if rule.strip()]
+
+
+def get_config_rules() -> list[Rule]:
+    """Get rules defined by the 'exp-rules' configuration option."""
+    return parse_rules(config.SETTINGS.exp_rules)
+
+
+def get_action(txn: Transaction, rules: list[Rule]) -> Action | None:
+    """Get action to take on an expired transaction.
+
+    Returns action of first rule of `rules` to match `txn`, or None if no
+    rule matches.
+    """
+    for rule in rules:
+        if rule.matches(txn):
+            return rule.action
+    return None
+
+
+def apply_action(action: Action, txn: Transaction) -> Transaction | None:
+    """Apply an action to an expired transaction.
+
+    Returns
+    -------
+    Transaction | None
+        Transaction as it should be retained, or None if it should be
+        removed.
+    """
+    if action is Action.ROLL:
+        return txn._replace(date=TOMORROW)
+    if action is Action.REMOVE:
+        return None
+    return txn
+
+
+def print_rules_summary(counts: dict[Path, Counter]):
+    """Print summary of expired transactions administered by rules.
+
+    Parameters
+    ----------
+    counts
+        Mapping of path to ledger to counts of expired transactions on the
+        ledger. Counts are keyed by Action, or by None for transactions
+        that were administered interactively.
+    """
+    lines = []
+    for path, counter in counts.items():
+        line = (
+            f"{path.stem}: {counter[Action.ROLL]} rolled forwards to {TOMORROW},"
+            f" {counter[Action.REMOVE]} removed, {counter[Action.LEAVE]} left as is"
+        )
+        if counter[None]:
+            line += f", {counter[None]} administered interactively"
+        lines.append(line + ".")
+    utils.print_it("Expired transactions administered by rules:\n" + "\n".join(lines))
+
+
+def overwrite_ledgers(contents: dict[Path, str]) -> list[Path]:
     """Write content to expected transaction ledgers.
 
     If an error is raised during the writing process then:
@@ -178,6 +371,12 @@ def overwrite_ledgers(contents: dict[Path, str]):
         value: str
             Content to write to 'key'.
 
+    Returns
+    -------
+    list of Path
+        Paths to ledgers that were overwritten. Ledgers that already had
+        the content to be written are not overwritten.
+
     Raises
     ------
     BeanaheadWriteError
@@ -185,10 +384,12 @@ def overwrite_ledgers(contents: dict[Path, str]):
     """
     prev_contents = {path: utils.get_content(path) for path in contents}
     seen = []
+    written = []
     try:
         for path, content in contents.items():
             seen.append(path)
-            utils.overwrite_file(path, content)
+            if utils.overwrite_file(path, content):
+                written.append(path)
     except Exception as err:
         for path_ in seen[:]:
             try:
@@ -196,13 +397,21 @@ def overwrite_ledgers(contents: dict[Path, str]):
             except Exception:  # noqa: BLE001, PERF203
                 seen.remove(path_)
         raise BeanaheadWriteError(path, seen) from err
+    return written
 
 
-def admin_expired_txns(ledgers: list[str]):
+def admin_expired_txns(
+    ledgers: list[str],
+    rules: list[Rule | str] | None = None,
+    auto: bool = False,  # noqa: FBT001, FBT002
+):
     """Administer expired expected transactions.
 
     For each expired transaction on a ledger of `ledgers`:
-        Requests user choose from following options:
+        If a rule matches the transaction then actions the rule's action.
+
+        Otherwise, unless `auto` is True, requests user choose from
+        following options:
             Move txn forwards to tomorrow.
             Move txn forwards to user-defined date.
             Remove transaction from ledger.
@@ -210,10 +419,16 @@ def admin_expired_txns(ledgers: list[str]):
 
         Actions request.
 
+    All ledgers are administered in a single pass. New content is composed
+    for all ledgers before any ledger is written to. If a write fails then
+    any ledger already written to is reverted.
+
     Ledgers on which at least one transaction is moved forward or removed
     will be rewritten. As part of this all remaining entries are sorted
     in ascending order.
 
+    Ledgers are locked whilst expired transactions are administered.
+
     Parameters
     ----------
     ledgers
@@ -221,30 +436,86 @@ def admin_expired_txns(ledgers: list[str]):
         be defined as absolute or relative to the cwd. It is not
         necessary to include the. beancount extension. For example,
         "rx" would refer to the file 'rx.beancount' in the cwd.
+
+    rules
+        Rules defining the action to take on expired transactions, as
+        `Rule` or strings (see `Rule.from_string`). The action of the
+        first rule to match a transaction is taken. By default, rules as
+        defined by the 'exp-rules' configuration option.
+
+    auto
+        True to administer expired transactions without requesting any
+        user input. Expired transactions not matched by any rule are
+        left as is.
     """
+    if rules is None:
+        rules_ = get_config_rules()
+    else:
+        rules_ = [Rule.from_string(r) if isinstance(r, str) else r for r in rules]
+    paths = [utils.get_verified_path(ledger) for ledger in ledgers]
+    with locks.lock_files(paths):
+        _admin_expired_txns(paths, rules_, auto)
+
+
+def _admin_expired_txns(  # noqa: C901, PLR0912, PLR0915
+    ledgers: list[Path],
+    rules: list[Rule] | None = None,
+    auto: bool = False,  # noqa: FBT001, FBT002
+):
+    """Administer expired expected transactions.
+
+    Ledgers should be locked for the duration of the call.
+
+    Parameters
+    ----------
+    ledgers
+        List of verified paths to expected transactions ledgers.
+
+    rules
+        Rules defining the action to take on expired transactions.
+
+    auto
+        True to leave, rather than request user input for, any expired
+        transaction not matched by a rule.
+    """
+    rules = [] if rules is None else rules
+    use_rules = bool(rules) or auto
     x_txns: dict[Path, list[Transaction]] = {}
     file_keys: dict[Path, str] = {}
-    for ledger in ledgers:
-        path = utils.get_verified_path(ledger)
-        file_keys[path] = utils.get_verified_ledger_file_key(path)
-        x_txns[path] = utils.get_unverified_txns(path)
+    with profiling.phase("exp.load") as phase:
+        for path in ledgers:
+            file_keys[path] = utils.get_verified_ledger_file_key(path)
+            x_txns[path] = utils.get_unverified_txns(path)
+            phase.count(len(x_txns[path]))
 
     no_expired_txns = True
     paths = list(x_txns.keys())
     ledger_updated = dict.fromkeys(paths, False)
     updated_txns: dict[Path, list[Transaction]] = {}
+    counts: dict[Path, Counter] = {path: Counter() for path in paths}
     for path, txns in x_txns.items():
+        # txns loaded date-sorted, only the expired head requires attention
+        expired_txns, unexpired_txns = utils.split_expired_txns(txns)
+        if not expired_txns:
+            continue
+        no_expired_txns = False
         new_txns = []
-        for txn in txns:
-            if utils.is_expired(txn):
-                no_expired_txns = False
-                txn_ = _update_txn(txn, path)
+        # includes any time waiting on user input
+        with profiling.phase("exp.administer", len(expired_txns)):
+            for txn in expired_txns:
+                action = get_action(txn, rules)
+                if action is None and auto:
+                    action = Action.LEAVE
+                counts[path][action] += 1
+                if action is None:
+                    txn_ = _update_txn(txn, path)
+                else:
+                    txn_ = apply_action(action, txn)
                 if not ledger_updated[path] and txn_ != txn:
                     ledger_updated[path] = True
-                txn = txn_  # noqa: PLW2901
-            if txn is not None:
-                new_txns.append(txn)
-        updated_txns[path] = new_txns
+                if txn_ is not None:
+                    new_txns.append(txn_)
+        updated_txns[path] = new_txns + unexpired_txns
 
     if no_expired_txns:
         paths_string = "\n".join([str(path) for path in paths])
@@ -254,8 +525,13 @@ def admin_expired_txns(ledgers: list[str]):
         )
         return
 
+    if use_rules:
+        print_rules_summary(counts)
+
     updated_paths = [path for path in paths if ledger_updated[path]]
-    paths_string = "\n".join([str(path) for path in updated_paths])
+    if not updated_paths and use_rules:
+        utils.print_it("\nNo expired transactions have been modified.")
+        return
     if not updated_paths:
         utils.print_it(
             "\nYou have not choosen to modify any expired transactions."
@@ -264,9 +540,16 @@ def admin_expired_txns(ledgers: list[str]):
         return
 
     updated_contents: dict[Path, str] = {}
-    for path in updated_paths:
-        content = utils.create_ledger_content(file_keys[path], updated_txns[path])
-        updated_contents[path] = content
-
-    overwrite_ledgers(updated_contents)
+    with profiling.phase("exp.compose") as phase:
+        for path in updated_paths:
+            content = utils.create_ledger_content(file_keys[path], updated_txns[path])
+            updated_contents[path] = content
+            phase.count(len(updated_txns[path]))
+
+    with profiling.phase("exp.write"):
+        written_paths = overwrite_ledgers(updated_contents)
+    if not written_paths:
+        utils.print_it("\nNo ledger content has changed. No ledger has been altered.")
+        return
+    paths_string = "\n".join([str(path) for path in written_paths])
     utils.print_it(f"\nThe following ledgers have been updated:\n{paths_string}")
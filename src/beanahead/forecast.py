@@ -0,0 +1,283 @@
+"""Project future balances from expected transactions.
+
+Projections are evaluated in memory. No ledger is written to.
+"""
+
+from __future__ import annotations
+
+import csv
+import datetime
+import io
+from collections import defaultdict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+import numpy as np
+import pandas as pd
+
+from . import rx_txns, utils
+
+if TYPE_CHECKING:
+    from beancount.core.data import Transaction
+
+Column = tuple[str, str]  # (account, currency)
+
+
+@dataclass
+class Projection:
+    """Projected balances.
+
+    Attributes
+    ----------
+    dates
+        Dates of projection grid, as numpy datetime64[D] array.
+
+    columns
+        Columns of `balances`, each as 2-tuple (account, currency).
+
+    balances
+        Projected balances as 2D array with rows corresponding to `dates`
+        and columns corresponding to `columns`. Each value is the
+        projected balance of the account at the end of the corresponding
+        date.
+    """
+
+    dates: np.ndarray
+    columns: list[Column]
+    balances: np.ndarray
+
+    def get_balances(self, account: str, currency: str | None = None) -> np.ndarray:
+        """Get projected balances for an account.
+
+        Parameters
+        ----------
+        account
+            Account to query.
+
+        currency
+            Currency to query. Only required if the account holds more
+            than one currency.
+        """
+        cols = [
+            i
+            for i, (acc, cur) in enumerate(self.columns)
+            if acc == account and (currency is None or cur == currency)
+        ]
+        if len(cols) != 1:
+            msg = (
+                f"Projection has {len(cols)} columns for account '{account}' and"
+                f" currency '{currency}', although requires exactly one."
+            )
+            raise ValueError(msg)
+        return self.balances[:, cols[0]]
+
+    def to_csv(self, path: str | Path | None = None) -> str | None:
+        """Export projection to csv.
+
+        Parameters
+        ----------
+        path
+            Path to which to write csv file. If not passed then csv content
+            will be returned.
+        """
+        buffer = io.StringIO()
+        writer = csv.writer(buffer, lineterminator="\n")
+        writer.writerow(["date", *(f"{acc} {cur}" for acc, cur in self.columns)])
+        for date, row in zip(self.dates.astype(str), self.balances, strict=True):
+            writer.writerow([date, *(f"{value:.2f}" for value in row)])
+        content = buffer.getvalue()
+        if path is None:
+            return content
+        utils.write(Path(path), content)
+        return None
+
+
+def _get_grid(start: datetime.date, end: datetime.date, freq: str) -> np.ndarray:
+    """Get grid of projection dates, always including `start` and `end`."""
+    dates = pd.date_range(start, end, freq=freq).to_numpy().astype("datetime64[D]")
+    bounds = np.array([start, end], dtype="datetime64[D]")
+    return np.union1d(dates, bounds)
+
+
+def _get_postings(txns: list[Transaction], accounts: tuple[str, ...] | None):
+    """Yield (date, (account, currency), amount) for balance sheet postings."""
+    for txn in txns:
+        for posting in txn.postings:
+            account = posting.account
+            if posting.units is None or not utils.is_balance_sheet_account(account):
+                continue
+            if accounts is not None and not any(
+                account == acc or account.startswith(acc + ":") for acc in accounts
+            ):
+                continue
+            column = (account, posting.units.currency)
+            yield txn.date, column, float(posting.units.number)
+
+
+def _get_expected_txns(
+    admin: rx_txns.Admin,
+    main_entries: list,
+    x_ledgers: list[str] | None,
+    *,
+    end: datetime.date,
+    accounts: tuple[str, ...] | None,
+) -> list[Transaction]:
+    """Get all expected transactions through `end`.
+
+    Expected transactions are those on ledgers included to the main ledger,
+    those on any other ledger of `x_ledgers` and those generated (in
+    memory) from the rx definitions.
+    """
+    txns = [
+        entry for entry in utils.extract_txns(main_entries) if entry.tags & utils.TAGS_X
+    ]
+    included = {
+        Path(filename).resolve()
+        for filename in {entry.meta.get("filename") for entry in main_entries}
+        if filename is not None and not filename.startswith("<")
+    }
+    paths = [admin.path_ledger]
+    if x_ledgers is not None:
+        paths += [utils.get_verified_path(ledger) for ledger in x_ledgers]
+    for path in paths:
+        if path.resolve() in included:
+            continue
+        utils.get_verified_ledger_file_key(path)
+        txns += utils.get_unverified_txns(path)
+    # only generate instances of definitions that post to `accounts`. NB
+    # window from date.min as instances dated before `start` are included.
+    defs = (
+        None
+        if accounts is None
+        else admin.rx_defs.active_on(accounts, datetime.date.min, end)
+    )
+    new_txns, _ = admin._get_new_txns_data(end, defs)  # noqa: SLF001
+    return txns + new_txns
+
+
+def project_balances(
+    admin: rx_txns.Admin,
+    x_ledgers: list[str] | None = None,
+    *,
+    end: datetime.date | str | None = None,
+    start: datetime.date | str | None = None,
+    freq: str = "D",
+    accounts: list[str] | None = None,
+) -> Projection:
+    """Project balances of balance sheet accounts.
+
+    Projected balances are evaluated as the current balances, as at
+    `start`, plus the cumulative effect of all expected transactions
+    through each date of the projection. Expected transactions include:
+        Transactions on any Expected Transactions Ledger included to the
+        main ledger.
+
+        Transactions on the Regular Expected Transactions Ledger of
+        `admin` and on any ledger of `x_ledgers`, if not included to the
+        main ledger.
+
+        Regular Expected Transactions that would be added by
+        `admin.add_txns(end)`. These are generated in memory, no ledger is
+        written to.
+
+    Any expected transaction dated prior to `start` is treated as if it
+    were dated `start`. Any transaction on the main ledger dated after
+    `start` is also included to the projection (i.e. not only expected
+    transactions).
+
+    Parameters
+    ----------
+    admin
+        Administrator of the regular expected transactions to include to
+        the projection. Must have been constructed with `ledger_main`.
+
+    x_ledgers
+        Paths to any further Expected Transactions Ledgers.
+
+    end : datetime.date | str | None, default: `rx_txns.END_DFLT`
+        Date to which to project balances. If passed as string then should
+        be in iso format, for example "2022-09-18".
+
+    start : datetime.date | str | None, default: today
+        Date from which to project balances.
+
+    freq
+        Frequency of projection dates, as a pandas frequency. The first
+        and last projection dates will always be `start` and `end`. By
+        default, daily.
+
+    accounts
+        Accounts to include to the projection. All subaccounts of each
+        account are included. By default, all balance sheet accounts.
+    """
+    if admin.path_ledger_main is None:
+        raise ValueError(
+            "Balances cannot be projected as the main ledger is not available."
+            " Pass the 'ledger_main' argument to the `Admin` constructor."
+        )
+    end = rx_txns.END_DFLT if end is None else end
+    start = utils.TODAY if start is None else start
+    if not isinstance(end, datetime.date):
+        end = datetime.date.fromisoformat(end)
+    if not isinstance(start, datetime.date):
+        start = datetime.date.fromisoformat(start)
+    if end < start:
+        msg = f"'end' ({end}) cannot be earlier than 'start' ({start})."
+        raise ValueError(msg)
+    accounts_ = None if accounts is None else tuple(accounts)
+
+    main_entries, _, _ = utils.load_file(admin.path_ledger_main)
+    actual_txns = [
+        txn for txn in utils.extract_txns(main_entries) if not txn.tags & utils.TAGS_X
+    ]
+    current: dict[Column, float] = defaultdict(float)
+    flows: list[tuple[datetime.date, Column, float]] = []
+    for date, column, amount in _get_postings(actual_txns, accounts_):
+        if date <= start:
+            current[column] += amount
+        else:
+            flows.append((date, column, amount))
+    expected_txns = _get_expected_txns(
+        admin, main_entries, x_ledgers, end=end, accounts=accounts_
+    )
+    for date, column, amount in _get_postings(expected_txns, accounts_):
+        flows.append((max(date, start), column, amount))
+    flows = [flow for flow in flows if flow[0] <= end]
+
+    columns = sorted(set(current) | {column for _, column, _ in flows})
+    col_idx = {column: i for i, column in enumerate(columns)}
+    dates = _get_grid(start, end, freq)
+
+    changes = np.zeros((len(dates), len(columns)))
+    if flows:
+        flow_dates, flow_cols, amounts = zip(*flows, strict=True)
+        rows = np.searchsorted(dates, np.array(flow_dates, dtype="datetime64[D]"))
+        cols = np.fromiter((col_idx[c] for c in flow_cols), dtype=int)
+        np.add.at(changes, (rows, cols), np.array(amounts))
+    opening = np.array([current.get(column, 0.0) for column in columns])
+    balances = opening + np.cumsum(changes, axis=0)
+    return Projection(dates, columns, balances)
+
+
+def print_projection(projection: Projection, path: str | None = None):
+    """Print or export a projection.
+
+    Parameters
+    ----------
+    projection
+        Projection to print or export.
+
+    path
+        Path to which to export projection as csv. If not passed then csv
+        content will be printed.
+    """
+    if path is None:
+        utils.print_it(projection.to_csv(), end="")
+        return
+    projection.to_csv(path)
+    n_cols = len(projection.columns)
+    utils.print_it(
+        f"Projected balances of {n_cols} accounts over {len(projection.dates)}"
+        f" dates have been exported to '{path}'."
+    )
@@ -0,0 +1,218 @@
+"""Advisory locks on beanahead files.
+
+Commands that read-modify-write a file hold an advisory lock on that file
+for the duration of the read-modify-write. Locks are held on a dedicated
+lock file alongside each locked file, for example the lock on
+'rx.beancount' is held on '.rx.beancount.lock'.
+
+Locks are only respected by other beanahead processes (and other threads
+of the same process). Locks on different files are independent, such that
+commands operating on different files can proceed in parallel.
+
+To avoid deadlocks when a command requires locks on more than one file,
+locks are always acquired in the order of the files' resolved paths.
+"""
+
+from __future__ import annotations
+
+import collections
+import contextlib
+import os
+import sys
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from . import config
+from .errors import BeanaheadLockTimeoutError
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Iterator
+
+if sys.platform == "win32":
+    import msvcrt
+
+    def _try_lock(fd: int) -> bool:
+        """Try to acquire lock on a lock file without blocking."""
+        try:
+            msvcrt.locking(fd, msvcrt.LK_NBLCK, 1)
+        except OSError:
+            return False
+        return True
+
+    def _unlock(fd: int):
+        """Release lock on a lock file."""
+        os.lseek(fd, 0, os.SEEK_SET)
+        msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+
+else:
+    import fcntl
+
+    def _try_lock(fd: int) -> bool:
+        """Try to acquire lock on a lock file without blocking."""
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            return False
+        return True
+
+    def _unlock(fd: int):
+        """Release lock on a lock file."""
+        fcntl.flock(fd, fcntl.LOCK_UN)
+
+
+POLL_INTERVAL = 0.05  # seconds between attempts to acquire a contended lock
+
+
+@dataclass
+class _HeldLock:
+    """Lock held by this process."""
+
+    fd: int
+    owner: int  # ident of thread that holds the lock
+    count: int  # number of times lock acquired by owner
+
+
+_registry_lock = threading.Lock()
+_held: dict[Path, _HeldLock] = {}
+
+# Only the most recent waits are recorded, such that the record does not
+# grow without bound in long-running processes.
+LOCK_WAITS_MAX = 1_000
+LOCK_WAITS: collections.deque[tuple[Path, float]] = collections.deque(
+    maxlen=LOCK_WAITS_MAX
+)
+
+
+def get_lock_path(path: Path) -> Path:
+    """Return path to the lock file corresponding with a file.
+
+    Examples
+    --------
+    >>> get_lock_path(Path("dir/rx.beancount")).as_posix()
+    'dir/.rx.beancount.lock'
+    """
+    return path.with_name(f".{path.name}.lock")
+
+
+def _acquire(path: Path, timeout: float) -> float:
+    """Acquire lock on a file.
+
+    Parameters
+    ----------
+    path
+        Resolved path to file to lock.
+
+    timeout
+        Seconds to wait for lock to be acquired.
+
+    Returns
+    -------
+    float
+        Seconds waited to acquire lock.
+
+    Raises
+    ------
+    BeanaheadLockTimeoutError
+        If lock not acquired within `timeout`.
+    """
+    ident = threading.get_ident()
+    start = time.monotonic()
+    while True:
+        with _registry_lock:
+            held = _held.get(path)
+            if held is not None and held.owner == ident:
+                held.count += 1
+                return 0.0
+            if held is None:
+                fd = os.open(get_lock_path(path), os.O_RDWR | os.O_CREAT, 0o666)
+                if _try_lock(fd):
+                    _held[path] = _HeldLock(fd, ident, 1)
+                    return time.monotonic() - start
+                os.close(fd)
+        if time.monotonic() - start >= timeout:
+            raise BeanaheadLockTimeoutError(path, timeout)
+        time.sleep(POLL_INTERVAL)
+
+
+def _release(path: Path):
+    """Release lock on a file.
+
+    Parameters
+    ----------
+    path
+        Resolved path to locked file.
+    """
+    with _registry_lock:
+        held = _held[path]
+        held.count -= 1
+        if held.count:
+            return
+        del _held[path]
+        try:
+            _unlock(held.fd)
+        finally:
+            os.close(held.fd)
+
+
+@contextlib.contextmanager
+def lock_files(paths: Iterable[Path], timeout: float | None = None) -> Iterator[None]:
+    """Hold advisory locks on files.
+
+    Locks are acquired in the order of the files' resolved paths and
+    released on exiting the context. Locks are reentrant for the thread
+    that holds them.
+
+    Parameters
+    ----------
+    paths
+        Paths to files to lock.
+
+    timeout
+        Seconds to wait to acquire each lock. By default, as the
+        'lock-timeout' option of the configuration file.
+
+    Raises
+    ------
+    BeanaheadLockTimeoutError
+        If any lock is not acquired within `timeout`. Any locks acquired
+        prior to the error are released.
+    """
+    timeout = config.SETTINGS.lock_timeout if timeout is None else timeout
+    ordered = sorted({Path(path).resolve() for path in paths}, key=str)
+    acquired: list[Path] = []
+    try:
+        for path in ordered:
+            waited = _acquire(path, timeout)
+            acquired.append(path)
+            if waited >= POLL_INTERVAL:
+                LOCK_WAITS.append((path, waited))
+                print(
+                    f"Waited {waited:.2f} seconds to acquire lock on '{path}'.",
+                    file=config.SETTINGS.print_to,
+                )
+        yield
+    finally:
+        for path in reversed(acquired):
+            _release(path)
+
+
+def get_lock_waits() -> list[tuple[Path, float]]:
+    """Get record of waits to acquire contended locks.
+
+    Only the most recent `LOCK_WAITS_MAX` waits are recorded.
+
+    Returns
+    -------
+    list of 2-tuple
+        [0] Path of file locked.
+        [1] Seconds waited to acquire lock.
+    """
+    return list(LOCK_WAITS)
+
+
+def reset_lock_waits():
+    """Clear record of waits to acquire contended locks."""
+    LOCK_WAITS.clear()
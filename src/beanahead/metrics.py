@@ -0,0 +1,255 @@
+"""Counters and histograms of operational volumes.
+
+Metrics are defined at module level by the modules they measure, for
+example:
+
+    PROMPTS = metrics.counter(
+        "beanahead_reconcile_prompts_total", "Prompts shown to confirm a match."
+    )
+
+...and are subsequently updated with `Counter.inc` or `Histogram.observe`.
+Metrics accumulate for the life of the process (see `reset`).
+
+Metrics can be dumped as JSON or in the Prometheus text exposition format,
+either to a string (`format_metrics`) or to a local file (`write_metrics`).
+"""
+
+from __future__ import annotations
+
+import json
+import math
+import threading
+from typing import TYPE_CHECKING, Any
+
+from . import config
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+FORMATS = ("json", "prometheus")
+
+BUCKETS_DFLT = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+_lock = threading.Lock()
+
+
+class Counter:
+    """Monotonically increasing count.
+
+    Parameters
+    ----------
+    name
+        Metric name.
+
+    help_
+        Description of what is counted.
+    """
+
+    kind = "counter"
+
+    def __init__(self, name: str, help_: str):
+        self.name = name
+        self.help = help_
+        self.value = 0
+
+    def inc(self, n: int = 1):
+        """Increment count by `n`."""
+        with _lock:
+            self.value += n
+
+    def reset(self):
+        """Reset count to zero."""
+        self.value = 0
+
+    def as_dict(self) -> dict[str, Any]:
+        """Get metric as a dictionary."""
+        return {"type": self.kind, "help": self.help, "value": self.value}
+
+    def to_prometheus(self) -> list[str]:
+        """Get sample lines in the Prometheus text format."""
+        return [f"{self.name} {self.value}"]
+
+
+class Histogram:
+    """Distribution of observed values.
+
+    Parameters
+    ----------
+    name
+        Metric name.
+
+    help_
+        Description of what is observed.
+
+    buckets
+        Upper bounds of buckets, in ascending order. A bucket with upper
+        bound of infinity is always included.
+    """
+
+    kind = "histogram"
+
+    def __init__(self, name: str, help_: str, buckets: tuple[float, ...]):
+        if list(buckets) != sorted(buckets):
+            msg = f"buckets must be in ascending order although received {buckets}."
+            raise ValueError(msg)
+        self.name = name
+        self.help = help_
+        self.buckets = (*buckets, math.inf)
+        self.counts = [0] * len(self.buckets)
+        self.sum = 0
+        self.count = 0
+
+    def observe(self, value: float):
+        """Record an observed value."""
+        i = next(i for i, bound in enumerate(self.buckets) if value <= bound)
+        with _lock:
+            self.counts[i] += 1
+            self.sum += value
+            self.count += 1
+
+    def reset(self):
+        """Clear all observations."""
+        self.counts = [0] * len(self.buckets)
+        self.sum = 0
+        self.count = 0
+
+    def cumulative_counts(self) -> list[int]:
+        """Get number of observations less than or equal to each bucket bound."""
+        rtrn, total = [], 0
+        for n in self.counts:
+            total += n
+            rtrn.append(total)
+        return rtrn
+
+    def as_dict(self) -> dict[str, Any]:
+        """Get metric as a dictionary.
+
+        Buckets are keyed by upper bound, with values as the cumulative
+        number of observations less than or equal to that bound.
+        """
+        buckets = {
+            _format_bound(bound): n
+            for bound, n in zip(self.buckets, self.cumulative_counts(), strict=True)
+        }
+        return {
+            "type": self.kind,
+            "help": self.help,
+            "buckets": buckets,
+            "sum": self.sum,
+            "count": self.count,
+        }
+
+    def to_prometheus(self) -> list[str]:
+        """Get sample lines in the Prometheus text format."""
+        lines = [
+            f'{self.name}_bucket{{le="{_format_bound(bound)}"}} {n}'
+            for bound, n in zip(self.buckets, self.cumulative_counts(), strict=True)
+        ]
+        lines += [f"{self.name}_sum {self.sum}", f"{self.name}_count {self.count}"]
+        return lines
+
+
+Metric = Counter | Histogram
+
+_registry: dict[str, Metric] = {}
+
+
+def _format_bound(bound: float) -> str:
+    """Format a bucket bound as for the Prometheus 'le' label."""
+    return "+Inf" if bound == math.inf else str(bound)
+
+
+def _register(metric: Metric) -> Metric:
+    """Register a metric, or get metric already registered with same name."""
+    existing = _registry.setdefault(metric.name, metric)
+    if existing.kind != metric.kind:
+        msg = f"A {existing.kind} named '{metric.name}' is already registered."
+        raise ValueError(msg)
+    return existing
+
+
+def counter(name: str, help_: str) -> Counter:
+    """Get a registered counter, registering it if not already registered.
+
+    Parameters
+    ----------
+    As for `Counter`.
+    """
+    return _register(Counter(name, help_))  # type: ignore[return-value]
+
+
+def histogram(
+    name: str, help_: str, buckets: tuple[float, ...] = BUCKETS_DFLT
+) -> Histogram:
+    """Get a registered histogram, registering it if not already registered.
+
+    Parameters
+    ----------
+    As for `Histogram`.
+    """
+    return _register(Histogram(name, help_, buckets))  # type: ignore[return-value]
+
+
+def reset():
+    """Reset the value of all registered metrics."""
+    with _lock:
+        for metric in _registry.values():
+            metric.reset()
+
+
+def get_metrics() -> dict[str, dict[str, Any]]:
+    """Get all registered metrics.
+
+    Returns
+    -------
+    dict
+        key: str
+            Metric name.
+        value: dict
+            Metric as returned by the metric's `as_dict` method.
+        Metrics are ordered by name.
+    """
+    with _lock:
+        return {name: _registry[name].as_dict() for name in sorted(_registry)}
+
+
+def format_metrics(fmt: str = "json") -> str:
+    """Format all registered metrics.
+
+    Parameters
+    ----------
+    fmt
+        "json" for a JSON object as returned by `get_metrics`,
+        "prometheus" for the Prometheus text exposition format.
+    """
+    if fmt == "json":
+        return json.dumps(get_metrics(), indent=2)
+    if fmt != "prometheus":
+        msg = f"'{fmt}' is not a valid metrics format. Valid formats: {FORMATS}."
+        raise ValueError(msg)
+    lines = []
+    with _lock:
+        for name in sorted(_registry):
+            metric = _registry[name]
+            lines.append(f"# HELP {name} {metric.help}")
+            lines.append(f"# TYPE {name} {metric.kind}")
+            lines.extend(metric.to_prometheus())
+    return "\n".join(lines) + "\n"
+
+
+def write_metrics(path: Path, fmt: str | None = None):
+    """Write all registered metrics to a local file.
+
+    Parameters
+    ----------
+    path
+        Path to file. Any existing file will be overwritten.
+
+    fmt
+        As for `format_metrics`. By default, "json" if `path` has a
+        '.json' suffix, otherwise "prometheus".
+    """
+    if fmt is None:
+        fmt = "json" if path.suffix.lower() == ".json" else "prometheus"
+    content = format_metrics(fmt)
+    path.write_text(content, encoding=config.ENCODING)
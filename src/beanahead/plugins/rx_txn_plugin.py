@@ -1,24 +1,94 @@
 """Plugins for Regular Expected Transactions."""
 
+import datetime
+from typing import NamedTuple
+
 from beancount.core.data import Entries, Options, Transaction
 
+from beanahead import errors
 from beanahead.utils import RX_META_DFLTS, TAG_RX
 
 __plugins__ = ["convert_meta"]
 
 
+class RxMetaError(NamedTuple):
+    """Error describing an invalid Regular Expected Transaction meta field."""
+
+    source: dict
+    message: str
+    entry: Transaction
+
+
+def validate_meta(entry: Transaction) -> list[RxMetaError]:
+    """Validate the meta fields of a Regular Expected Transaction.
+
+    Validates the 'freq', 'final' and 'roll' meta fields. Default values
+    should already have been set for any optional field.
+
+    A valid 'freq' is compiled, such that later evaluation of the offset
+    is served from the cache (see `rx_txns.compile_freq`).
+
+    Parameters
+    ----------
+    entry
+        Regular Expected Transaction to validate.
+
+    Returns
+    -------
+    list of RxMetaError
+        Errors describing any invalid meta field. Empty if all fields are
+        valid.
+    """
+    # imported here as rx_txns requires pandas, which need only be imported
+    # if the ledger being loaded includes Regular Expected Transactions.
+    from beanahead import rx_txns  # noqa: PLC0415
+
+    errors_ = []
+
+    def add_error(msg: str, *, prefix: bool = True):
+        if prefix:
+            msg = f"Regular expected transaction '{entry.payee}' is invalid: {msg}"
+        errors_.append(RxMetaError(entry.meta, msg, entry))
+
+    freq = entry.meta.get("freq")
+    if freq is None:
+        add_error("the 'freq' meta field is not defined.")
+    elif not isinstance(freq, str):
+        add_error(f"the 'freq' meta field must be a string, not '{freq}'.")
+    elif isinstance(compiled := rx_txns._compile_freq(freq), str):  # noqa: SLF001
+        add_error(compiled)
+
+    final = entry.meta["final"]
+    if final is not None and not isinstance(final, datetime.date):
+        add_error(f"the 'final' meta field must be an (unquoted) date, not '{final}'.")
+
+    try:
+        rx_txns.get_roll_convention(entry)
+    except errors.RegularTransactionsDefinitionError as err:
+        add_error(str(err), prefix=False)  # message already names payee
+    return errors_
+
+
 def convert_meta(entries: Entries, _: Options) -> tuple[Entries, list[tuple]]:
-    """Set default values for Regular Expected Transaction meta fields.
+    """Set defaults for and validate Regular Expected Transaction meta fields.
+
+    Entries with invalid meta fields are not removed although an error is
+    returned for each invalid field (see `validate_meta`).
 
     Parameters
     ----------
     entries
         Entries being loaded.
     """
-    for entry in entries:
-        if (not isinstance(entry, Transaction)) or TAG_RX not in entry.tags:
+    errors_ = []
+    # compare types by identity rather than `isinstance` to efficiently
+    # skip the non-transaction entries that dominate a main ledger.
+    txns = [entry for entry in entries if type(entry) is Transaction]
+    for entry in txns:
+        if TAG_RX not in entry.tags:
             continue
         for k, v in RX_META_DFLTS.items():
             entry.meta.setdefault(k, v)
+        errors_ += validate_meta(entry)
 
-    return entries, (_errors := [])
+    return entries, errors_
@@ -0,0 +1,302 @@
+"""Plugin to generate Regular Expected Transactions at load time.
+
+Regular Expected Transaction definitions included to a ledger are replaced,
+in memory, with the Regular Expected Transactions they define through a
+horizon. No beancount file is written to. As such reports can include
+regular expected transactions without adding them to a Regular Expected
+Transactions Ledger with `addrx`.
+
+Usage, on the main ledger (which should NOT also include the Regular
+Expected Transactions Ledger):
+
+    include "rx_defs.beancount"
+    plugin "rx_virtual_plugin" "horizon=2023-06-30"
+
+The plugin configuration is a comma separated list of key=value pairs:
+    horizon
+        Date through which to generate transactions. Either an iso date or
+        a simple frequency relative to today, for example "26w". By
+        default "13w".
+
+    cache
+        Path to file in which to cache generated dates. "none" to not
+        cache. By default a file dedicated to the ledger being loaded, in
+        the 'cache' subdirectory of the beanahead configuration directory
+        (see `get_cache_path_dflt`). A cache file should not be shared
+        between ledgers, as each load drops any keys it did not access.
+"""
+
+import contextlib
+import datetime
+import functools
+import json
+import os
+import tempfile
+from pathlib import Path
+from typing import NamedTuple
+
+import numpy as np
+from beancount.core import data
+from beancount.core.data import Entries, Options, Transaction
+
+from beanahead import config, errors, rx_txns, utils
+from beanahead.plugins.rx_txn_plugin import validate_meta
+from beanahead.utils import RX_META_DFLTS, TAG_RX
+
+__plugins__ = ["generate_rx_txns"]
+
+HORIZON_DFLT = "13w"
+CACHE_DIR_DFLT = config.CONFIG_DIR / "cache"
+
+
+class RxVirtualError(NamedTuple):
+    """Error advising of an invalid configuration of the plugin."""
+
+    source: dict
+    message: str
+    entry: None
+
+
+def get_cache_path_dflt(filename: str | None) -> Path:
+    """Get default path to cache file for a ledger.
+
+    Each ledger is cached to a dedicated file, named for a digest of the
+    resolved path to the ledger.
+
+    Parameters
+    ----------
+    filename
+        Path to the ledger being loaded. None if loaded from a string.
+    """
+    if filename is None or filename.startswith("<"):
+        return CACHE_DIR_DFLT / "rx_virtual.json"
+    digest = utils.get_digest(str(Path(filename).resolve()))
+    return CACHE_DIR_DFLT / f"rx_virtual_{digest[:16]}.json"
+
+
+def parse_config(
+    config_str: str | None, filename: str | None = None
+) -> tuple[datetime.date, Path | None]:
+    """Parse the plugin configuration.
+
+    Parameters
+    ----------
+    config_str
+        Plugin configuration, as comma separated key=value pairs (see
+        module docstring).
+
+    filename
+        Path to the ledger being loaded, used to determine the default
+        cache file.
+
+    Returns
+    -------
+    2-tuple
+        [0] Horizon.
+        [1] Path to cache file, or None if not to cache.
+
+    Raises
+    ------
+    ValueError
+        If `config_str` is invalid.
+    """
+    options = {"horizon": HORIZON_DFLT, "cache": ""}
+    for pair in (config_str or "").split(","):
+        if not pair.strip():
+            continue
+        key, sep, value = (s.strip() for s in pair.partition("="))
+        if not sep or key not in options:
+            msg = (
+                f"'{pair.strip()}' is not a valid rx_virtual_plugin option. Options"
+                f" should be passed as key=value pairs with keys from {list(options)}."
+            )
+            raise ValueError(msg)
+        options[key] = value
+
+    horizon_ = options["horizon"]
+    if rx_txns.is_simple_freq(horizon_):
+        horizon = (utils.TODAY + rx_txns.get_simple_offset(horizon_)).date()
+    else:
+        try:
+            horizon = datetime.date.fromisoformat(horizon_)
+        except ValueError:
+            msg = (
+                f"'{horizon_}' is not a valid horizon. The horizon should be an iso"
+                " date or a simple frequency, for example '2023-06-30' or '26w'."
+            )
+            raise ValueError(msg) from None
+
+    cache = options["cache"]
+    if not cache:
+        cache_path = get_cache_path_dflt(filename)
+    elif cache.lower() == "none":
+        cache_path = None
+    else:
+        cache_path = Path(cache).expanduser()
+    return horizon, cache_path
+
+
+@functools.lru_cache(maxsize=64)
+def _is_definitions_file_(path: Path, _mtime_ns: int) -> bool:
+    """Query if a file is a Regular Expected Transaction Definitions file.
+
+    `_mtime_ns` only serves to key the cache to the file's current
+    content.
+    """
+    try:
+        utils.verify_files_key(path, "rx_def")
+    except (errors.BeanaheadFileKeyError, OSError):
+        return False
+    return True
+
+
+def _is_definitions_file(filename: str | None) -> bool:
+    """Query if a file is a Regular Expected Transaction Definitions file."""
+    if filename is None or filename.startswith("<"):
+        return False
+    path = Path(filename)
+    try:
+        mtime_ns = path.stat().st_mtime_ns
+    except OSError:
+        return False
+    return _is_definitions_file_(path, mtime_ns)
+
+
+def get_cache_key(
+    rx_def: Transaction, horizon: datetime.date, calendar: np.busdaycalendar
+) -> str:
+    """Get key to cache the dates generated from a definition.
+
+    Key is a digest of the definition fields that determine the dates of
+    generated transactions (i.e. date and 'freq', 'final' and 'roll'
+    meta), the horizon and the business day calendar.
+    """
+    meta = rx_def.meta
+    parts = [
+        rx_def.date.isoformat(),
+        str(meta["freq"]),
+        str(meta["final"]),
+        str(meta["roll"]),
+        horizon.isoformat(),
+        utils.get_digest(calendar.weekmask.tobytes() + calendar.holidays.tobytes()),
+    ]
+    return utils.get_digest("|".join(parts))
+
+
+class DatesCache:
+    """On-disk cache of dates generated from definitions.
+
+    Dates are stored as ordinals. Only those keys accessed since the cache
+    was loaded are saved, such that stale keys (for example those for a
+    prior horizon) are dropped.
+
+    Parameters
+    ----------
+    path
+        Path to cache file. If None then dates will not be cached.
+    """
+
+    def __init__(self, path: Path | None):
+        self.path = path
+        self._stored: dict[str, list[int]] = {}
+        self._accessed: dict[str, list[int]] = {}
+        if path is not None and path.is_file():
+            with contextlib.suppress(OSError, ValueError):
+                self._stored = json.loads(path.read_text(config.ENCODING))
+
+    def get(self, key: str) -> list[datetime.date] | None:
+        """Get cached dates, None if `key` not cached."""
+        if (ordinals := self._stored.get(key)) is None:
+            return None
+        self._accessed[key] = ordinals
+        return [datetime.date.fromordinal(o) for o in ordinals]
+
+    def set(self, key: str, dates: list[datetime.date]):
+        """Cache dates."""
+        self._accessed[key] = [date.toordinal() for date in dates]
+
+    def save(self):
+        """Save cache to disk, if changed.
+
+        Cache is written atomically. Any failure to write is ignored.
+        """
+        if self.path is None or self._accessed == self._stored:
+            return
+        with contextlib.suppress(OSError):
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            fd, name = tempfile.mkstemp(dir=self.path.parent, suffix=".tmp")
+            try:
+                with os.fdopen(fd, "w", encoding=config.ENCODING) as file:
+                    json.dump(self._accessed, file)
+                Path(name).replace(self.path)
+            finally:
+                Path(name).unlink(missing_ok=True)
+            self._stored = dict(self._accessed)
+
+
+def get_dates(
+    rx_def: Transaction, horizon: datetime.date, calendar: np.busdaycalendar
+) -> list[datetime.date]:
+    """Get dates of Regular Expected Transactions defined by a definition.
+
+    Dates are as if transactions were added to the Regular Expected
+    Transactions Ledger through `horizon`, i.e. bound by any final date and
+    rolled.
+    """
+    if rx_txns.is_dormant(rx_def):
+        return []
+    end = rx_txns.get_generation_end(rx_def, horizon)
+    instances, _ = rx_txns.create_entries(rx_def, end)
+    if not instances:
+        return []
+    return [txn.date for txn in rx_txns.iter_rolled(instances, calendar)]
+
+
+def generate_rx_txns(
+    entries: Entries, options: Options, config_str: str | None = None
+) -> tuple[Entries, list[tuple]]:
+    """Replace definitions with the Regular Expected Transactions they define.
+
+    Parameters
+    ----------
+    entries
+        Entries being loaded.
+
+    options
+        Options of the ledger being loaded.
+
+    config_str
+        Plugin configuration (see module docstring).
+    """
+    try:
+        horizon, cache_path = parse_config(config_str, options.get("filename"))
+    except ValueError as err:
+        source = data.new_metadata("<rx_virtual_plugin>", 0)
+        return entries, [RxVirtualError(source, str(err), None)]
+
+    calendar = rx_txns.get_busday_calendar()
+    cache = DatesCache(cache_path)
+    rtrn, errors_ = [], []
+    for entry in entries:
+        if (
+            type(entry) is not Transaction
+            or TAG_RX not in entry.tags
+            or not _is_definitions_file(entry.meta.get("filename"))
+        ):
+            rtrn.append(entry)
+            continue
+        # plugins declared on included files do not run, set defaults here
+        for k, v in RX_META_DFLTS.items():
+            entry.meta.setdefault(k, v)
+        if errors_entry := validate_meta(entry):
+            errors_ += errors_entry
+            continue
+        key = get_cache_key(entry, horizon, calendar)
+        if (dates := cache.get(key)) is None:
+            dates = get_dates(entry, horizon, calendar)
+            cache.set(key, dates)
+        rtrn.extend(entry._replace(date=date) for date in dates)
+    cache.save()
+
+    rtrn.sort(key=data.entry_sortkey)
+    return rtrn, errors_
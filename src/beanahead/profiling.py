@@ -0,0 +1,331 @@
+"""Lightweight per-phase timing instrumentation.
+
+Operations are instrumented by wrapping each phase with `phase`, or
+decorating a function with `profiled`. When profiling is enabled the wall
+time, number of calls and number of entries processed are recorded for
+each phase. When profiling is disabled (the default) `phase` returns a
+shared no-op context manager and `profiled` functions call through
+directly, such that instrumentation has negligible overhead.
+
+Phase times are inclusive of any nested phase.
+
+Memory can also be profiled, in which case the peak memory allocated
+during each phase, and the memory retained at the end of each phase, are
+recorded. Memory is traced with `tracemalloc`, which slows execution
+considerably and only traces memory allocated by Python. Memory should
+only be profiled from a single thread.
+
+Usage:
+
+    with profiling.profile(memory=True):
+        admin.add_txns()
+    profiling.print_report()
+"""
+
+from __future__ import annotations
+
+import contextlib
+import functools
+import json
+import sys
+import threading
+import time
+import tracemalloc
+from dataclasses import asdict, dataclass
+from typing import TYPE_CHECKING, Any, TypeVar
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterator
+
+F = TypeVar("F", bound="Callable[..., Any]")
+
+REPORT_FORMATS = ("flat", "json")
+
+ENABLED = False
+TRACE_MEMORY = False
+
+
+@dataclass
+class PhaseStats:
+    """Statistics recorded for a phase.
+
+    Attributes
+    ----------
+    calls
+        Number of times phase was entered.
+
+    seconds
+        Total wall time spent in phase.
+
+    entries
+        Total number of entries processed by phase, as counted by the
+        instrumentation. 0 if the phase does not count entries.
+
+    peak_bytes
+        Greatest peak memory allocated during any call of the phase,
+        relative to memory allocated when the call started. 0 if memory
+        not traced.
+
+    retained_bytes
+        Total memory allocated during the phase that was not released by
+        the end of the phase (negative if the phase released more than it
+        allocated). 0 if memory not traced.
+    """
+
+    calls: int = 0
+    seconds: float = 0.0
+    entries: int = 0
+    peak_bytes: int = 0
+    retained_bytes: int = 0
+
+
+_registry: dict[str, PhaseStats] = {}
+_lock = threading.Lock()
+# phases being memory profiled, innermost last
+_memory_stack: list[_Phase] = []
+
+
+def _record(
+    name: str,
+    seconds: float,
+    entries: int,
+    peak_bytes: int = 0,
+    retained_bytes: int = 0,
+):
+    """Record a completed call of a phase."""
+    with _lock:
+        stats = _registry.setdefault(name, PhaseStats())
+        stats.calls += 1
+        stats.seconds += seconds
+        stats.entries += entries
+        stats.peak_bytes = max(stats.peak_bytes, peak_bytes)
+        stats.retained_bytes += retained_bytes
+
+
+class _Phase:
+    """Context manager to time a phase."""
+
+    __slots__ = ("child_peak", "entries", "mem_start", "name", "outer_peak", "start")
+
+    def __init__(self, name: str, entries: int = 0):
+        self.name = name
+        self.entries = entries
+        self.start = 0.0
+        self.mem_start = self.outer_peak = self.child_peak = 0
+
+    def __enter__(self) -> _Phase:  # noqa: PYI034
+        if TRACE_MEMORY:
+            self._enter_memory()
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *_):
+        seconds = time.perf_counter() - self.start
+        peak = retained = 0
+        if _memory_stack and _memory_stack[-1] is self:
+            peak, retained = self._exit_memory()
+        _record(self.name, seconds, self.entries, peak, retained)
+
+    def _enter_memory(self):
+        """Start tracking memory allocated during phase."""
+        # tracemalloc has a single peak, which is reset for this phase. The
+        # peak since any prior reset is held so that the peak of any
+        # enclosing phase can be restored on exit.
+        self.mem_start, self.outer_peak = tracemalloc.get_traced_memory()
+        self.child_peak = 0
+        tracemalloc.reset_peak()
+        _memory_stack.append(self)
+
+    def _exit_memory(self) -> tuple[int, int]:
+        """Stop tracking memory allocated during phase.
+
+        Returns
+        -------
+        2-tuple of int
+            [0] Peak memory allocated relative to start of phase.
+            [1] Memory retained relative to start of phase.
+        """
+        _memory_stack.pop()
+        current, peak = tracemalloc.get_traced_memory()
+        peak = max(peak, self.child_peak)
+        if _memory_stack:
+            parent = _memory_stack[-1]
+            parent.child_peak = max(parent.child_peak, self.outer_peak, peak)
+        return peak - self.mem_start, current - self.mem_start
+
+    def count(self, n: int):
+        """Count `n` entries as processed by the phase."""
+        self.entries += n
+
+
+class _NullPhase:
+    """No-op stand-in for `_Phase` when profiling is disabled."""
+
+    __slots__ = ()
+
+    def __enter__(self) -> _NullPhase:  # noqa: PYI034
+        return self
+
+    def __exit__(self, *_):
+        return
+
+    def count(self, n: int):
+        """Do nothing."""
+
+
+_NULL_PHASE = _NullPhase()
+
+
+def phase(name: str, entries: int = 0) -> _Phase | _NullPhase:
+    """Get a context manager to time a phase.
+
+    Parameters
+    ----------
+    name
+        Phase name, for example "recon.match".
+
+    entries
+        Number of entries processed by the phase. Further entries can be
+        counted within the context via the `count` method of the object
+        returned on entering the context.
+    """
+    if not ENABLED:
+        return _NULL_PHASE
+    return _Phase(name, entries)
+
+
+def profiled(name: str) -> Callable[[F], F]:
+    """Time every call to a decorated function as a phase.
+
+    Parameters
+    ----------
+    name
+        Phase name.
+    """
+
+    def decorator(func: F) -> F:
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not ENABLED:
+                return func(*args, **kwargs)
+            with _Phase(name):
+                return func(*args, **kwargs)
+
+        return wrapper  # type: ignore[return-value]
+
+    return decorator
+
+
+def enable():
+    """Enable profiling."""
+    global ENABLED  # noqa: PLW0603
+    ENABLED = True
+
+
+def disable():
+    """Disable profiling. Recorded statistics are retained."""
+    global ENABLED  # noqa: PLW0603
+    ENABLED = False
+
+
+def reset():
+    """Clear all recorded statistics."""
+    with _lock:
+        _registry.clear()
+
+
+@contextlib.contextmanager
+def profile(memory: bool = False) -> Iterator[None]:  # noqa: FBT001, FBT002
+    """Context manager within which profiling is enabled.
+
+    Statistics are reset on entering the context.
+
+    Parameters
+    ----------
+    memory
+        True to also profile memory. `tracemalloc` will be started if it
+        is not already tracing (and stopped on exiting the context).
+    """
+    global TRACE_MEMORY  # noqa: PLW0603
+    reset()
+    prev, prev_memory = ENABLED, TRACE_MEMORY
+    start_tracing = memory and not tracemalloc.is_tracing()
+    if start_tracing:
+        tracemalloc.start()
+    TRACE_MEMORY = memory or prev_memory
+    enable()
+    try:
+        yield
+    finally:
+        if not prev:
+            disable()
+        TRACE_MEMORY = prev_memory
+        _memory_stack.clear()
+        if start_tracing:
+            tracemalloc.stop()
+
+
+def get_report() -> dict[str, dict[str, Any]]:
+    """Get recorded statistics.
+
+    Returns
+    -------
+    dict
+        key: str
+            Phase name.
+        value: dict
+            Statistics of phase with keys 'calls', 'seconds', 'entries',
+            'peak_bytes' and 'retained_bytes' (see `PhaseStats`).
+        Phases are ordered by name.
+    """
+    with _lock:
+        return {name: asdict(_registry[name]) for name in sorted(_registry)}
+
+
+def format_report(fmt: str = "flat") -> str:
+    """Format recorded statistics.
+
+    Parameters
+    ----------
+    fmt
+        "flat" for a table with a row for each phase, "json" for a JSON
+        object as returned by `get_report`.
+    """
+    report = get_report()
+    if fmt == "json":
+        return json.dumps(report, indent=2)
+    if fmt != "flat":
+        msg = f"'{fmt}' is not a valid report format. Valid formats: {REPORT_FORMATS}."
+        raise ValueError(msg)
+    width = max((len(name) for name in report), default=5)
+    memory = any(s["peak_bytes"] for s in report.values())
+    header = f"{'phase':<{width}}  {'calls':>7}  {'seconds':>10}  {'entries':>9}"
+    if memory:
+        header += f"  {'peak KiB':>10}  {'retained KiB':>12}"
+    lines = [header]
+    for name, s in report.items():
+        line = (
+            f"{name:<{width}}  {s['calls']:>7}  {s['seconds']:>10.4f}"
+            f"  {s['entries']:>9}"
+        )
+        if memory:
+            line += (
+                f"  {s['peak_bytes'] / 1024:>10.1f}"
+                f"  {s['retained_bytes'] / 1024:>12.1f}"
+            )
+        lines.append(line)
+    return "\n".join(lines)
+
+
+def print_report(fmt: str = "flat"):
+    """Print recorded statistics to stderr.
+
+    Report is printed to stderr, rather than the print stream, so as not
+    to interfere with any output of the profiled operation.
+
+    Parameters
+    ----------
+    fmt
+        As for `format_report`.
+    """
+    print(format_report(fmt), file=sys.stderr)  # noqa: T201
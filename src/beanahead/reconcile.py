@@ -14,13 +14,35 @@ from beancount.core.getters import get_entry_accounts
 from beancount.parser.parser import parse_file
 from beangulp.extract import HEADER
 
-from . import utils
+from . import locks, metrics, profiling, utils
 from .errors import BeanaheadWriteError
 
 if TYPE_CHECKING:
     from collections.abc import Callable
     from pathlib import Path
 
+X_TXNS = metrics.counter(
+    "beanahead_reconcile_x_txns_total",
+    "Expected transactions evaluated for matches.",
+)
+CANDIDATES = metrics.histogram(
+    "beanahead_reconcile_candidates",
+    "Candidates (basic matches) for each expected transaction evaluated.",
+)
+NUMBER_FALLBACKS = metrics.counter(
+    "beanahead_reconcile_number_fallbacks_total",
+    "Expected transactions with candidates although no candidate matched by"
+    " payee, such that candidates were filtered by number (within 2%).",
+)
+PROMPTS = metrics.counter(
+    "beanahead_reconcile_prompts_total",
+    "Prompts shown to confirm or choose a match.",
+)
+MATCHES = metrics.counter(
+    "beanahead_reconcile_matches_total",
+    "Expected transactions matched with a new transaction.",
+)
+
 
 def separate_out_txns(entries: data.Entries) -> tuple[list[Transaction], data.Entries]:
     """Separate transactions from other entries."""
@@ -72,7 +94,12 @@ def get_accounts_matches(
         Transactions of `txns` with a posting to a balance sheet account
         to which the `x_txn` also has a posting.
     """
-    return [txn for txn in txns if bal_sheet_accounts_match(txn, x_txn)]
+    x_accounts = set(utils.get_balance_sheet_accounts(x_txn))
+    return [
+        txn
+        for txn in txns
+        if not x_accounts.isdisjoint(utils.get_balance_sheet_accounts(txn))
+    ]
 
 
 def get_basic_matches(txns: list[Transaction], x_txn: Transaction) -> list[Transaction]:
@@ -269,12 +296,14 @@ def get_number_matches(
 def get_matches(txns: list[Transaction], x_txn: Transaction) -> list[Transaction]:
     """Match an Expected Transaction to one or more incoming transactions."""
     basic_matches = get_basic_matches(txns, x_txn)
+    CANDIDATES.observe(len(basic_matches))
     if not basic_matches:
         return []
 
     payee_matches = get_payee_matches(basic_matches, x_txn)
     if not payee_matches:
         # if no matches by payee then return only those within 2%
+        NUMBER_FALLBACKS.inc()
         matches = get_number_matches(basic_matches, x_txn, Decimal("0.02"))
         return sort_by_date(matches, x_txn)
     if len(payee_matches) == 1:
@@ -294,6 +323,11 @@ def get_matches(txns: list[Transaction], x_txn: Transaction) -> list[Transaction
 
 
 MSG_SINGLE_MATCH = "Do you want to match the above transactions? y/n: "
+# followed by the valid options, for example "[0-2]/n:"
+MSG_MULT_MATCH = (
+    "Which of the above incoming transactions do you wish to match"
+    " with the expected transaction, or 'n' for None, "
+)
 
 
 def confirm_single(
@@ -356,10 +390,7 @@ def get_mult_match(
 
     max_value = len(matches) - 1
     options = f"[0-{max_value}]/n"
-    response = utils.get_input(
-        "Which of the above incoming transactions do you wish to match"
-        f" with the expected transaction, or 'n' for None, {options}:"
-    )
+    response = utils.get_input(f"{MSG_MULT_MATCH}{options}:")
     while not (
         (response == "n") or utils.response_is_valid_number(response, max_value)
     ):
@@ -398,12 +429,15 @@ def reconcile_x_txns(
     reconciled = []
     new_txns = new_txns.copy()
     for x_txn in x_txns:
+        X_TXNS.inc()
         matches = get_matches(new_txns, x_txn)
         if not matches:
             continue
         match_func = confirm_single if len(matches) == 1 else get_mult_match
+        PROMPTS.inc()
         match = match_func(x_txn, matches)
         if match is not None:
+            MATCHES.inc()
             reconciled.append((x_txn, match))
             new_txns.remove(match)
     return reconciled
@@ -562,7 +596,7 @@ def map_path_to_reconciled_x_txns(
     return mapping
 
 
-def reconcile_new_txns(  # noqa: C901
+def reconcile_new_txns(
     new_entries: str,
     x_txns_ledgers: list[str],
     remove: bool = True,  # noqa: FBT001, FBT002
@@ -597,6 +631,8 @@ def reconcile_new_txns(  # noqa: C901
         corrsponding expected transaction ledger by way of rewritting
         these ledgers with the remaining, unmatched, transactions.
 
+        All files are locked whilst new transactions are reconciled.
+
     Parameters
     ----------
     Where a parameter takes one or more file addresses, the address can
@@ -630,60 +666,100 @@ def reconcile_new_txns(  # noqa: C901
         False to order output latest transfer first.
     """
     input_path = utils.get_verified_path(new_entries)
-    new_entries_, _, _ = parse_file(str(input_path))
-    new_txns, new_other = separate_out_txns(new_entries_)
+    ledger_paths = [utils.get_verified_path(ledger) for ledger in x_txns_ledgers]
+    out_path = input_path if output is None else utils.get_unverified_path(output)
+    with locks.lock_files([input_path, out_path, *ledger_paths]):
+        _reconcile_new_txns(input_path, ledger_paths, out_path, remove, ascending)
+
+
+def _reconcile_new_txns(  # noqa: C901
+    input_path: Path,
+    ledger_paths: list[Path],
+    out_path: Path,
+    remove: bool,  # noqa: FBT001
+    ascending: bool,  # noqa: FBT001
+):
+    """Reconcile new transactions with expected transactions.
+
+    All files should be locked for the duration of the call.
+
+    Parameters
+    ----------
+    input_path
+        Verified path to file containing new entries.
+
+    ledger_paths
+        Verified paths to expected transactions ledgers.
+
+    out_path
+        Path to which to write reconciled new entries.
+
+    remove
+        As for `reconcile_new_txns`.
+
+    ascending
+        As for `reconcile_new_txns`.
+    """
+    with profiling.phase("recon.parse") as phase:
+        new_entries_, _, _ = parse_file(str(input_path))
+        new_txns, new_other = separate_out_txns(new_entries_)
+        phase.count(len(new_entries_))
 
     x_txns: dict[Path, list[Transaction]] = {}
-    for ledger in x_txns_ledgers:
-        path = utils.get_verified_path(ledger)
-        _ = utils.get_verified_ledger_file_key(path)  # just verify that a ledger
-        x_txns[path] = utils.get_unverified_txns(path)
+    with profiling.phase("recon.load") as phase:
+        for path in ledger_paths:
+            _ = utils.get_verified_ledger_file_key(path)  # just verify that a ledger
+            x_txns[path] = utils.get_unverified_txns(path)
+            phase.count(len(x_txns[path]))
 
     all_x_txns = []
     for txns in x_txns.values():
         all_x_txns.extend(txns)
 
-    reconciled_x_txns = reconcile_x_txns(all_x_txns, new_txns)
-    updated_new_txns = update_new_txns(new_txns, reconciled_x_txns)
+    with profiling.phase("recon.match", len(new_txns)):
+        reconciled_x_txns = reconcile_x_txns(all_x_txns, new_txns)
+    with profiling.phase("recon.update", len(reconciled_x_txns)):
+        updated_new_txns = update_new_txns(new_txns, reconciled_x_txns)
     updated_entries = updated_new_txns + new_other
     updated_entries.sort(key=data.entry_sortkey, reverse=not ascending)
 
-    out_path = input_path if output is None else utils.get_unverified_path(output)
-    out_content = HEADER + "\n" + utils.compose_entries_content(updated_entries)
+    with profiling.phase("recon.compose", len(updated_entries)):
+        out_content = HEADER + "\n" + utils.compose_entries_content(updated_entries)
 
     x_txns_to_remove = (
         map_path_to_reconciled_x_txns(x_txns, reconciled_x_txns) if remove else {}
     )
 
     # Write / Overwrite files, reverting all to previous content on any errors
-    prev_contents = {path: utils.get_content(path) for path in x_txns_to_remove}
-    seen: list[Path] = []
-    try:
-        for path, txns in x_txns_to_remove.items():
-            seen.append(path)
-            utils.remove_txns_from_ledger(path, txns)
-    except Exception as err:
-        for revert_path in seen[:]:
-            try:
-                utils.write(revert_path, prev_contents[revert_path])
-            except Exception:  # noqa: BLE001, PERF203
-                seen.remove(revert_path)
-        raise BeanaheadWriteError(path, seen) from err
-
-    overwrite = False
-    if out_path.is_file():
-        prev_contents[out_path] = utils.get_content(out_path)
-        overwrite = True
-    try:
-        utils.write(out_path, out_content)
-    except Exception as err:
-        reverted = list(prev_contents.keys())
-        for revert_path, prev_content in prev_contents.items():
-            try:
-                utils.write(revert_path, prev_content)
-            except Exception:  # noqa: BLE001, PERF203
-                reverted.remove(revert_path)
-        raise BeanaheadWriteError(out_path, reverted, overwrite) from err
+    with profiling.phase("recon.write"):
+        prev_contents = {path: utils.get_content(path) for path in x_txns_to_remove}
+        seen: list[Path] = []
+        try:
+            for path, txns in x_txns_to_remove.items():
+                seen.append(path)
+                utils.remove_txns_from_ledger(path, txns)
+        except Exception as err:
+            for revert_path in seen[:]:
+                try:
+                    utils.write(revert_path, prev_contents[revert_path])
+                except Exception:  # noqa: BLE001, PERF203
+                    seen.remove(revert_path)
+            raise BeanaheadWriteError(path, seen) from err
+
+        overwrite = False
+        if out_path.is_file():
+            prev_contents[out_path] = utils.get_content(out_path)
+            overwrite = True
+        try:
+            utils.write(out_path, out_content)
+        except Exception as err:
+            reverted = list(prev_contents.keys())
+            for revert_path, prev_content in prev_contents.items():
+                try:
+                    utils.write(revert_path, prev_content)
+                except Exception:  # noqa: BLE001, PERF203
+                    reverted.remove(revert_path)
+            raise BeanaheadWriteError(out_path, reverted, overwrite) from err
 
     msg = (
         f"{len(reconciled_x_txns)} incoming transactions have been reconciled against"
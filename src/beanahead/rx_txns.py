@@ -2,30 +2,44 @@
 
 from __future__ import annotations
 
-import copy
+import bisect
+import csv
 import datetime
 import functools
+import heapq
+import itertools
+import json
+import os
 import re
-from collections import defaultdict
+import time
+from collections import abc, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
 from typing import TYPE_CHECKING
 
+import numpy as np
 import pandas as pd
-from beancount import loader
 from beancount.core import data
-from beancount.core.account_types import get_account_type
 from beancount.parser import parser
 from beancount.parser.printer import EntryPrinter
 
-from . import config, errors, utils
+from . import config, errors, locks, profiling, utils
 from .errors import BeanaheadWriteError, BeancountLoaderErrors
 
 if TYPE_CHECKING:
-    from pathlib import Path
-
     from beancount.core.data import Transaction
 
 END_DFLT = utils.TODAY + datetime.timedelta(weeks=13)
 
+
+@utils.on_today_change
+def _set_end_dflt(today: datetime.date):
+    """Reevaluate `END_DFLT` from today."""
+    global END_DFLT  # noqa: PLW0603
+    END_DFLT = today + datetime.timedelta(weeks=13)
+
+
 REGEX_SIMPLE_FREQ = re.compile(r"^\d*[mwy]$")
 SIMPLE_FREQ_MAPPING = {
     "w": "weeks",
@@ -76,6 +90,123 @@ def get_simple_offset(freq: str) -> pd.DateOffset:
     return pd.DateOffset(**kwargs)
 
 
+WEEKDAYS = (
+    "monday",
+    "tuesday",
+    "wednesday",
+    "thursday",
+    "friday",
+    "saturday",
+    "sunday",
+)
+_WEEKDAYS_PTRN = "|".join(WEEKDAYS)
+_OF_MONTH_PTRN = r"(?:\s+of\s+(?:the\s+|each\s+|every\s+)?month)?"
+
+REGEX_NTH_WEEKDAY = re.compile(
+    rf"^(?P<n>[1-4])(?:st|nd|rd|th)\s+(?P<weekday>{_WEEKDAYS_PTRN}){_OF_MONTH_PTRN}$"
+)
+REGEX_LAST_WEEKDAY = re.compile(
+    rf"^last\s+(?P<weekday>{_WEEKDAYS_PTRN}){_OF_MONTH_PTRN}$"
+)
+REGEX_MONTH_DAY = re.compile(
+    rf"^(?P<position>first|last)\s+(?P<business>business\s+)?day{_OF_MONTH_PTRN}$"
+)
+
+MONTH_DAY_OFFSETS = {
+    ("first", False): pd.offsets.MonthBegin,
+    ("last", False): pd.offsets.MonthEnd,
+    ("first", True): pd.offsets.BusinessMonthBegin,
+    ("last", True): pd.offsets.BusinessMonthEnd,
+}
+
+
+def get_extended_offset(freq: str) -> pd.offsets.BaseOffset | None:
+    """Return offset corresponding with an extended frequency expression.
+
+    Extended frequency expressions are case insensitive and can take the
+    following forms (each can optionally be followed by "of month"):
+        "first day" / "last day"
+        "first business day" / "last business day"
+        "<nth> <weekday>", where nth is from "1st" through "4th"
+        "last <weekday>"
+
+    Parameters
+    ----------
+    freq
+        Frequency expression, for example "last business day of month",
+        "2nd Tuesday", "last friday".
+
+    Returns
+    -------
+    pd.offsets.BaseOffset | None
+        Offset corresponding with `freq`, or None if `freq` is not an
+        extended frequency expression.
+
+    Examples
+    --------
+    >>> get_extended_offset("last business day of month")
+    <BusinessMonthEnd>
+    >>> get_extended_offset("2nd Tuesday")
+    <WeekOfMonth: week=1, weekday=1>
+    >>> get_extended_offset("last friday of the month")
+    <LastWeekOfMonth: weekday=4>
+    >>> get_extended_offset("3m") is None
+    True
+    """
+    string = " ".join(freq.lower().split())
+    if match := REGEX_MONTH_DAY.match(string):
+        key = (match["position"], match["business"] is not None)
+        return MONTH_DAY_OFFSETS[key]()
+    if match := REGEX_NTH_WEEKDAY.match(string):
+        weekday = WEEKDAYS.index(match["weekday"])
+        return pd.offsets.WeekOfMonth(week=int(match["n"]) - 1, weekday=weekday)
+    if match := REGEX_LAST_WEEKDAY.match(string):
+        return pd.offsets.LastWeekOfMonth(weekday=WEEKDAYS.index(match["weekday"]))
+    return None
+
+
+@functools.lru_cache(maxsize=512)
+def _compile_freq(freq: str) -> pd.offsets.BaseOffset | str:
+    """Compile a frequency.
+
+    Returns error message in place of offset if `freq` is invalid, such
+    that invalid frequencies are also cached.
+    """
+    if is_simple_freq(freq):
+        return get_simple_offset(freq)
+    if (offset := get_extended_offset(freq)) is not None:
+        return offset
+    try:
+        return pd.tseries.frequencies.to_offset(freq)
+    except ValueError as err:
+        return f"'{freq}' is not a valid frequency: {err}"
+
+
+def compile_freq(freq: str) -> pd.offsets.BaseOffset:
+    """Compile a frequency to an offset.
+
+    Compiled offsets (and invalid frequencies) are cached.
+
+    Parameters
+    ----------
+    freq
+        Frequency, as any of:
+            simple frequency, for example "3m" (see `is_simple_freq`).
+            extended frequency expression, for example "2nd Tuesday"
+            (see `get_extended_offset`).
+            pandas frequency, for example "BME".
+
+    Raises
+    ------
+    ValueError
+        If `freq` is not a valid frequency.
+    """
+    compiled = _compile_freq(freq)
+    if isinstance(compiled, str):
+        raise ValueError(compiled)  # noqa: TRY004
+    return compiled
+
+
 def get_freq_offset(txn: Transaction) -> pd.offsets.BaseOffset:
     """Get offset for a regular transaction.
 
@@ -84,15 +215,56 @@ def get_freq_offset(txn: Transaction) -> pd.offsets.BaseOffset:
     txn
         Transaction to query.
     """
-    freq = txn.meta["freq"]
-    if is_simple_freq(freq):
-        return get_simple_offset(freq)
-    return pd.tseries.frequencies.to_offset(freq)
+    return compile_freq(txn.meta["freq"])
+
+
+class RxInstances(abc.Sequence):
+    """Lazy sequence of instances of a regular expected transaction.
+
+    Instances share the postings, tags and meta of the definition from
+    which they are generated and only the date of each instance is stored.
+    A `Transaction` is materialized only when an instance is accessed.
+
+    Parameters
+    ----------
+    definition
+        Regular expected transaction definition from which instances are
+        generated.
+
+    dates
+        Dates of instances.
+    """
+
+    def __init__(self, definition: Transaction, dates: pd.DatetimeIndex):
+        self.definition = definition
+        self.dates = dates
+
+    def __len__(self) -> int:
+        return len(self.dates)
+
+    def __getitem__(self, index: int | slice) -> Transaction | RxInstances:
+        if isinstance(index, slice):
+            return RxInstances(self.definition, self.dates[index])
+        return self.definition._replace(date=self.dates[index].date())
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, RxInstances):
+            return self.definition == other.definition and self.dates.equals(
+                other.dates
+            )
+        if isinstance(other, abc.Sequence):
+            return list(self) == list(other)
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return f"RxInstances(payee={self.definition.payee!r}, n={len(self)})"
 
 
 def create_entries(
     rx_def: Transaction, end: datetime.date
-) -> tuple[list[Transaction], Transaction | None]:
+) -> tuple[RxInstances | list, Transaction | None]:
     """Create entries and new definition for a regular transaction.
 
     Creates entries from rx_def through `end`. Creates new definition as
@@ -116,7 +288,8 @@ def create_entries(
     -------
     2-tuple
         [0] Transactions from `rx_def` through `end`, inclusive of
-        `rx_def`.
+        `rx_def`. Transactions are returned as a lazy `RxInstances`
+        sequence which materializes each transaction only when accessed.
 
         [1] New definition, as next transaction after `end`, or None if [0]
         is empty.
@@ -131,15 +304,30 @@ def create_entries(
     if len(dates) < 2:
         # no txns dated < end (only new definition date was evaluated)
         return ([], None)
-    txns = []
-    for date in dates:
-        txn = copy.copy(rx_def)
-        txn = txn._replace(date=date.date())
-        txns.append(txn)
-    new_def = txns.pop()
+    txns = RxInstances(rx_def, dates[:-1])
+    new_def = rx_def._replace(date=dates[-1].date())
     return (txns, new_def)
 
 
+def is_dormant(rx_def: Transaction) -> bool:
+    """Query if a definition is dormant.
+
+    A definition is dormant if its final date is earlier than its date,
+    i.e. it will not generate any further transactions.
+    """
+    final = rx_def.meta.get("final")
+    return final is not None and final < rx_def.date
+
+
+def get_generation_end(rx_def: Transaction, end: datetime.date) -> datetime.date:
+    """Get date to which to generate transactions for a definition.
+
+    Returns the earlier of `end` and any final date of `rx_def`.
+    """
+    final = rx_def.meta.get("final")
+    return end if final is None else min(end, final)
+
+
 def remove_after_final(txns: list[Transaction]) -> list[Transaction]:
     """Remove transactions dated after any final date."""
     return [
@@ -149,30 +337,187 @@ def remove_after_final(txns: list[Transaction]) -> list[Transaction]:
     ]
 
 
-def roll_txns(txns: list[Transaction]) -> list[Transaction]:
-    """Roll transactions that roll forwards at weekend.
+ROLL_CONVENTIONS = {
+    True: "following",
+    "following": "following",
+    "preceding": "preceding",
+    "modified-following": "modifiedfollowing",
+    "modified-preceding": "modifiedpreceding",
+}
+
+
+def get_roll_convention(txn: Transaction) -> str | None:
+    """Get the numpy roll convention for a transaction.
+
+    Parameters
+    ----------
+    txn
+        Transaction with 'roll' meta field. Value of field can be any of
+        TRUE (as 'following'), FALSE (do not roll), 'following',
+        'preceding', 'modified-following' or 'modified-preceding'.
+
+    Returns
+    -------
+    str | None
+        Roll convention as the corresponding value of the `roll` parameter
+        of `numpy.busday_offset`. None if transaction does not roll.
+
+    Raises
+    ------
+    RegularTransactionsDefinitionError
+        If value of 'roll' meta field is invalid.
+    """
+    roll = txn.meta["roll"]
+    if roll is False or roll is None:
+        return None
+    key = roll.lower() if isinstance(roll, str) else roll
+    try:
+        return ROLL_CONVENTIONS[key]
+    except KeyError:
+        valid_values = ["TRUE", "FALSE"] + [
+            k for k in ROLL_CONVENTIONS if k is not True
+        ]
+        msg = (
+            f"'{roll}' is not a valid value for the 'roll' meta field of the"
+            f" regular expected transaction '{txn.payee}'. Valid values are:"
+            f" {valid_values}."
+        )
+        raise errors.RegularTransactionsDefinitionError(msg) from None
+
+
+def read_holidays(path: str | Path) -> list[datetime.date]:
+    """Read holiday dates from a file.
+
+    Parameters
+    ----------
+    path
+        Path to file with one date per line in iso format, for example
+        "2022-12-26". Blank lines and anything following a '#' are
+        ignored.
+
+    Raises
+    ------
+    ValueError
+        If any line does not represent a date.
+    """
+    path = Path(path).expanduser()
+    holidays = []
+    with path.open(encoding=config.ENCODING) as file:
+        for i, line in enumerate(file, start=1):
+            if not (string := line.split("#", 1)[0].strip()):
+                continue
+            try:
+                holidays.append(datetime.date.fromisoformat(string))
+            except ValueError:
+                msg = (
+                    f"Line {i} of holidays file '{path}' does not represent a"
+                    f" date in iso format: '{string}'."
+                )
+                raise ValueError(msg) from None
+    return holidays
+
+
+@functools.lru_cache(maxsize=8)
+def _get_busday_calendar(path: Path | None, _mtime_ns: int) -> np.busdaycalendar:
+    """Get business day calendar for a holidays file.
+
+    `_mtime_ns` only serves to key the cache to the file's current
+    content.
+    """
+    holidays = [] if path is None else read_holidays(path)
+    return np.busdaycalendar(weekmask="1111100", holidays=holidays)
+
+
+def get_busday_calendar(holidays: str | Path | None = None) -> np.busdaycalendar:
+    """Get business day calendar.
+
+    Calendars are cached for as long as the holidays file is not modified.
+
+    Parameters
+    ----------
+    holidays
+        Path to file of holiday dates, see `read_holidays`. By default, as
+        the 'holidays' option of the configuration file. If no holidays
+        file is defined then only weekends will be considered as
+        non-business days.
+    """
+    holidays = config.SETTINGS.holidays if holidays is None else holidays
+    if not holidays:
+        return _get_busday_calendar(None, 0)
+    path = Path(holidays).expanduser().resolve()
+    if not path.is_file():
+        msg = f"The holidays file '{path}' does not exist."
+        raise FileNotFoundError(msg)
+    return _get_busday_calendar(path, path.stat().st_mtime_ns)
+
+
+def roll_txns(
+    txns: list[Transaction], calendar: np.busdaycalendar | None = None
+) -> list[Transaction]:
+    """Roll transactions that fall on non-business days.
 
-    Any transaction that is set to roll and falls on a weekend is replaced
-    with a transaction dated on the following Monday.
+    Any transaction that is set to roll and falls on a weekend or holiday
+    is replaced with a transaction dated on a business day in accordance
+    with the transaction's roll convention (see `get_roll_convention`).
+
+    Rolling is evaluated over all transactions together, for each roll
+    convention.
 
     Parameters
     ----------
     txns
         Transactions to be rolled, if applicable.
+
+    calendar
+        Business day calendar. By default, as `get_busday_calendar`.
     """
-    weekend = [6, 7]
-    rtrn = []
-    for txn in txns:
-        date = txn.date
-        if txn.meta["roll"] and (dayofweek := date.isoweekday()) in weekend:
-            new_date = date + datetime.timedelta(days=8 - dayofweek)
-            rolled_txn = txn._replace(date=new_date)
-            rtrn.append(rolled_txn)
-        else:
-            rtrn.append(txn)
+    if calendar is None:
+        calendar = get_busday_calendar()
+    conventions = np.array([get_roll_convention(txn) for txn in txns], dtype=object)
+    dates = np.array([txn.date for txn in txns], dtype="datetime64[D]")
+    rolled = dates.copy()
+    for convention in set(conventions.tolist()) - {None}:
+        mask = conventions == convention
+        rolled[mask] = np.busday_offset(
+            dates[mask], 0, roll=convention, busdaycal=calendar
+        )
+    rtrn = list(txns)
+    for i in np.flatnonzero(rolled != dates):
+        rtrn[i] = txns[i]._replace(date=rolled[i].astype(datetime.date))
     return rtrn
 
 
+def iter_rolled(
+    txns: RxInstances,
+    calendar: np.busdaycalendar | None = None,
+    size: int = utils.CHUNK_SIZE,
+) -> abc.Iterator[Transaction]:
+    """Yield instances of a definition, rolled, in chunks.
+
+    Only one chunk of transactions is materialized at any time.
+
+    Parameters
+    ----------
+    txns
+        Instances of a regular expected transaction definition.
+
+    calendar
+        Business day calendar. By default, as `get_busday_calendar`.
+
+    size
+        Number of transactions to roll at a time.
+
+    Notes
+    -----
+    As all instances of a definition share the same roll convention,
+    rolled instances remain in date order.
+    """
+    if calendar is None:
+        calendar = get_busday_calendar()
+    for i in range(0, len(txns), size):
+        yield from roll_txns(list(txns[i : i + size]), calendar)
+
+
 OTHER_SIDE_ACCOUNTS = {
     "Assets": 0,
     "Income": 1,
@@ -212,10 +557,10 @@ def get_definition_group(definition: Transaction) -> GrouperKey:
         account = posting.account
         if account == bal_sheet_account:
             continue
-        account_type = get_account_type(account)
-        if account_type == config.get_account_root_names()["name_assets"]:
+        key = utils.get_account_root_key(account)
+        if key == "name_assets":
             other_sides.add("Assets")
-        elif account_type == config.get_account_root_names()["name_income"]:
+        elif key == "name_income":
             other_sides.add("Income")
         else:
             other_sides.add("Expenses")
@@ -366,6 +711,205 @@ def compose_new_content(file_key: str, txns: list[Transaction]) -> str:
     return content
 
 
+class EntryIndex:
+    """Index of existing Regular Expected Transactions.
+
+    Entries are indexed by (payee, date).
+
+    Parameters
+    ----------
+    txns
+        Existing Regular Expected Transactions, for example as already
+        loaded from the Regular Expected Transactions Ledger.
+    """
+
+    def __init__(self, txns: abc.Iterable[Transaction]):
+        self._keys = {(txn.payee, txn.date) for txn in txns}
+        self.n_skipped = 0
+
+    def __contains__(self, txn: Transaction) -> bool:
+        return (txn.payee, txn.date) in self._keys
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def skip_existing(
+        self, txns: abc.Iterable[Transaction]
+    ) -> abc.Iterator[Transaction]:
+        """Yield only those transactions that are not already indexed.
+
+        Increments `n_skipped` for each transaction skipped.
+        """
+        for txn in txns:
+            if txn in self:
+                self.n_skipped += 1
+                continue
+            yield txn
+
+
+class DefinitionRegistry(abc.Mapping):
+    """Registry of Regular Expected Transaction definitions.
+
+    Mapping of payee to definition. Definitions are indexed, in a single
+    pass, by case-folded payee, balance sheet account, frequency and final
+    date.
+
+    Parameters
+    ----------
+    defs
+        Regular Expected Transaction definitions.
+
+    source
+        Path to file from which `defs` were loaded. Only used to advise
+        of the source in any error message.
+
+    Raises
+    ------
+    RegularTransactionsDefinitionError
+        If payees of `defs` are not unique. Payee uniqueness is
+        case-INsensitive, i.e. "Rent" and "rent" are considered to be
+        repeated payees, not unique.
+    """
+
+    def __init__(self, defs: abc.Iterable[Transaction], source: Path | None = None):
+        self._defs: dict[str, Transaction] = {}
+        self._folded: dict[str, str] = {}
+        self._by_account: dict[str, list[str]] = defaultdict(list)
+        self._by_freq: dict[str, list[str]] = defaultdict(list)
+        self._no_final: list[str] = []
+        self._dormant: list[str] = []
+        finals: list[tuple[datetime.date, str]] = []
+        repeated: dict[str, None] = {}
+
+        for txn in defs:
+            payee, folded = txn.payee, txn.payee.casefold()
+            if folded in self._folded:
+                repeated[folded] = None
+                continue
+            self._folded[folded] = payee
+            self._defs[payee] = txn
+            for account in utils.get_balance_sheet_accounts(txn):
+                self._by_account[account].append(payee)
+            self._by_freq[txn.meta["freq"]].append(payee)
+            if (final := txn.meta.get("final")) is None:
+                self._no_final.append(payee)
+            else:
+                finals.append((final, payee))
+                if is_dormant(txn):
+                    self._dormant.append(payee)
+
+        if repeated:
+            msg = (
+                "The payee of each regular expected transaction must be unique"
+                " (case insensitive) although the following payees are"
+                f" repeated in the file {source}:\n{list(repeated)}."
+            )
+            raise errors.RegularTransactionsDefinitionError(msg)
+
+        finals.sort()
+        self._final_dates = [final for final, _ in finals]
+        self._final_payees = [payee for _, payee in finals]
+
+    def __getitem__(self, payee: str) -> Transaction:
+        return self._defs[payee]
+
+    def __iter__(self) -> abc.Iterator[str]:
+        return iter(self._defs)
+
+    def __len__(self) -> int:
+        return len(self._defs)
+
+    def __repr__(self) -> str:
+        return f"DefinitionRegistry({list(self._defs)})"
+
+    def find(self, payee: str) -> Transaction | None:
+        """Find a definition by payee, case insensitive.
+
+        Returns None if there is no definition for `payee`.
+        """
+        payee_ = self._folded.get(payee.casefold())
+        return None if payee_ is None else self._defs[payee_]
+
+    @property
+    def accounts(self) -> list[str]:
+        """Balance sheet accounts to which definitions post."""
+        return list(self._by_account)
+
+    @property
+    def dormant(self) -> list[Transaction]:
+        """Definitions that will not generate any further transactions."""
+        return [self._defs[payee] for payee in self._dormant]
+
+    def with_account(self, account: str) -> list[Transaction]:
+        """Get definitions that post to a balance sheet account."""
+        return [self._defs[payee] for payee in self._by_account.get(account, [])]
+
+    def with_freq(self, freq: str) -> list[Transaction]:
+        """Get definitions with a given frequency."""
+        return [self._defs[payee] for payee in self._by_freq.get(freq, [])]
+
+    def with_final_from(self, date: datetime.date) -> list[Transaction]:
+        """Get definitions without a final date or with final date >= `date`."""
+        i = bisect.bisect_left(self._final_dates, date)
+        payees = set(self._no_final).union(self._final_payees[i:])
+        return [txn for payee, txn in self._defs.items() if payee in payees]
+
+    def active_on(
+        self,
+        accounts: str | abc.Iterable[str] | None,
+        start: datetime.date,
+        end: datetime.date,
+    ) -> list[Transaction]:
+        """Get definitions with instances on accounts within a window.
+
+        Instances are considered as dated by frequency, prior to any
+        rolling.
+
+        Parameters
+        ----------
+        accounts
+            Balance sheet accounts. Definitions are only included if they
+            post to any of these accounts or any subaccount. If None then
+            definitions are not filtered by account.
+
+        start
+            First date of window.
+
+        end
+            Last date of window.
+
+        Returns
+        -------
+        list of Transaction
+            Definitions that post to any of `accounts` and will generate
+            at least one instance dated within the window from `start`
+            through `end`, inclusive.
+        """
+        candidates = self.with_final_from(start)
+        if accounts is not None:
+            accounts = (accounts,) if isinstance(accounts, str) else tuple(accounts)
+            payees = {
+                payee
+                for account, payees_ in self._by_account.items()
+                if any(account == a or account.startswith(a + ":") for a in accounts)
+                for payee in payees_
+            }
+            candidates = [txn for txn in candidates if txn.payee in payees]
+
+        rtrn = []
+        for txn in candidates:
+            final = txn.meta.get("final")
+            last = end if final is None else min(end, final)
+            if txn.date > last:
+                continue
+            if txn.date < start:
+                dates = pd.date_range(txn.date, last, freq=get_freq_offset(txn))
+                if not ((dates >= pd.Timestamp(start)).any()):
+                    continue
+            rtrn.append(txn)
+        return rtrn
+
+
 class Admin:
     """Administrator of regular expected transactions.
 
@@ -406,8 +950,9 @@ class Admin:
             self.path_ledger_main = None
         else:
             self.path_ledger_main = utils.get_verified_path(ledger_main)
-            if errors := self._get_main_ledger_errors():
-                raise BeancountLoaderErrors(self.path_ledger_main, errors)
+            errors_, self.main_options = self._load_main_ledger()
+            if errors_:
+                raise BeancountLoaderErrors(self.path_ledger_main, errors_)
             self._stored_content: dict[Path, str] = {}
             for path in [self.path_ledger, self.path_defs]:
                 self._store_content(path)
@@ -418,36 +963,32 @@ class Admin:
         Payee uniqueness is case-INsensitive, i.e. "Rent" and "rent" are
         considered to be repeated payees, not unique.
         """
-        txns = utils.get_unverified_txns(self.path_defs)
-        payees = [txn.payee.lower() for txn in txns]
-        if len(unique_payees := set(payees)) < len(payees):
-            repeated_payees = [
-                payee for payee in unique_payees if payees.count(payee) > 1
-            ]
-            msg = (
-                "The payee of each regular expected transaction must be unique"
-                " (case insensitive) although the following payees are"
-                f" repeated in the file {self.path_defs}:\n{repeated_payees}."
-            )
-            raise errors.RegularTransactionsDefinitionError(msg)
+        _ = self.rx_defs  # verified on creating registry
 
     @functools.cached_property
-    def rx_defs(self) -> dict[str, Transaction]:
+    def rx_defs(self) -> DefinitionRegistry:
         """Last transaction of each Regular Expected Transaction.
 
         Returns
         -------
-        dict
-            key: str
-                Regular Expected Transaction payee.
-
-            value: Transaction
-                Unmodified version of last entry injected for each regular
-                transaction. This will be the transactions as defined on the
-                reg_txn definitions file passed to the constructor.
+        DefinitionRegistry
+            Mapping with:
+                key: str
+                    Regular Expected Transaction payee.
+
+                value: Transaction
+                    Unmodified version of last entry injected for each
+                    regular transaction. This will be the transactions as
+                    defined on the reg_txn definitions file passed to the
+                    constructor.
+
+        Raises
+        ------
+        RegularTransactionsDefinitionError
+            If payees are not unique (case insensitive).
         """
         txns = utils.get_unverified_txns(self.path_defs)
-        return {txn.payee: txn for txn in txns}
+        return DefinitionRegistry(txns, self.path_defs)
 
     @property
     def payees(self) -> list[str]:
@@ -484,6 +1025,19 @@ class Admin:
         stored_content = self._stored_content[path]
         utils.write(path, stored_content)
 
+    def _load_main_ledger(self) -> tuple[list[tuple], dict]:
+        """Load the main ledger.
+
+        Returns
+        -------
+        2-tuple
+            [0] List of beancount errors registered on loading the main
+            beancount ledger. Empty list indicates no errors.
+            [1] Options of the main ledger.
+        """
+        _entries, errors_, options = utils.load_file(self.path_ledger_main)
+        return errors_, options
+
     def _get_main_ledger_errors(self) -> list[tuple]:
         """Errors registered on loading the main ledger.
 
@@ -493,11 +1047,37 @@ class Admin:
             List of beancount errors registered on loading the main
             beancount ledger. Empty list indicates no errors.
         """
-        _entries, errors, _options = loader.load_file(self.path_ledger_main)
-        return errors
+        errors_, _options = self._load_main_ledger()
+        return errors_
+
+    def _create_new_instances(
+        self, end: datetime.date, defs: abc.Iterable[Transaction] | None = None
+    ) -> tuple[list[RxInstances], list[Transaction]]:
+        """Create new instances and defs for all regular expected txns.
+
+        Instances are only created through the earlier of `end` and any
+        definition's final date. Dormant definitions are skipped.
+
+        Returns
+        -------
+        2-tuple
+            [0] List of (lazy) instances of each definition that has any
+            instances through `end`.
+            [1] List of new definitions. Excludes dormant definitions.
+        """
+        instances, new_defs = [], []
+        defs = self.rx_defs.values() if defs is None else defs
+        for rx_def in defs:
+            if is_dormant(rx_def):
+                continue
+            txns, new_def = create_entries(rx_def, get_generation_end(rx_def, end))
+            if txns:
+                instances.append(txns)
+            new_defs.append(new_def if new_def is not None else rx_def)
+        return instances, new_defs
 
     def create_raw_new_entries(
-        self, end: pd.Timestamp
+        self, end: pd.Timestamp, defs: abc.Iterable[Transaction] | None = None
     ) -> tuple[list[Transaction], list[Transaction]]:
         """Create new entries and defs for all regular expected txns.
 
@@ -506,23 +1086,65 @@ class Admin:
         end : pd.Timestamp
             Date to which to create Regular Expected Transactions.
 
+        defs
+            Definitions for which to create entries. By default, all
+            definitions.
+
         Returns
         -------
         2-tuple of list of Transaction
             [0] List of new entries.
-            [1] List of new definitions.
+            [1] List of new definitions. Excludes dormant definitions.
+
+        Notes
+        -----
+        Entries are only created through the earlier of `end` and any
+        definition's final date. Dormant definitions are skipped.
         """
-        entries, new_defs = [], []
-        for rx_def in self.rx_defs.values():
-            txns, new_def = create_entries(rx_def, end)
-            entries += txns
-            new_def = new_def if new_def is not None else rx_def
-            new_defs.append(new_def)
+        instances, new_defs = self._create_new_instances(end, defs)
+        entries = [txn for txns in instances for txn in txns]
         return entries, new_defs
 
+    def _iter_new_txns(
+        self,
+        end: datetime.date,
+        defs: abc.Iterable[Transaction] | None = None,
+    ) -> tuple[abc.Iterator[Transaction], int, list[Transaction]]:
+        """Get data with which to update ledger with new entries.
+
+        New entries are generated lazily, such that entries can be
+        streamed to the ledger.
+
+        Parameters
+        ----------
+        end
+            Date to which to create new Regular Expected Transactions.
+
+        defs
+            Definitions for which to create entries. By default, all
+            definitions.
+
+        Returns
+        -------
+        3-tuple
+            [0] Iterator of new entries to inject to Regular Expected
+            Transactions Ledger. Entries are rolled and ordered by
+            `data.entry_sortkey`.
+            [1] Number of new entries.
+            [2] Updated rx txns definitions based on new entries ([0]).
+        """
+        instances, new_defs = self._create_new_instances(end, defs)
+        calendar = get_busday_calendar()
+        # instances are bound by any final date, only new defs can follow final
+        streams = [iter_rolled(txns, calendar) for txns in instances]
+        new_entries = heapq.merge(*streams, key=data.entry_sortkey)
+        n_entries = sum(len(txns) for txns in instances)
+        return new_entries, n_entries, remove_after_final(new_defs)
+
     def _get_new_txns_data(
         self,
         end: pd.Timestamp,
+        defs: abc.Iterable[Transaction] | None = None,
     ) -> tuple[list[Transaction], list[Transaction]]:
         """Get data with which to update ledger with new entries.
 
@@ -531,17 +1153,18 @@ class Admin:
         end : pd.Timestamp
             Date to which to create new Regular Expected Transactions.
 
+        defs
+            Definitions for which to create entries. By default, all
+            definitions.
+
         Returns
         -------
         2-tuple of lists of Transaction
             [0] New entries to inject to Regular Expected Transactions Ledger.
             [1] Updated rx txns definitions based on new entries ([0]).
         """
-        raw_entries, new_defs = self.create_raw_new_entries(end)
-        new_entries = remove_after_final(raw_entries)
-        new_defs = remove_after_final(new_defs)
-        new_entries = roll_txns(new_entries)
-        return new_entries, new_defs
+        new_entries, _, new_defs = self._iter_new_txns(end, defs)
+        return list(new_entries), new_defs
 
     @property
     def rx_txns(self) -> list[Transaction]:
@@ -584,9 +1207,10 @@ class Admin:
     def _overwrite_beancount_file(
         self,
         path: Path,
-        content: str,
+        content: str | abc.Iterable[str],
         also_revert: list[Path] | None = None,
-    ):
+        n_txns: int | None = None,
+    ) -> bool:
         """Overwrite contents of a regular expected transactions file.
 
         If an error is raised whilst attempting to overwrite then the file
@@ -599,18 +1223,31 @@ class Admin:
             Path to file to be overwritten.
 
         content
-            Content to write to file at `path`.
+            Content to write to file at `path`. Can be passed as an
+            iterable of chunks of content, in which case the chunks are
+            streamed to the file (see `utils.overwrite_file_chunks`).
 
         also_revert
             Paths to other files to revert
 
+        n_txns
+            Only if `content` passed in chunks. Number of transactions the
+            content is expected to parse.
+
+        Returns
+        -------
+        bool
+            True if file overwritten, False if file already had `content`.
+
         Raises
         ------
         BeanaheadOverwriteError
             If any error is raised when overwritting the file.
         """
         try:
-            utils.overwrite_file(path, content)
+            if isinstance(content, str):
+                return utils.overwrite_file(path, content)
+            return utils.overwrite_file_chunks(path, content, n_txns)
         except Exception as err:
             revert_paths = [path]
             if also_revert is not None:
@@ -619,7 +1256,7 @@ class Admin:
                 self._revert_to_stored_content(path_)
             raise BeanaheadWriteError(path, revert_paths) from err
 
-    def add_txns(self, end: str | pd.Timestamp = END_DFLT):
+    def add_txns(self, end: str | datetime.date | None = None) -> int:
         """Add Regular Expected Transactions.
 
         Adds Regular Expected Transactions to the Regular Expected
@@ -633,6 +1270,9 @@ class Admin:
         Either transactions are added or an error is raised an no changes
         are made.
 
+        The definitions file and Regular Expected Transactions Ledger are
+        locked whilst transactions are added.
+
         Parameters
         ----------
         end : datetime.date | str | None, default: `END_DFLT`
@@ -641,6 +1281,11 @@ class Admin:
 
             If passed as string then string should be in iso format, for
             exmaple "2022-09-18".
+
+        Returns
+        -------
+        int
+            Number of transactions added to the ledger.
         """
         if self.path_ledger_main is None:
             raise ValueError(
@@ -650,28 +1295,306 @@ class Admin:
                 " `add_txns`, pass the 'ledger_main' argument to the constructor."
             )
 
+        end = END_DFLT if end is None else end
         if not isinstance(end, datetime.date):
             end = datetime.date.fromisoformat(end)
 
-        new_txns, new_defs = self._get_new_txns_data(end)
-        if not new_txns:
-            utils.print_it(
-                f"There are no new Regular Expected Transactions to add with {end=}."
-            )
-            return
+        with locks.lock_files(self.rx_files), profiling.phase("addrx"):
+            self._refresh()
+            return self._add_txns(end)
 
-        ledger_txns = self.rx_txns + new_txns
+    def _refresh(self):
+        """Refresh state to reflect current content of the rx files."""
+        self.__dict__.pop("rx_defs", None)  # clear any cache
+        for path in self.rx_files:
+            self._store_content(path)
 
-        # ensure all new content checks out before writting anything
-        content_ledger = compose_new_content("rx", ledger_txns)
-        content_defs = compose_new_content("rx_def", new_defs)
+    def _add_txns(self, end: datetime.date) -> int:
+        """Add Regular Expected Transactions through `end`.
 
-        self._overwrite_beancount_file(self.path_ledger, content_ledger)
-        also_revert = [self.path_ledger]
-        self._overwrite_beancount_file(self.path_defs, content_defs, also_revert)
-        self._validate_main_ledger(self.rx_files)
+        Rx files should be locked for the duration of the call.
+
+        Returns
+        -------
+        int
+            Number of transactions added to the ledger.
+        """
+        with profiling.phase("addrx.load") as phase:
+            phase.count(len(self.rx_defs))
+            rx_txns = sorted(self.rx_txns, key=data.entry_sortkey)
+            phase.count(len(rx_txns))
+        if n_dormant := len(self.rx_defs.dormant):
+            utils.print_it(
+                f"{n_dormant} definitions are dormant (the final date is earlier"
+                " than the definition date) and have been skipped."
+            )
+        with profiling.phase("addrx.generate") as phase:
+            new_txns, n_new, new_defs = self._iter_new_txns(end)
+            phase.count(n_new)
+        if not n_new:
+            utils.print_it(
+                f"There are no new Regular Expected Transactions to add with {end=}."
+            )
+            return 0
+
+        # stream the merged, ordered transactions to the ledger, skipping
+        # any new transaction that is already on the ledger
+        index = EntryIndex(rx_txns)
+        new_txns = index.skip_existing(new_txns)
+        # leave the ledger be if every new transaction is already on it (the
+        # definitions are nevertheless advanced)
+        if (first := next(new_txns, None)) is None:
+            chunks_ledger = None
+        else:
+            new_txns = itertools.chain([first], new_txns)
+            ledger_txns = heapq.merge(rx_txns, new_txns, key=data.entry_sortkey)
+            chunks_ledger = utils.iter_new_content("rx", ledger_txns)
+
+        def n_txns() -> int:
+            return len(rx_txns) + n_new - index.n_skipped
+
+        # ensure defs content checks out before writting anything (ledger
+        # content is verified before replacing the ledger file)
+        with profiling.phase("addrx.compose", len(new_defs)):
+            content_defs = compose_new_content("rx_def", new_defs)
+
+        written = []
+        # new entries are generated and composed as streamed to the ledger
+        with profiling.phase("addrx.write") as phase:
+            if chunks_ledger is not None and self._overwrite_beancount_file(
+                self.path_ledger, chunks_ledger, n_txns=n_txns
+            ):
+                written.append(self.path_ledger)
+            if self._overwrite_beancount_file(self.path_defs, content_defs, written):
+                written.append(self.path_defs)
+            phase.count(n_txns())
+        if written:
+            with profiling.phase("addrx.validate"):
+                self._validate_main_ledger(written)
+        if index.n_skipped:
+            utils.print_it(
+                f"{index.n_skipped} transactions were not added as they are already"
+                f" on the ledger '{self.path_ledger.stem}'."
+            )
+        n_added = n_new - index.n_skipped
         utils.print_it(
-            f"{len(new_txns)} transactions have been added to the ledger"
+            f"{n_added} transactions have been added to the ledger"
             f" '{self.path_ledger.stem}'.\nDefinitions on '{self.path_defs.stem}' have"
             f" been updated to reflect the most recent transactions."
         )
+        return n_added
+
+
+@dataclass
+class TenantResult:
+    """Result of adding Regular Expected Transactions for a tenant.
+
+    A tenant is defined by the paths to a Regular Expected Transactions
+    Definitions file, the corresponding Regular Expected Transactions
+    Ledger and the main ledger.
+
+    Attributes
+    ----------
+    defs, ledger, main
+        Paths as defined on the manifest.
+
+    added
+        Number of transactions added to the ledger.
+
+    error
+        Any error raised when adding transactions, None if no error
+        raised.
+
+    seconds_load
+        Seconds to load and validate the tenant's files.
+
+    seconds_add
+        Seconds to add transactions.
+    """
+
+    defs: str
+    ledger: str
+    main: str
+    added: int = 0
+    error: Exception | None = None
+    seconds_load: float = 0.0
+    seconds_add: float = 0.0
+
+    @property
+    def ok(self) -> bool:
+        """Query if transactions were added without error."""
+        return self.error is None
+
+    @property
+    def seconds(self) -> float:
+        """Total seconds to administer tenant."""
+        return self.seconds_load + self.seconds_add
+
+
+def read_manifest(path: str | Path) -> list[tuple[str, str, str]]:
+    """Read a manifest of tenants.
+
+    Parameters
+    ----------
+    path
+        Path to manifest file. If the file has a '.json' suffix then the
+        content should be a JSON array with each item representing a
+        tenant as either an array of the paths [defs, ledger, main] or an
+        object with keys "defs", "ledger" and "main".
+
+        Otherwise the file should be a csv file with each row representing
+        a tenant with three columns: defs, ledger, main. Blank rows and
+        rows starting with '#' are ignored.
+
+        Relative paths included to the manifest are evaluated as relative
+        to the directory containing the manifest.
+
+    Returns
+    -------
+    list of 3-tuple of str
+        Paths to each tenant's files (defs, ledger, main).
+    """
+    path = Path(path)
+    if path.suffix == ".json":
+        items = json.loads(path.read_text(config.ENCODING))
+        rows = [
+            [item["defs"], item["ledger"], item["main"]]
+            if isinstance(item, dict)
+            else item
+            for item in items
+        ]
+    else:
+        with path.open(encoding=config.ENCODING, newline="") as file:
+            rows = [
+                row
+                for row in csv.reader(file, skipinitialspace=True)
+                if row and not row[0].startswith("#")
+            ]
+
+    manifest = []
+    for i, row in enumerate(rows):
+        if len(row) != 3:
+            msg = (
+                f"Each tenant of a manifest must be defined with three paths"
+                f" (defs, ledger, main) although tenant {i} of manifest '{path}'"
+                f" is defined as {row}."
+            )
+            raise ValueError(msg)
+        paths = (str(path.parent / p.strip()) for p in row)
+        manifest.append(tuple(paths))
+    return manifest
+
+
+def _verify_tenant_root_names(admin: Admin):
+    """Verify a tenant's main ledger uses the set account root names."""
+    names = config.get_account_root_names()
+    names_main = {k: admin.main_options[k] for k in names}
+    if names_main != names:
+        msg = (
+            f"The account root names defined on the main ledger"
+            f" '{admin.path_ledger_main}' ({names_main}) differ from those set"
+            f" for the batch ({names})."
+        )
+        raise ValueError(msg)
+
+
+def _add_tenant_txns(
+    defs: str, ledger: str, main: str, end: datetime.date
+) -> TenantResult:
+    """Add Regular Expected Transactions for a single tenant of a batch."""
+    result = TenantResult(defs, ledger, main)
+    start = time.perf_counter()
+    try:
+        admin = Admin(defs, ledger, main)
+        _verify_tenant_root_names(admin)
+    except Exception as err:  # noqa: BLE001
+        result.error = err
+        result.seconds_load = time.perf_counter() - start
+        return result
+    result.seconds_load = time.perf_counter() - start
+
+    start = time.perf_counter()
+    try:
+        result.added = admin.add_txns(end)
+    except Exception as err:  # noqa: BLE001
+        result.error = err
+    result.seconds_add = time.perf_counter() - start
+    return result
+
+
+def add_txns_batch(
+    manifest: abc.Iterable[tuple[str, str, str]],
+    end: str | datetime.date | None = None,
+    workers: int | None = None,
+) -> list[TenantResult]:
+    """Add Regular Expected Transactions for a batch of tenants.
+
+    Transactions are added for each tenant within the current process,
+    such that imports and configuration settings are shared. Tenants are
+    administered concurrently by a pool of worker threads. Files of each
+    tenant are locked whilst the tenant's transactions are added.
+
+    All tenants must use the currently set account root names, see
+    `config.set_account_root_names`. Tenants for which the main ledger
+    defines different account root names will not be administered.
+
+    An error raised when administering any tenant does not affect other
+    tenants. Any such error is recorded to the tenant's result.
+
+    Parameters
+    ----------
+    manifest
+        Tenants to administer, each as the paths to the tenant's (defs,
+        ledger, main) files. Paths are as for the corresponding parameters
+        of `Admin`. See `read_manifest` to read a manifest from file.
+
+    end : datetime.date | str | None, default: `END_DFLT`
+        Date to which to add new Regular Expected Transactions, as for
+        `Admin.add_txns`.
+
+    workers
+        Maximum number of worker threads. By default, the number of CPUs
+        or number of tenants, if fewer.
+
+    Returns
+    -------
+    list of TenantResult
+        Result for each tenant, in the order of `manifest`.
+    """
+    end = END_DFLT if end is None else end
+    if not isinstance(end, datetime.date):
+        end = datetime.date.fromisoformat(end)
+    manifest = list(manifest)
+    if not manifest:
+        return []
+    if workers is None:
+        workers = min(len(manifest), os.cpu_count() or 1)
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = [
+            executor.submit(_add_tenant_txns, *tenant, end) for tenant in manifest
+        ]
+        return [future.result() for future in futures]
+
+
+def print_batch_report(results: list[TenantResult]):
+    """Print report on the results of a batch.
+
+    Parameters
+    ----------
+    results
+        Results, as returned by `add_txns_batch`.
+    """
+    lines = []
+    for result in results:
+        prefix = f"{result.ledger} ({result.seconds:.2f}s): "
+        if result.ok:
+            lines.append(prefix + f"{result.added} transactions added.")
+        else:
+            lines.append(prefix + f"FAILED - {result.error!r}")
+    n_failed = sum(not result.ok for result in results)
+    total = sum(result.added for result in results)
+    lines.append(
+        f"{total} transactions have been added for {len(results) - n_failed} of"
+        f" {len(results)} tenants. {n_failed} tenants failed."
+    )
+    utils.print_it("\n".join(lines))
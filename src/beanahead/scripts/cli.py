@@ -8,10 +8,27 @@ the corresponding underlying function is located.
 """
 
 import argparse
+import contextlib
 import datetime
+import sys
+import tempfile
+from pathlib import Path
 
 import beanahead
-from beanahead import config, expired, reconcile, rx_txns, utils
+from beanahead import (
+    config,
+    daemon,
+    expired,
+    forecast,
+    metrics,
+    profiling,
+    reconcile,
+    rx_txns,
+    stats,
+    utils,
+    watch,
+    workloads,
+)
 
 
 def config_func(args: argparse.Namespace):
@@ -36,6 +53,29 @@ def add_rx_txns(args: argparse.Namespace):
     admin.add_txns(args.end)
 
 
+def add_rx_txns_batch(args: argparse.Namespace):
+    """Pass through command line args to add rx txns for a batch of tenants."""
+    manifest = rx_txns.read_manifest(args.manifest)
+    results = rx_txns.add_txns_batch(manifest, args.end, args.workers)
+    rx_txns.print_batch_report(results)
+    if not all(result.ok for result in results):
+        sys.exit(1)
+
+
+def project(args: argparse.Namespace):
+    """Pass through command line args to project balances."""
+    admin = rx_txns.Admin(args.defs, args.ledger, args.main)
+    projection = forecast.project_balances(
+        admin,
+        x_ledgers=args.xledgers,
+        end=args.end,
+        start=args.start,
+        freq=args.freq,
+        accounts=args.accounts,
+    )
+    forecast.print_projection(projection, args.output)
+
+
 def recon(args: argparse.Namespace):
     """Pass through command line args to reconcile new transactions."""
     reconcile.reconcile_new_txns(
@@ -47,9 +87,23 @@ def recon(args: argparse.Namespace):
     )
 
 
+def watch_dir(args: argparse.Namespace):
+    """Pass through command line args to watch a directory."""
+    watch.watch(
+        dirpath=args.dirpath,
+        ledgers=args.ledgers,
+        dest=args.dest,
+        interval=args.interval,
+        settle=args.settle,
+        remove=not args.keep,
+        ascending=not args.reverse,
+        matches=args.matches,
+    )
+
+
 def exp(args: argparse.Namespace):
     """Pass through command line args to administer expired transactions."""
-    expired.admin_expired_txns(args.ledgers)
+    expired.admin_expired_txns(args.ledgers, args.rule, args.auto)
 
 
 def inj(args: argparse.Namespace):
@@ -57,7 +111,31 @@ def inj(args: argparse.Namespace):
     utils.inject_txns(args.injection, args.ledger)
 
 
-def main():
+def serve(args: argparse.Namespace):
+    """Pass through command line args to serve requests as a daemon."""
+    daemon.serve(args.socket)
+
+
+def stats_func(args: argparse.Namespace):
+    """Pass through command line args to report statistics of files."""
+    stats_ = stats.get_stats(args.files, args.end, args.workers)
+    stats.print_stats(stats_)
+
+
+def bench(args: argparse.Namespace):
+    """Pass through command line args to benchmark workloads."""
+    scale = workloads.get_scale(args.txns, args.seed)
+    with contextlib.ExitStack() as stack:
+        dirpath = args.dir
+        if dirpath is None:
+            dirpath = stack.enter_context(tempfile.TemporaryDirectory())
+        results = workloads.bench(
+            args.workloads, scale, dirpath, args.repeat, not args.no_memory
+        )
+    workloads.print_bench_report(results)
+
+
+def main():  # noqa: PLR0915
     """Entry point for calls from the command line."""
     parser = argparse.ArgumentParser(
         description=(
@@ -72,6 +150,41 @@ def main():
         "--version", "-V", action="version", version=beanahead.__version__
     )
 
+    # Parent parser of options common to all subcommands
+    common_parser = argparse.ArgumentParser(add_help=False)
+    common_parser.add_argument(
+        "--profile",
+        help=(
+            "print a report of the time spent in each phase of the\n"
+            "operation to stderr. FORMAT can be 'flat' (default) or 'json'."
+        ),
+        nargs="?",
+        const="flat",
+        default=None,
+        choices=profiling.REPORT_FORMATS,
+        metavar="FORMAT",
+    )
+    common_parser.add_argument(
+        "--profile-memory",
+        help=(
+            "include to the --profile report the peak and retained memory\n"
+            "of each phase. Implies --profile. Slows the operation."
+        ),
+        action="store_true",
+    )
+    common_parser.add_argument(
+        "--metrics",
+        help=(
+            "path to a local file to which to write metrics, for example\n"
+            "the number of reconciliation candidates and bytes written.\n"
+            "Written as JSON if FILE has a '.json' suffix, otherwise in\n"
+            "the Prometheus text format."
+        ),
+        default=None,
+        type=Path,
+        metavar="FILE",
+    )
+
     subparsers = parser.add_subparsers(
         title="subcommands",
         dest="subcmd",
@@ -81,6 +194,7 @@ def main():
     # Subparser for config
     parser_config = subparsers.add_parser(
         "config",
+        parents=[common_parser],
         description="Configuration settings",
         help="print the location of the configuration file.",
     )
@@ -95,6 +209,7 @@ def main():
     # Subparser for make_file
     parser_make = subparsers.add_parser(
         "make",
+        parents=[common_parser],
         description="Make a new beanahead ledger or definitions file.",
         help="make a new beanahead file.",
         epilog=(
@@ -148,6 +263,7 @@ def main():
     # Subparser for add_rx_txns
     parser_addrx = subparsers.add_parser(
         "addrx",
+        parents=[common_parser],
         description=(
             "Add Regular Expected Transactions to a Regular Expected"
             " Transactions Ledger."
@@ -188,9 +304,136 @@ def main():
     )
     parser_addrx.set_defaults(func=add_rx_txns)
 
+    # Subparser for add_rx_txns_batch
+    parser_addrx_batch = subparsers.add_parser(
+        "addrx-batch",
+        parents=[common_parser],
+        description=(
+            "Add Regular Expected Transactions for each tenant of a manifest."
+        ),
+        help="add Regular Expected Transactions for a batch of tenants.",
+        epilog=(
+            "Documentation of underlying function:"
+            f"\n\n{rx_txns.add_txns_batch.__doc__}"
+            "\nDocumentation of manifest:"
+            f"\n\n{rx_txns.read_manifest.__doc__}"
+        ),
+        formatter_class=argparse.RawTextHelpFormatter,
+    )
+    parser_addrx_batch.add_argument(
+        "manifest",
+        help=(
+            "path to manifest file defining the (defs, ledger, main)"
+            "\nfiles of each tenant, as csv or json."
+        ),
+    )
+    parser_addrx_batch.add_argument(
+        *["-e", "--end"],
+        help=(
+            "date to which to create new transactions, iso format,"
+            f"e.g. '2020-09-30'. Default {rx_txns.END_DFLT}."
+        ),
+        default=rx_txns.END_DFLT,
+        type=datetime.date.fromisoformat,
+        metavar="",
+    )
+    parser_addrx_batch.add_argument(
+        *["-w", "--workers"],
+        help="maximum number of worker threads. Default number of CPUs.",
+        type=int,
+        metavar="",
+    )
+    parser_addrx_batch.add_argument(
+        *["-m", "--main"],
+        help=(
+            "Path to a main Ledger file that defines the account root\n"
+            "names used by all tenants. Only required if account root\n"
+            "names are not the default values.\n"
+        ),
+        metavar="",
+    )
+    parser_addrx_batch.set_defaults(func=add_rx_txns_batch)
+
+    # Subparser for project
+    parser_project = subparsers.add_parser(
+        "project",
+        parents=[common_parser],
+        description=(
+            "Project balances of balance sheet accounts from expected"
+            " transactions. No ledger is written to."
+        ),
+        help="project balances.",
+        epilog=(
+            "Documentation of underlying function:"
+            f"\n\n{forecast.project_balances.__doc__}"
+        ),
+        formatter_class=argparse.RawTextHelpFormatter,
+    )
+    parser_project.add_argument(
+        "defs",
+        help="path to Regular Expected Transactions Definition file.",
+    )
+    parser_project.add_argument(
+        "ledger",
+        metavar="rx-ledger",
+        help="path to Regular Expected Transactions Ledger file.",
+    )
+    parser_project.add_argument(
+        "main",
+        metavar="main-ledger",
+        help="path to main Ledger file.",
+    )
+    parser_project.add_argument(
+        *["-x", "--xledgers"],
+        nargs="+",
+        help=(
+            "paths to any further Expected Transactions Ledgers that are"
+            "\nnot included to the main ledger."
+        ),
+        metavar="",
+    )
+    parser_project.add_argument(
+        *["-e", "--end"],
+        help=(
+            "date to which to project balances, iso format,"
+            f"e.g. '2020-09-30'. Default {rx_txns.END_DFLT}."
+        ),
+        default=rx_txns.END_DFLT,
+        type=datetime.date.fromisoformat,
+        metavar="",
+    )
+    parser_project.add_argument(
+        *["-s", "--start"],
+        help="date from which to project balances, iso format. Default today.",
+        type=datetime.date.fromisoformat,
+        metavar="",
+    )
+    parser_project.add_argument(
+        *["-f", "--freq"],
+        help=(
+            "frequency of projection dates as a pandas frequency, e.g."
+            "\n'W' for weekly, 'ME' for month end. Default 'D' (daily)."
+        ),
+        default="D",
+        metavar="",
+    )
+    parser_project.add_argument(
+        *["-a", "--accounts"],
+        nargs="+",
+        help="accounts to project (includes subaccounts). Default all.",
+        metavar="",
+    )
+    parser_project.add_argument(
+        *["-o", "--output"],
+        help="path to csv file to which to export projection. Default print.",
+        metavar="",
+    )
+    parser_project.set_defaults(func=project)
+
     # Subparser for recon
     parser_recon = subparsers.add_parser(
         "recon",
+        parents=[common_parser],
         description=("Reconcile new transactions with expected transactions."),
         help="reconcile new transactions.",
         epilog=(
@@ -241,9 +484,94 @@ def main():
     )
     parser_recon.set_defaults(func=recon)
 
+    # Subparser for watch
+    parser_watch = subparsers.add_parser(
+        "watch",
+        parents=[common_parser],
+        description=(
+            "Watch a directory and reconcile new extraction files as they arrive."
+        ),
+        help="watch a directory and reconcile new files.",
+        epilog=(
+            f"Documentation of underlying module:\n\n{watch.__doc__}"
+            "\nDocumentation of underlying function:"
+            f"\n\n{reconcile.reconcile_new_txns.__doc__}"
+        ),
+        formatter_class=argparse.RawTextHelpFormatter,
+    )
+    parser_watch.add_argument(
+        "dirpath",
+        help="path to directory to watch for new extraction files.",
+    )
+    parser_watch.add_argument(
+        "ledgers",
+        nargs="+",
+        help=(
+            "paths to one or more Regular Expected Transactions"
+            "\nLedgers against which to reconcile incoming"
+            "\ntransactions."
+        ),
+    )
+    parser_watch.add_argument(
+        *["-d", "--dest"],
+        help=(
+            "path to directory to which to output reconciled entries."
+            f"\nBy default, the '{watch.DEST_DIRNAME_DFLT}' subdirectory of dirpath."
+        ),
+        metavar="",
+    )
+    parser_watch.add_argument(
+        *["-i", "--interval"],
+        help=f"seconds between polls. Default {watch.INTERVAL_DFLT}.",
+        default=watch.INTERVAL_DFLT,
+        type=float,
+        metavar="",
+    )
+    parser_watch.add_argument(
+        *["-s", "--settle"],
+        help=(
+            "seconds for which a new file must remain unchanged before"
+            f"\nit is reconciled. Default {watch.SETTLE_DFLT}."
+        ),
+        default=watch.SETTLE_DFLT,
+        type=float,
+        metavar="",
+    )
+    parser_watch.add_argument(
+        *["-k", "--keep", "--no-remove"],
+        action="store_true",
+        help=(
+            "flag to not remove reconciled transactions from ledgers.\n"
+            "(By default reconciled transactions will be removed.)"
+        ),
+    )
+    parser_watch.add_argument(
+        *["-r", "--reverse"],
+        action="store_true",
+        help=(
+            "flag to write updated entries in descending order. By"
+            "\ndefault will be written in ascending order."
+        ),
+    )
+    parser_watch.add_argument(
+        *["-m", "--matches"],
+        help=(
+            "policy by which to decide potential matches. 'fail' to fail"
+            "\nany file for which a match is found (leaving it to be"
+            "\nreconciled with 'recon'), 'accept' to accept the first"
+            "\nmatch offered, 'skip' to reject all matches or 'prompt'"
+            f"\nto request a decision. Default '{watch.MATCH_POLICY_DFLT}'."
+        ),
+        default=watch.MATCH_POLICY_DFLT,
+        choices=watch.MATCH_POLICIES,
+        metavar="",
+    )
+    parser_watch.set_defaults(func=watch_dir)
+
     # Subparser for expired
     parser_exp = subparsers.add_parser(
         "exp",
+        parents=[common_parser],
         description=("Administer expired expected transactions."),
         help="administer expired expected transactions.",
         epilog=(
@@ -261,11 +589,31 @@ def main():
             "\nagainst which to administer expired transactions."
         ),
     )
+    parser_exp.add_argument(
+        "--rule",
+        action="append",
+        metavar="RULE",
+        help=(
+            "rule defining action to take on matching expired transactions,"
+            "\nfor example 'remove,days=30,tag=trip'. Can be passed multiple"
+            "\ntimes, the first rule to match a transaction is applied. By"
+            "\ndefault, rules defined by the 'exp-rules' configuration option."
+        ),
+    )
+    parser_exp.add_argument(
+        "--auto",
+        action="store_true",
+        help=(
+            "flag to administer expired transactions without requesting any"
+            "\ninput. Transactions not matched by a rule are left as is."
+        ),
+    )
     parser_exp.set_defaults(func=exp)
 
     # Subparser for inject
     parser_inject = subparsers.add_parser(
         "inject",
+        parents=[common_parser],
         description=("Append new transactions to a ledger."),
         help="inject new transactions.",
         epilog=(
@@ -276,10 +624,11 @@ def main():
 
     parser_inject.add_argument(
         "injection",
+        nargs="+",
         help=(
-            "path to beancount file containing the new entries to be"
-            "\ninjected. Can be absolute or relative to the current"
-            "\nworking directory."
+            "paths to one or more beancount files containing the new"
+            "\nentries to be injected. Can be absolute or relative to the"
+            "\ncurrent working directory."
         ),
     )
 
@@ -293,6 +642,129 @@ def main():
     )
     parser_inject.set_defaults(func=inj)
 
+    # Subparser for serve
+    parser_serve = subparsers.add_parser(
+        "serve",
+        parents=[common_parser],
+        description=(
+            "Serve 'addrx', 'recon', 'exp' and 'inject' requests from a"
+            "\nlong-running process listening on a Unix socket."
+        ),
+        help="serve requests as a daemon.",
+        epilog=f"Documentation of daemon:\n\n{daemon.__doc__}",
+        formatter_class=argparse.RawTextHelpFormatter,
+    )
+    parser_serve.add_argument(
+        *["-s", "--socket"],
+        help=f"path to socket. Default '{daemon.SOCKET_PATH_DFLT}'.",
+        default=daemon.SOCKET_PATH_DFLT,
+        type=Path,
+        metavar="",
+    )
+    parser_serve.set_defaults(func=serve)
+
+    # Subparser for stats
+    parser_stats = subparsers.add_parser(
+        "stats",
+        parents=[common_parser],
+        description=(
+            "Report statistics on the health and cost of beancount files."
+            "\n\nFlags beanahead files that are growing costly to rewrite."
+        ),
+        help="report statistics of beancount files.",
+        epilog=f"Documentation of statistics:\n\n{stats.__doc__}",
+        formatter_class=argparse.RawTextHelpFormatter,
+    )
+    parser_stats.add_argument(
+        "files",
+        nargs="+",
+        help=(
+            "paths to one or more beancount files, for example the"
+            "\nbeanahead files and the main ledger."
+        ),
+    )
+    parser_stats.add_argument(
+        *["-e", "--end"],
+        help=(
+            "horizon date through which to count instances of Regular"
+            "\nExpected Transaction definitions, iso format, e.g."
+            f"\n'2020-09-30'. Default {rx_txns.END_DFLT}."
+        ),
+        default=rx_txns.END_DFLT,
+        type=datetime.date.fromisoformat,
+        metavar="",
+    )
+    parser_stats.add_argument(
+        *["-w", "--workers"],
+        help="maximum number of worker threads. Default number of CPUs.",
+        type=int,
+        metavar="",
+    )
+    parser_stats.set_defaults(func=stats_func)
+
+    # Subparser for bench
+    parser_bench = subparsers.add_parser(
+        "bench",
+        description=(
+            "Benchmark beanahead commands against synthetic ledgers."
+            "\n\nFor each workload reports the throughput (entries processed"
+            "\nper second, based on the median run time), percentiles of the"
+            "\nrun times and the peak memory allocated by a run."
+        ),
+        help="benchmark commands against synthetic ledgers.",
+        epilog=f"Documentation of workloads:\n\n{workloads.__doc__}",
+        formatter_class=argparse.RawTextHelpFormatter,
+    )
+    parser_bench.add_argument(
+        *["-w", "--workloads"],
+        help=(
+            f"workloads to benchmark, any of {list(workloads.WORKLOADS)}.\nDefault all."
+        ),
+        nargs="+",
+        default=list(workloads.WORKLOADS),
+        choices=list(workloads.WORKLOADS),
+        metavar="",
+    )
+    parser_bench.add_argument(
+        *["-t", "--txns"],
+        help=(
+            "number of transactions on the synthetic main ledger. Other\n"
+            "ledgers are sized in proportion. Default 10000."
+        ),
+        default=10_000,
+        type=int,
+        metavar="",
+    )
+    parser_bench.add_argument(
+        *["-r", "--repeat"],
+        help="number of timed runs of each workload. Default 5.",
+        default=5,
+        type=int,
+        metavar="",
+    )
+    parser_bench.add_argument(
+        "--seed",
+        help="seed from which to generate synthetic ledgers. Default 0.",
+        default=0,
+        type=int,
+        metavar="",
+    )
+    parser_bench.add_argument(
+        *["-d", "--dir"],
+        help=(
+            "directory to which to generate synthetic ledgers. By default,\n"
+            "a temporary directory that is removed after benchmarking."
+        ),
+        default=None,
+        metavar="",
+    )
+    parser_bench.add_argument(
+        "--no-memory",
+        help="flag to not measure peak memory.",
+        action="store_true",
+    )
+    parser_bench.set_defaults(func=bench)
+
     args = parser.parse_args()
 
     # Set root account names
@@ -300,7 +772,18 @@ def main():
         utils.set_account_root_names(args.main)
 
     # Call pass-through function corresponding with subcommand
-    args.func(args)
+    profile = getattr(args, "profile", None)
+    memory = getattr(args, "profile_memory", False)
+    if memory and profile is None:
+        profile = "flat"
+    try:
+        with profiling.profile(memory) if profile else contextlib.nullcontext():
+            args.func(args)
+    finally:
+        if profile:
+            profiling.print_report(profile)
+        if getattr(args, "metrics", None) is not None:
+            metrics.write_metrics(args.metrics)
 
 
 if __name__ == "__main__":
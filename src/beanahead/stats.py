@@ -0,0 +1,329 @@
+"""Diagnostics of the health and cost of beancount files.
+
+`get_stats` gathers statistics on each of a set of beancount files, for
+example the beanahead files and the main ledger that includes them:
+    - size of the file.
+    - number of entries of each type defined on the file.
+    - time to parse the file and time to load it. Loading a file includes
+        loading any files it includes and running any plugins.
+    - number of errors raised when loading the file.
+    - Regular Expected Transaction Definition files: number of
+        definitions, number of dormant definitions and number of instances
+        that would be generated through a horizon date.
+    - Expected Transaction Ledgers: number of expired transactions.
+
+Beanahead files are identified from their header (see `utils.scan_header`)
+rather than by loading them. Files are parsed and loaded concurrently by a
+pool of worker threads.
+
+Beanahead files are rewritten whenever they are updated, such that the
+cost of each update grows with the file. A beanahead file is flagged as
+'costly' if either its size or the time to load it reaches a threshold
+(see `COSTLY_BYTES` and `COSTLY_SECONDS`).
+"""
+
+from __future__ import annotations
+
+import datetime
+import os
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+from beancount import loader
+from beancount.parser import parser
+
+from . import profiling, rx_txns, utils
+from .plugins.rx_txn_plugin import RxMetaError
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+    from beancount.core.data import Transaction
+
+COSTLY_BYTES = 2**20
+COSTLY_SECONDS = 0.5
+
+
+@dataclass
+class FileStats:
+    """Statistics of a beancount file.
+
+    Attributes
+    ----------
+    path
+        Path to file.
+
+    file_key
+        Key of `utils.FILE_CONFIG` corresponding with the nature of the
+        file, None if the file is not a beanahead file.
+
+    size
+        Size of file, in bytes.
+
+    entries
+        Number of entries defined on the file, by entry type. Does not
+        include entries of any included file.
+
+    parse_seconds
+        Time to parse the file.
+
+    load_seconds
+        Time to load the file, including any included files.
+
+    n_errors
+        Number of errors raised when loading the file.
+
+    n_expired
+        Number of expired transactions. None if file is not an Expected
+        Transactions Ledger.
+
+    n_defs
+        Number of definitions. None if file is not a Regular Expected
+        Transaction Definitions file.
+
+    n_dormant
+        Number of dormant definitions. None if file is not a Regular
+        Expected Transaction Definitions file.
+
+    instances
+        Number of instances that each definition would generate through
+        the horizon date, by payee (summed over definitions with the same
+        payee). Dormant definitions are excluded. None
+        if file is not a Regular Expected Transaction Definitions file or
+        if any definition has an invalid meta field.
+
+    costly
+        True if file is a beanahead file that has grown costly to rewrite.
+    """
+
+    path: Path
+    file_key: str | None
+    size: int
+    entries: dict[str, int]
+    parse_seconds: float
+    load_seconds: float
+    n_errors: int
+    n_expired: int | None = None
+    n_defs: int | None = None
+    n_dormant: int | None = None
+    instances: dict[str, int] | None = None
+    costly: bool = False
+
+    @property
+    def n_entries(self) -> int:
+        """Total number of entries defined on the file."""
+        return sum(self.entries.values())
+
+    @property
+    def n_instances(self) -> int | None:
+        """Total number of instances that definitions would generate."""
+        return None if self.instances is None else sum(self.instances.values())
+
+
+def count_instances(defs: list[Transaction], end: datetime.date) -> dict[str, int]:
+    """Count instances that definitions would generate through a date.
+
+    Parameters
+    ----------
+    defs
+        Regular Expected Transaction definitions.
+
+    end
+        Date through which to count instances. Instances of a definition
+        are only counted through the earlier of `end` and any final date
+        of the definition.
+
+    Returns
+    -------
+    dict
+        key: str
+            Payee of definition.
+        value: int
+            Number of instances. Summed over all definitions with the
+            payee, such that no instances are lost if payees are repeated.
+            Dormant definitions are excluded.
+    """
+    rtrn: Counter[str] = Counter()
+    for rx_def in defs:
+        if rx_txns.is_dormant(rx_def):
+            continue
+        instances, _ = rx_txns.create_entries(
+            rx_def, rx_txns.get_generation_end(rx_def, end)
+        )
+        rtrn[rx_def.payee] += len(instances)
+    return dict(rtrn)
+
+
+def get_file_stats(
+    path: Path,
+    end: datetime.date,
+    max_bytes: int = COSTLY_BYTES,
+    max_seconds: float = COSTLY_SECONDS,
+) -> FileStats:
+    """Get statistics of a beancount file.
+
+    Parameters
+    ----------
+    path
+        Path to beancount file. Path is NOT verified.
+
+    end
+        Horizon date through which to count instances of any
+        Regular Expected Transaction definitions.
+
+    max_bytes
+        Size, in bytes, from which a beanahead file is flagged as costly.
+
+    max_seconds
+        Load time, in seconds, from which a beanahead file is flagged as
+        costly.
+    """
+    file_key = utils.get_header_file_key(path)
+    size = path.stat().st_size
+
+    start = time.perf_counter()
+    with profiling.phase("stats.parse") as phase:
+        parsed, _, _ = parser.parse_file(str(path))
+        phase.count(len(parsed))
+    parse_seconds = time.perf_counter() - start
+    entries = Counter(type(entry).__name__ for entry in parsed)
+
+    start = time.perf_counter()
+    with profiling.phase("stats.load") as phase:
+        loaded, errors, _ = loader.load_file(path)
+        phase.count(len(loaded))
+    load_seconds = time.perf_counter() - start
+
+    stats = FileStats(
+        path,
+        file_key,
+        size,
+        dict(sorted(entries.items())),
+        parse_seconds,
+        load_seconds,
+        len(errors),
+    )
+    if file_key in utils.LEDGER_FILE_KEYS:
+        txns = utils.extract_txns(loaded)
+        stats.n_expired = len(utils.split_expired_txns(txns)[0])
+    elif file_key == "rx_def":
+        defs = utils.extract_txns(loaded)
+        stats.n_defs = len(defs)
+        stats.n_dormant = sum(rx_txns.is_dormant(rx_def) for rx_def in defs)
+        if not any(isinstance(err, RxMetaError) for err in errors):
+            stats.instances = count_instances(defs, end)
+    if file_key is not None:
+        stats.costly = size >= max_bytes or load_seconds >= max_seconds
+    return stats
+
+
+def get_stats(
+    filepaths: list[str],
+    end: str | datetime.date | None = None,
+    workers: int | None = None,
+    max_bytes: int = COSTLY_BYTES,
+    max_seconds: float = COSTLY_SECONDS,
+) -> list[FileStats]:
+    """Get statistics of beancount files.
+
+    Files are parsed and loaded concurrently by a pool of worker threads.
+
+    Parameters
+    ----------
+    filepaths
+        Paths to beancount files, either absolute or relative to the cwd.
+        It is not necessary to include the default extension.
+
+    end : datetime.date | str | None, default: `rx_txns.END_DFLT`
+        Horizon date through which to count instances of any Regular
+        Expected Transaction definitions.
+
+    workers
+        Maximum number of worker threads. By default, the number of CPUs
+        or number of files, if fewer.
+
+    max_bytes
+        Size, in bytes, from which a beanahead file is flagged as costly.
+
+    max_seconds
+        Load time, in seconds, from which a beanahead file is flagged as
+        costly.
+
+    Returns
+    -------
+    list of FileStats
+        Statistics of each file, in the order of `filepaths`.
+
+    Raises
+    ------
+    BeancountFileExistsError
+        If any path does not represent a beancount file.
+    """
+    end = rx_txns.END_DFLT if end is None else end
+    if not isinstance(end, datetime.date):
+        end = datetime.date.fromisoformat(end)
+    paths = [utils.get_verified_path(filepath) for filepath in filepaths]
+    if not paths:
+        return []
+    if workers is None:
+        workers = min(len(paths), os.cpu_count() or 1)
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = [
+            executor.submit(get_file_stats, path, end, max_bytes, max_seconds)
+            for path in paths
+        ]
+        return [future.result() for future in futures]
+
+
+def _format_optional(value: int | None) -> str:
+    return "-" if value is None else str(value)
+
+
+def format_stats(stats: list[FileStats]) -> str:
+    """Format statistics of beancount files as a table.
+
+    Files flagged as costly are marked with an asterisk. Times are
+    reported in milliseconds.
+    """
+    width = max([len("file"), *(len(s.path.name) + 1 for s in stats)])
+    header = (
+        f"{'file':<{width}}  {'kind':<6}  {'KiB':>9}  {'entries':>8}"
+        f"  {'parse ms':>9}  {'load ms':>9}  {'errors':>6}  {'expired':>7}"
+        f"  {'defs':>5}  {'dormant':>7}  {'instances':>9}"
+    )
+    lines = [header]
+    for s in stats:
+        name = s.path.name + ("*" if s.costly else "")
+        lines.append(
+            f"{name:<{width}}  {s.file_key or '-':<6}  {s.size / 1024:>9.1f}"
+            f"  {s.n_entries:>8}  {s.parse_seconds * 1000:>9.1f}"
+            f"  {s.load_seconds * 1000:>9.1f}  {s.n_errors:>6}"
+            f"  {_format_optional(s.n_expired):>7}  {_format_optional(s.n_defs):>5}"
+            f"  {_format_optional(s.n_dormant):>7}"
+            f"  {_format_optional(s.n_instances):>9}"
+        )
+    lines.append("\nEntries by type:")
+    for s in stats:
+        counts = ", ".join(f"{k} {v}" for k, v in s.entries.items()) or "none"
+        lines.append(f"{s.path.name}: {counts}")
+    return "\n".join(lines)
+
+
+def print_stats(stats: list[FileStats]):
+    """Print statistics of beancount files.
+
+    Parameters
+    ----------
+    stats
+        Statistics, as returned by `get_stats`.
+    """
+    utils.print_it(format_stats(stats))
+    if costly := [s.path.name for s in stats if s.costly]:
+        utils.print_it(
+            f"\n{len(costly)} beanahead file(s) marked * are growing costly to"
+            f" rewrite: {', '.join(costly)}. Consider administering expired"
+            " transactions or archiving older entries."
+        )
@@ -0,0 +1,440 @@
+"""Generate synthetic beanahead ledgers at scale.
+
+Generates a set of beanahead-compatible files for benchmarks and stress
+tests:
+    main ledger - opens all accounts, includes the 'rx' and 'x' ledgers
+        and holds the bulk of the generated transactions.
+    'rx_def' - Regular Expected Transaction Definitions file.
+    'rx' - Regular Expected Transactions Ledger, with transactions
+        generated for each definition.
+    'x' - Expected Transactions Ledger, with transactions dated either
+        side of the scale's end date (i.e. some have expired).
+    extraction - new transactions, some of which correspond with
+        transactions of the 'rx' and 'x' ledgers (dates and amounts
+        jittered), such that the files can be reconciled.
+
+Output is deterministic for a given `Scale`, including its seed. The scale
+and seed are recorded, together with the number of entries written to
+each file, to a manifest file alongside the generated files.
+
+Usage:
+
+    result = synthetic.generate("path/to/dir", synthetic.Scale(n_txns=100_000))
+    paths = result.paths
+    admin = rx_txns.Admin(paths["rx_def"], paths["rx"], paths["main"])
+"""
+
+from __future__ import annotations
+
+import contextlib
+import dataclasses
+import datetime
+import json
+import random
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+import pandas as pd
+
+from . import config, utils
+from .rx_txns import get_simple_offset
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+
+MANIFEST_FILENAME = "synthetic.json"
+
+FILENAMES = {
+    "main": "main",
+    "rx_def": "rx_def",
+    "rx": "rx",
+    "x": "x",
+    "extraction": "extraction",
+}
+
+CURRENCY = "USD"
+
+# frequencies of definitions, with relative weights
+FREQS = {"w": 2, "2w": 3, "m": 10, "3m": 2, "y": 1}
+
+_WORDS = (
+    "Acme", "Apex", "Atlas", "Beacon", "Birch", "Bright", "Cedar", "Civic",
+    "Coast", "Crown", "Delta", "Eagle", "Echo", "Elm", "Falcon", "First",
+    "Fox", "Globe", "Granite", "Harbor", "Iron", "Jade", "Keystone", "Lake",
+    "Liberty", "Maple", "Metro", "North", "Oak", "Orbit", "Peak", "Pine",
+    "Prime", "Quest", "River", "Royal", "Summit", "Sun", "Union", "Vista",
+)  # fmt: skip
+_KINDS = (
+    "Bakery", "Books", "Cafe", "Clinic", "Energy", "Fitness", "Foods",
+    "Garage", "Insurance", "Market", "Media", "Mobile", "Pharmacy",
+    "Services", "Store", "Telecom", "Transit", "Utilities", "Water",
+)  # fmt: skip
+
+
+@dataclass(frozen=True)
+class Scale:
+    """Scale of synthetic ledgers.
+
+    Parameters
+    ----------
+    n_txns
+        Number of transactions on the main ledger.
+
+    n_defs
+        Number of Regular Expected Transaction definitions.
+
+    rx_periods
+        Number of transactions on the 'rx' ledger for each definition.
+
+    n_x_txns
+        Number of transactions on the 'x' ledger.
+
+    n_new
+        Number of transactions on the extraction file.
+
+    match_ratio
+        Proportion of extraction transactions that correspond with a
+        transaction of the 'rx' or 'x' ledgers.
+
+    n_accounts
+        Number of expense accounts.
+
+    n_payees
+        Number of payees from which payees of the main ledger, 'x' ledger
+        and unmatched extraction transactions are drawn (definitions each
+        have a distinct payee).
+
+    end
+        Date to which main ledger transactions are generated, i.e. 'today'
+        of the generated ledgers. Transactions of the 'rx' ledger are
+        dated from `end`. Transactions of the 'x' ledger are dated either
+        side of `end`.
+
+    days
+        Number of days, prior to `end`, over which main ledger
+        transactions are generated.
+
+    root_names
+        Custom account root names, as for `config.set_account_root_names`.
+        By default, beancount's default root names.
+
+    seed
+        Seed of random number generator.
+    """
+
+    n_txns: int = 10_000
+    n_defs: int = 100
+    rx_periods: int = 3
+    n_x_txns: int = 100
+    n_new: int = 200
+    match_ratio: float = 0.5
+    n_accounts: int = 50
+    n_payees: int = 500
+    end: datetime.date = datetime.date(2024, 1, 1)
+    days: int = 730
+    root_names: dict[str, str] = field(default_factory=dict)
+    seed: int = 0
+
+    def to_dict(self) -> dict:
+        """Get scale as a JSON serializable dictionary."""
+        d = dataclasses.asdict(self)
+        d["end"] = self.end.isoformat()
+        return d
+
+    @classmethod
+    def from_dict(cls, d: dict) -> Scale:
+        """Get scale from a dictionary as returned by `to_dict`."""
+        d = d.copy()
+        if "end" in d:
+            d["end"] = datetime.date.fromisoformat(d["end"])
+        return cls(**d)
+
+
+@dataclass
+class Generated:
+    """Synthetic ledgers generated by `generate`.
+
+    Attributes
+    ----------
+    scale
+        Scale of generated ledgers.
+
+    paths
+        Paths to generated files, keyed by file kind ("main", "rx_def",
+        "rx", "x" or "extraction").
+
+    counts
+        Number of entries written to each file, keyed as `paths`.
+
+    manifest
+        Path to manifest file.
+    """
+
+    scale: Scale
+    paths: dict[str, Path]
+    counts: dict[str, int]
+    manifest: Path
+
+
+@contextlib.contextmanager
+def account_root_names(names: dict[str, str]) -> Iterator[dict[str, str]]:
+    """Context manager within which account root names are set.
+
+    Parameters
+    ----------
+    names
+        Account root names, as for `config.set_account_root_names`. Names
+        not defined are set to beancount's default root names.
+
+    Yields account root names set. Prior names are restored on exit.
+    """
+    prev = config.get_account_root_names()
+    config.set_account_root_names({**config.BC_DEFAULT_ACCOUNT_ROOT_NAMES, **names})
+    try:
+        yield config.get_account_root_names()
+    finally:
+        config.set_account_root_names(prev)
+
+
+class _Generator:
+    """Generate content of synthetic ledgers."""
+
+    def __init__(self, scale: Scale, names: dict[str, str]):
+        self.scale = scale
+        self.rng = random.Random(scale.seed)  # noqa: S311
+        assets, liabilities = names["name_assets"], names["name_liabilities"]
+        self.equity = f"{names['name_equity']}:Opening-Balances"
+        self.checking = f"{assets}:Bank:Checking"
+        self.savings = f"{assets}:Bank:Savings"
+        self.card = f"{liabilities}:Card:Visa"
+        self.salary = f"{names['name_income']}:Employer:Salary"
+        self.expenses = [
+            f"{names['name_expenses']}:{_KINDS[i % len(_KINDS)]}:Cat{i:03}"
+            for i in range(scale.n_accounts)
+        ]
+        self.payees = [self._payee(i) for i in range(scale.n_payees)]
+        # expected txns as (date, payee, account, amount, expense account)
+        self.expected: list[tuple] = []
+
+    @property
+    def accounts(self) -> list[str]:
+        """All accounts referenced by generated entries."""
+        fixed = [self.equity, self.checking, self.savings, self.card, self.salary]
+        return fixed + self.expenses
+
+    def _payee(self, i: int) -> str:
+        rng = self.rng
+        return f"{rng.choice(_WORDS)} {rng.choice(_KINDS)} {i}"
+
+    def _amount(self) -> str:
+        return f"{self.rng.lognormvariate(3.5, 1.0):.2f}"
+
+    def _txn(
+        self,
+        date: datetime.date,
+        payee: str,
+        narration: str,
+        postings: list[tuple[str, str | None]],
+        meta: dict[str, str] | None = None,
+    ) -> str:
+        lines = [f'{date.isoformat()} * "{payee}" "{narration}"']
+        lines += [f'  {k}: "{v}"' for k, v in (meta or {}).items()]
+        for account, amount in postings:
+            if amount is None:
+                lines.append(f"  {account}")
+            else:
+                lines.append(f"  {account:<50} {amount:>12} {CURRENCY}")
+        return "\n".join(lines) + "\n"
+
+    def _spend_postings(self, amount: str, expense: str, account: str) -> list:
+        return [(account, f"-{amount}"), (expense, None)]
+
+    def main(self) -> Iterator[str]:
+        """Yield chunks of main ledger content."""
+        scale, rng = self.scale, self.rng
+        start = scale.end - datetime.timedelta(scale.days)
+        open_date = start - datetime.timedelta(1)
+        yield f'option "title" "Synthetic ledger (seed {scale.seed})"\n'
+        for k, v in config.get_account_root_names().items():
+            if config.BC_DEFAULT_ACCOUNT_ROOT_NAMES[k] != v:
+                yield f'option "{k}" "{v}"\n'
+        yield f'option "operating_currency" "{CURRENCY}"\n'
+        yield f'include "{FILENAMES["rx"]}{config.SETTINGS.extension}"\n'
+        yield f'include "{FILENAMES["x"]}{config.SETTINGS.extension}"\n\n'
+        yield f"{open_date.isoformat()} commodity {CURRENCY}\n\n"
+        for account in self.accounts:
+            yield f"{open_date.isoformat()} open {account}\n"
+        yield "\n" + self._txn(
+            open_date,
+            "Opening Balance",
+            "",
+            [(self.checking, "10000.00"), (self.equity, None)],
+        )
+
+        chunk = []
+        offsets = sorted(rng.randrange(scale.days) for _ in range(scale.n_txns))
+        for offset in offsets:
+            date = start + datetime.timedelta(offset)
+            r = rng.random()
+            if r < 0.03:
+                amount = f"{rng.uniform(2000, 5000):.2f}"
+                postings = [(self.checking, amount), (self.salary, None)]
+                txn = self._txn(date, "Employer", "Salary", postings)
+            elif r < 0.06:
+                amount = self._amount()
+                postings = [(self.checking, f"-{amount}"), (self.savings, None)]
+                txn = self._txn(date, "Transfer", "To savings", postings)
+            else:
+                account = self.checking if r < 0.5 else self.card
+                postings = self._spend_postings(
+                    self._amount(), rng.choice(self.expenses), account
+                )
+                txn = self._txn(date, rng.choice(self.payees), "", postings)
+            chunk.append("\n" + txn)
+            if len(chunk) == utils.CHUNK_SIZE:
+                yield "".join(chunk)
+                chunk = []
+        yield "".join(chunk)
+
+    def rx(self) -> tuple[str, str]:
+        """Get content of 'rx_def' file and 'rx' ledger."""
+        scale, rng = self.scale, self.rng
+        freqs, weights = list(FREQS), list(FREQS.values())
+        defs, txns = [], []
+        for i in range(scale.n_defs):
+            freq = rng.choices(freqs, weights)[0]
+            offset = get_simple_offset(freq)
+            first = pd.Timestamp(scale.end + datetime.timedelta(rng.randrange(28)))
+            payee = f"Regular {rng.choice(_WORDS)} {rng.choice(_KINDS)} {i}"
+            expense = rng.choice(self.expenses)
+            account = self.checking if rng.random() < 0.7 else self.card
+            postings = self._spend_postings(self._amount(), expense, account)
+            meta = {"freq": freq}
+            for k in range(scale.rx_periods):
+                date = (first + offset * k).date()
+                txns.append((date, self._txn(date, payee, "Regular", postings, meta)))
+                self.expected.append((date, payee, account, postings[0][1], expense))
+            date = (first + offset * scale.rx_periods).date()
+            defs.append((date, self._txn(date, payee, "Regular", postings, meta)))
+        return self._compose("rx_def", defs), self._compose("rx", txns)
+
+    def x(self) -> str:
+        """Get content of 'x' ledger."""
+        scale, rng = self.scale, self.rng
+        txns = []
+        for _ in range(scale.n_x_txns):
+            date = scale.end + datetime.timedelta(rng.randrange(-30, 60))
+            payee = rng.choice(self.payees)
+            expense = rng.choice(self.expenses)
+            account = self.checking if rng.random() < 0.5 else self.card
+            postings = self._spend_postings(self._amount(), expense, account)
+            txns.append((date, self._txn(date, payee, "", postings)))
+            self.expected.append((date, payee, account, postings[0][1], expense))
+        return self._compose("x", txns)
+
+    def extraction(self) -> str:
+        """Get content of extraction file.
+
+        Must be called after `rx` and `x`.
+        """
+        scale, rng = self.scale, self.rng
+        txns = []
+        n_match = min(round(scale.n_new * scale.match_ratio), len(self.expected))
+        for date, payee, account, amount, expense in rng.sample(self.expected, n_match):
+            date_ = date + datetime.timedelta(rng.randint(-3, 3))
+            amount_ = amount
+            if rng.random() < 0.3:
+                amount_ = f"{float(amount) * rng.uniform(0.99, 1.01):.2f}"
+            payee_ = payee if rng.random() < 0.8 else rng.choice(self.payees)
+            postings = [(account, amount_), (expense, None)]
+            txns.append((date_, self._txn(date_, payee_, "", postings)))
+        for _ in range(scale.n_new - n_match):
+            date = scale.end + datetime.timedelta(rng.randrange(-30, 60))
+            account = self.checking if rng.random() < 0.5 else self.card
+            postings = self._spend_postings(
+                self._amount(), rng.choice(self.expenses), account
+            )
+            txns.append((date, self._txn(date, rng.choice(self.payees), "", postings)))
+        txns.sort(key=lambda t: t[0])
+        return "\n".join(txn for _, txn in txns)
+
+    def _compose(self, file_key: str, txns: list[tuple[datetime.date, str]]) -> str:
+        txns.sort(key=lambda t: t[0])
+        content = "\n".join(txn for _, txn in txns)
+        header, footer = utils.compose_header_footer(file_key)
+        return header + "\n\n" + content + "\n\n" + footer
+
+
+def generate(dirpath: str | Path, scale: Scale | None = None) -> Generated:
+    """Generate synthetic ledgers.
+
+    Parameters
+    ----------
+    dirpath
+        Path to directory in which to write files. Created if it does not
+        exist. Any existing files with the same names (see `FILENAMES`)
+        will be overwritten.
+
+    scale
+        Scale of ledgers to generate. By default, `Scale()`.
+
+    Returns
+    -------
+    Generated
+        Paths to generated files, and the number of entries written to
+        each.
+    """
+    scale = Scale() if scale is None else scale
+    dirpath = Path(dirpath)
+    dirpath.mkdir(parents=True, exist_ok=True)
+    ext = config.SETTINGS.extension
+    paths = {k: dirpath / f"{name}{ext}" for k, name in FILENAMES.items()}
+    with account_root_names(scale.root_names) as names:
+        gen = _Generator(scale, names)
+        with paths["main"].open("wt", encoding=config.ENCODING) as file:
+            file.writelines(gen.main())
+        content_defs, content_rx = gen.rx()
+        contents = {
+            "rx_def": content_defs,
+            "rx": content_rx,
+            "x": gen.x(),
+            "extraction": gen.extraction(),
+        }
+    for k, content in contents.items():
+        paths[k].write_text(content, encoding=config.ENCODING)
+
+    n_opens = len(gen.accounts)
+    counts = {
+        # commodity, opens and opening balance
+        "main": scale.n_txns + n_opens + 2,
+        "rx_def": scale.n_defs,
+        "rx": scale.n_defs * scale.rx_periods,
+        "x": scale.n_x_txns,
+        "extraction": scale.n_new,
+    }
+    manifest = dirpath / MANIFEST_FILENAME
+    content = {
+        "scale": scale.to_dict(),
+        "paths": {k: path.name for k, path in paths.items()},
+        "counts": counts,
+    }
+    manifest.write_text(json.dumps(content, indent=2), encoding=config.ENCODING)
+    return Generated(scale, paths, counts, manifest)
+
+
+def read_manifest(path: str | Path) -> Generated:
+    """Read a manifest written by `generate`.
+
+    Parameters
+    ----------
+    path
+        Path to manifest file, or to directory containing manifest file.
+    """
+    path = Path(path)
+    if path.is_dir():
+        path = path / MANIFEST_FILENAME
+    content = json.loads(path.read_text(encoding=config.ENCODING))
+    paths = {k: path.parent / name for k, name in content["paths"].items()}
+    scale = Scale.from_dict(content["scale"])
+    return Generated(scale, paths, content["counts"], path)
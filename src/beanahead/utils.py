@@ -2,30 +2,38 @@
 
 from __future__ import annotations
 
+import bisect
+import contextlib
 import copy
 import datetime
+import hashlib
+import os
 import re
+import shutil
+import tempfile
 from pathlib import Path
 from typing import TYPE_CHECKING
 
 from beancount import loader
-from beancount.core.account_types import is_account_type
 from beancount.core.data import Transaction
 from beancount.core.interpolate import AUTOMATIC_META
 from beancount.parser import parser, printer
 from beangulp.extract import HEADER
 
-from . import config
+from . import config, locks, metrics, profiling
 from .config import BC_DEFAULT_ACCOUNT_ROOT_NAMES, get_account_root_names
 from .errors import (
     BeanaheadFileExistsError,
     BeanaheadFileKeyError,
+    BeanaheadInputError,
     BeanaheadLedgerFileExistsError,
     BeancountFileExistsError,
     BeancountLoaderErrors,
 )
 
 if TYPE_CHECKING:
+    from collections.abc import Callable, Iterable, Iterator
+
     from beancount.core import data
 
 TAG_X = "x_txn"
@@ -39,6 +47,7 @@ RX_META_DFLTS = {
 
 SEPARATOR_LINE = "-" * 77 + "\n"
 TODAY = datetime.datetime.now().date()  # noqa: DTZ005
+CHUNK_SIZE = 1_000  # Number of entries to compose content for at a time
 
 FILE_CONFIG = {
     "x": {
@@ -69,6 +78,14 @@ FILE_CONFIG = {
 
 LEDGER_FILE_KEYS = ["x", "rx"]
 
+BYTES_WRITTEN = metrics.counter(
+    "beanahead_bytes_written_total",
+    "Bytes written to files, including bytes injected to ledgers.",
+)
+FILES_WRITTEN = metrics.counter(
+    "beanahead_files_written_total", "Files written or overwritten."
+)
+
 
 def print_it(text: str, **kwargs):
     """Print to the selected stream.
@@ -85,6 +102,54 @@ def print_it(text: str, **kwargs):
     print(text, **kwargs)  # noqa: T201
 
 
+_today_listeners: list[Callable[[datetime.date], None]] = []
+
+
+def on_today_change(
+    func: Callable[[datetime.date], None],
+) -> Callable[[datetime.date], None]:
+    """Register a function to be called whenever `TODAY` is refreshed.
+
+    Modules that define values evaluated from `TODAY` should register a
+    function to reevaluate them. The function will receive the new value of
+    `TODAY`. Can be used as a decorator.
+    """
+    _today_listeners.append(func)
+    return func
+
+
+def get_today() -> datetime.date:
+    """Get today's date according to the system clock."""
+    return datetime.datetime.now().date()  # noqa: DTZ005
+
+
+def refresh_today(today: datetime.date | None = None) -> bool:
+    """Refresh `TODAY` and all values evaluated from it.
+
+    `TODAY` is otherwise evaluated only on import. A long-running process
+    should call this function before each operation.
+
+    Parameters
+    ----------
+    today
+        Date to set as today. By default, today's date according to the
+        system clock.
+
+    Returns
+    -------
+    bool
+        True if `TODAY` changed, False otherwise.
+    """
+    global TODAY  # noqa: PLW0603
+    today = get_today() if today is None else today
+    if today == TODAY:
+        return False
+    TODAY = today
+    for func in _today_listeners:
+        func(today)
+    return True
+
+
 def validate_file_key(file_key: str):
     """Validate a file_key.
 
@@ -297,6 +362,80 @@ def get_verified_path(filepath: str, file_key: str | None = None) -> Path:
     return path
 
 
+# Loaded beancount files, as {path: (files_state, loaded)}. None if disabled.
+_load_cache: dict[Path, tuple[tuple, tuple]] | None = None
+
+
+def enable_load_cache(enable: bool = True):  # noqa: FBT001, FBT002
+    """Enable or disable caching of loaded beancount files.
+
+    When enabled, `load_file` returns the previously loaded entries of a
+    file for so long as neither the file nor any file it includes has
+    changed. Intended for long-running processes. Disabling the cache
+    clears it.
+    """
+    global _load_cache  # noqa: PLW0603
+    _load_cache = {} if enable else None
+
+
+def _get_files_state(paths: Iterable[str | Path]) -> tuple | None:
+    """Get state of files as tuple of (path, mtime, size), None if any missing."""
+    state = []
+    for path in paths:
+        try:
+            stat = os.stat(path)  # noqa: PTH116
+        except OSError:
+            return None
+        state.append((str(path), stat.st_mtime_ns, stat.st_size))
+    return tuple(state)
+
+
+def _load_file(path: Path) -> tuple[data.Entries, list, dict]:
+    """Load a beancount file with the beancount loader."""
+    with profiling.phase("io.load") as phase:
+        loaded = loader.load_file(path)
+        phase.count(len(loaded[0]))
+    return loaded
+
+
+def load_file(path: Path) -> tuple[data.Entries, list, dict]:
+    """Load a beancount file.
+
+    Wraps `beancount.loader.load_file`. If the load cache is enabled (see
+    `enable_load_cache`) then a file is only reloaded if it, or any file
+    it includes, has changed since last loaded.
+
+    Parameters
+    ----------
+    path
+        Path to beancount file. Path is NOT verified.
+
+    Returns
+    -------
+    3-tuple
+        [0] Entries.
+        [1] Errors.
+        [2] Options.
+    """
+    cache = _load_cache
+    if cache is None:
+        return _load_file(path)
+    key = Path(path).resolve()
+    if (cached := cache.get(key)) is not None:
+        state, loaded = cached
+        if state is not None and _get_files_state(p for p, _, _ in state) == state:
+            entries, errors, options = loaded
+            return list(entries), list(errors), options
+    state_before = _get_files_state([key])
+    loaded = _load_file(path)
+    state = _get_files_state(Path(p).resolve() for p in loaded[2]["include"])
+    # do not cache if file changed whilst loading
+    if state is not None and state_before is not None and state_before[0] in state:
+        cache[key] = (state, loaded)
+    entries, errors, options = loaded
+    return list(entries), list(errors), options
+
+
 def get_options(path: Path) -> dict:
     """Get options for a beancount file.
 
@@ -310,7 +449,7 @@ def get_options(path: Path) -> dict:
     dict
         Options as mapping of 'option name' : value.
     """
-    _entries, _errors, options = loader.load_file(path)
+    _entries, _errors, options = load_file(path)
     return options
 
 
@@ -416,6 +555,63 @@ def get_verified_ledger_file_key(path: Path) -> str:
     return file_key
 
 
+REGEX_OPTION_LINE = re.compile(r'^option\s+"([^"]*)"\s+"([^"]*)"')
+
+
+def scan_header(path: Path) -> dict[str, str]:
+    """Scan the header of a beancount file for options.
+
+    Only the lines preceding the first dated entry are read, such that
+    options defined in a file's header can be read without loading the
+    file.
+
+    Parameters
+    ----------
+    path
+        Path to beancount file. Path is NOT verified.
+
+    Returns
+    -------
+    dict
+        Options defined in the header, as mapping of 'option name' :
+        value. Values are strings, as defined on the file.
+    """
+    options = {}
+    with path.open("r", encoding=config.ENCODING) as file:
+        for line in file:
+            if REGEX_ENTRY_LINE.match(line):
+                break
+            if (match := REGEX_OPTION_LINE.match(line)) is not None:
+                options[match[1]] = match[2]
+    return options
+
+
+def get_header_file_key(path: Path) -> str | None:
+    """Get file key of a beanahead file from the file's header.
+
+    Unlike `get_verified_file_key`, the file is not loaded. The file key
+    is identified from the title option defined in the file's header
+    (see `scan_header`).
+
+    Parameters
+    ----------
+    path
+        Path to beancount file. Path is NOT verified.
+
+    Returns
+    -------
+    str | None
+        file_key, as key of `FILE_CONFIG`, corresponding with file at
+        `path`. None if the header does not define the title of a
+        beanahead file.
+    """
+    title = scan_header(path).get("title")
+    for file_key, config_ in FILE_CONFIG.items():
+        if title == config_["title"]:
+            return file_key
+    return None
+
+
 def get_unverified_entries(path: Path) -> data.Entries:
     """Get entries from a ledger file.
 
@@ -432,7 +628,7 @@ def get_unverified_entries(path: Path) -> data.Entries:
     data.Entries
         Entries extracted from unverified ledger file.
     """
-    entries, _errors, _options = loader.load_file(path)
+    entries, _errors, _options = load_file(path)
     return entries
 
 
@@ -455,7 +651,7 @@ def get_verified_entries(path: Path) -> data.Entries:
     data.Entries
         Entries extracted from verified ledger file.
     """
-    entries, errors, _options = loader.load_file(path)
+    entries, errors, _options = load_file(path)
     if errors:
         raise BeancountLoaderErrors(path, errors)
     return entries
@@ -520,8 +716,35 @@ def is_expired(txn: Transaction) -> bool:
     return txn.date < TODAY
 
 
+def split_expired_txns(
+    txns: list[Transaction],
+) -> tuple[list[Transaction], list[Transaction]]:
+    """Split date-sorted transactions into expired and unexpired.
+
+    Partition is located by bisecting on transaction dates, such that
+    `is_expired` is not evaluated for each transaction.
+
+    Parameters
+    ----------
+    txns
+        Transactions sorted by date, as loaded from a beancount file.
+
+    Returns
+    -------
+    2-tuple of list of Transaction
+        [0] Transactions dated prior to today.
+        [1] Transactions dated today or later.
+    """
+    i = bisect.bisect_left(txns, TODAY, key=lambda txn: txn.date)
+    return txns[:i], txns[i:]
+
+
 def get_expired_txns(txns: list[Transaction]) -> list[Transaction]:
-    """Get transactions dated prior to today."""
+    """Get transactions dated prior to today.
+
+    `txns` can be in any order. See `split_expired_txns` to split
+    date-sorted transactions.
+    """
     return [txn for txn in txns if is_expired(txn)]
 
 
@@ -576,6 +799,59 @@ def reverse_automatic_balancing(txn: Transaction) -> Transaction:
     return txn._replace(postings=new_postings)
 
 
+_account_keys: dict[str, str | None] = {}
+_account_keys_state: tuple[int, config.Settings] | None = None
+
+
+def get_account_root_key(account: str) -> str | None:
+    """Get key of the account root name of an account.
+
+    Classifications are cached. The cache is invalidated whenever the
+    account root names are changed.
+
+    Parameters
+    ----------
+    account
+        Account to query.
+
+    Returns
+    -------
+    str | None
+        Key of `config.get_account_root_names` corresponding with the
+        root of `account`, for example "name_assets". None if the root of
+        `account` is not an account root name.
+
+    Examples
+    --------
+    >>> get_account_root_key("Assets:US:BofA:Checking")
+    'name_assets'
+    >>> get_account_root_key("Expenses:Home:Electricity")
+    'name_expenses'
+    >>> get_account_root_key("NotARoot:Home:Electricity") is None
+    True
+    """
+    global _account_keys_state  # noqa: PLW0603
+    state = config.get_settings_state()
+    if _account_keys_state is None or (
+        state[0] != _account_keys_state[0] or state[1] is not _account_keys_state[1]
+    ):
+        _account_keys.clear()
+        _account_keys_state = state
+    try:
+        return _account_keys[account]
+    except KeyError:
+        pass
+    root, sep, _ = account.partition(":")
+    key = None
+    if sep:
+        for k, name in config._get_account_root_names().items():  # noqa: SLF001
+            if name == root:
+                key = k
+                break
+    _account_keys[account] = key
+    return key
+
+
 def is_assets_account(string: str) -> bool:
     """Query if a string represents an assets account.
 
@@ -588,7 +864,10 @@ def is_assets_account(string: str) -> bool:
     >>> is_assets_account("Assets:US:BofA:Checking")
     True
     """
-    return is_account_type(get_account_root_names()["name_assets"], string)
+    return get_account_root_key(string) == "name_assets"
+
+
+BALANCE_SHEET_KEYS = frozenset(("name_assets", "name_liabilities"))
 
 
 def is_balance_sheet_account(string: str) -> bool:
@@ -614,14 +893,7 @@ def is_balance_sheet_account(string: str) -> bool:
     >>> is_balance_sheet_account("Income:US:BayBook:Match401k")
     False
     """
-    account_root_names = get_account_root_names()
-    return any(
-        is_account_type(acc_type, string)
-        for acc_type in [
-            account_root_names["name_assets"],
-            account_root_names["name_liabilities"],
-        ]
-    )
+    return get_account_root_key(string) in BALANCE_SHEET_KEYS
 
 
 def get_balance_sheet_accounts(txn: Transaction) -> list[str]:
@@ -648,6 +920,7 @@ def get_balance_sheet_accounts(txn: Transaction) -> list[str]:
     return accounts
 
 
+@profiling.profiled("io.read")
 def get_content(path: Path) -> str:
     """Get all content from a file.
 
@@ -759,15 +1032,85 @@ def compose_new_content(file_key: str, txns_content: str) -> str:
     return content
 
 
-def write(path: Path, content: str):
-    """Write content to path."""
+def get_digest(data: str | bytes) -> str:
+    """Get sha256 digest of content.
+
+    Parameters
+    ----------
+    data
+        Content to digest. If passed as str then will be encoded with
+        the beanahead encoding.
+    """
+    if isinstance(data, str):
+        data = data.encode(config.ENCODING)
+    return hashlib.sha256(data).hexdigest()
+
+
+def encode_as_written(content: str) -> bytes:
+    """Encode content as it would be written to file in text mode.
+
+    Newlines are translated to the platform's line separator, as when
+    writing to a file opened in text mode with default newline handling.
+    """
+    if os.linesep != "\n":
+        content = content.replace("\n", os.linesep)
+    return content.encode(config.ENCODING)
+
+
+def has_content(path: Path, content: str) -> bool:
+    """Query if a file has a given content.
+
+    Parameters
+    ----------
+    path
+        Path to file to query. Need not exist.
+
+    content
+        Content to compare with that of `path`.
+
+    Returns
+    -------
+    bool
+        True if file at `path` exists and has content identical to
+        `content`, as `content` would be written to file in text mode
+        (see `encode_as_written`).
+    """
+    data = encode_as_written(content)
+    try:
+        if path.stat().st_size != len(data):
+            return False
+        existing = path.read_bytes()
+    except FileNotFoundError:
+        return False
+    return existing == data
+
+
+@profiling.profiled("io.write")
+def write(path: Path, content: str) -> bool:
+    """Write content to path.
+
+    File is not written if it already has `content`.
+
+    Returns
+    -------
+    bool
+        True if file written, False if file already had `content`.
+    """
+    if has_content(path, content):
+        return False
     with path.open("wt", encoding=config.ENCODING) as file:
         file.write(content)
+    BYTES_WRITTEN.inc(path.stat().st_size)
+    FILES_WRITTEN.inc()
+    return True
 
 
-def overwrite_file(path: Path, content: str):
+@profiling.profiled("io.overwrite")
+def overwrite_file(path: Path, content: str) -> bool:
     """Overwrite file with content for an expected transactions file.
 
+    File is not overwritten if it already has `content`.
+
     Parameters
     ----------
     path
@@ -776,18 +1119,168 @@ def overwrite_file(path: Path, content: str):
     content
         Content to write to file at `path`.
 
+    Returns
+    -------
+    bool
+        True if file overwritten, False if file already had `content`.
+
     Raises
     ------
     ValueError
         If `content` would subsequently load with errors.
     """
+    # content is only parsed if the file would change
+    if has_content(path, content):
+        return False
     _, errors, _ = parser.parse_string(content)
     if errors:
         raise ValueError(
             f"{path} has not been overwritten as content would parse with the"
             f" following errors: {errors}"
         )
-    write(path, content)
+    return write(path, content)
+
+
+def iter_entries_content(
+    entries: Iterable[data.Directive], size: int = CHUNK_SIZE
+) -> Iterator[str]:
+    """Yield printable content of entries in chunks.
+
+    Content of all chunks together is as would be returned by
+    `compose_entries_content` for the same entries.
+
+    Parameters
+    ----------
+    entries
+        Entries to comprise content. Can be an iterator, in which case
+        entries are only consumed as chunks are yielded.
+
+    size
+        Number of entries to comprise each chunk.
+    """
+    chunk: list[str] = []
+    sep = ""
+    for entry in entries:
+        if isinstance(entry, Transaction):
+            entry = prepare_for_printer(entry)  # noqa: PLW2901
+        chunk.append(printer.format_entry(entry))
+        if len(chunk) == size:
+            yield sep + "\n".join(chunk)
+            chunk, sep = [], "\n"
+    if chunk:
+        yield sep + "\n".join(chunk)
+
+
+def iter_new_content(
+    file_key: str, entries: Iterable[data.Directive], size: int = CHUNK_SIZE
+) -> Iterator[str]:
+    """Yield full content of an expected transactions .beancount file.
+
+    Content is yielded in chunks. Content of all chunks together is as
+    would be returned by `compose_new_content` for the content of the
+    same entries. Content is NOT validated (see `overwrite_file_chunks`).
+
+    Parameters
+    ----------
+    file_key
+        key of `FILE_CONFIG` describing nature of file being composed.
+
+    entries
+        Entries to be included to file, in the order to be included.
+
+    size
+        Number of entries to comprise each chunk.
+    """
+    header, footer = compose_header_footer(file_key)
+    yield header + "\n\n"
+    yield from iter_entries_content(entries, size)
+    yield "\n\n" + footer
+
+
+def get_file_digest(path: Path, block_size: int = 2**16) -> str:
+    """Get sha256 digest of a file's content, read in blocks."""
+    digest = hashlib.sha256()
+    with path.open("rb") as file:
+        while block := file.read(block_size):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+@profiling.profiled("io.overwrite_chunks")
+def overwrite_file_chunks(
+    path: Path,
+    chunks: Iterable[str],
+    n_txns: int | Callable[[], int] | None = None,
+) -> bool:
+    """Overwrite file with content received in chunks.
+
+    Chunks are written to a temporary file alongside `path`. The temporary
+    file only replaces `path` once its content has been verified. As such
+    no more than a single chunk of content is held in memory and `path`
+    is never left partially written.
+
+    File is not overwritten if it already has the content.
+
+    Parameters
+    ----------
+    path
+        Path to file to be overwritten.
+
+    chunks
+        Chunks of content to write to file at `path`.
+
+    n_txns
+        Number of transactions that the content is expected to parse. Can
+        be passed as a callable that returns the number, in which case it
+        will be called after all chunks have been written.
+
+    Returns
+    -------
+    bool
+        True if file overwritten, False if file already had the content.
+
+    Raises
+    ------
+    ValueError
+        If content would subsequently load with errors or would parse a
+        number of transactions other than `n_txns`.
+    """
+    digest = hashlib.sha256()
+    fd, name = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    temp = Path(name)
+    try:
+        with open(fd, "w", encoding=config.ENCODING) as file:  # noqa: PTH123
+            for chunk in chunks:
+                digest.update(encode_as_written(chunk))
+                file.write(chunk)
+        size = temp.stat().st_size
+        if (
+            path.exists()
+            and path.stat().st_size == size
+            and get_file_digest(path) == digest.hexdigest()
+        ):
+            return False
+        entries, errors, _ = parser.parse_file(str(temp), encoding=config.ENCODING)
+        if errors:
+            raise ValueError(
+                f"{path} has not been overwritten as content would parse with the"
+                f" following errors: {errors}"
+            )
+        if callable(n_txns):
+            n_txns = n_txns()
+        if n_txns is not None and (n := len(extract_txns(entries))) != n_txns:
+            raise ValueError(
+                f"{path} has not been overwritten as expected {n_txns} transactions"
+                f" to be loaded from content, but loaded {n}."
+            )
+        if path.exists():
+            shutil.copymode(path, temp)
+        temp.replace(path)
+    finally:
+        temp.unlink(missing_ok=True)
+    BYTES_WRITTEN.inc(size)
+    FILES_WRITTEN.inc()
+    return True
 
 
 def create_ledger_content(file_key: str, txns: list[Transaction]) -> str:
@@ -807,7 +1300,7 @@ def create_ledger_content(file_key: str, txns: list[Transaction]) -> str:
     return compose_new_content(file_key, txns_content)
 
 
-def remove_txns_from_ledger(path: Path, txns: list[Transaction]):
+def remove_txns_from_ledger(path: Path, txns: list[Transaction]) -> bool:
     """Remove txns from an Expected Transactions Ledger.
 
     Expected Transactions Ledger at `path` will be overwritten with
@@ -824,12 +1317,17 @@ def remove_txns_from_ledger(path: Path, txns: list[Transaction]):
 
     txns
         Transactions to remove from the ledger.
+
+    Returns
+    -------
+    bool
+        True if ledger overwritten, False if content unchanged.
     """
     file_key = get_verified_ledger_file_key(path)
     existing_txns = get_unverified_txns(path)
     retained_txns = remove_txns(existing_txns, txns)
     new_content = create_ledger_content(file_key, retained_txns)
-    overwrite_file(path, new_content)
+    return overwrite_file(path, new_content)
 
 
 def compile_strings_regex(
@@ -884,6 +1382,45 @@ def compile_strings_regex(
     return re.compile(regex, flags=flags)
 
 
+_scripted_responder: Callable[[str], str | None] | None = None
+
+
+@contextlib.contextmanager
+def scripted_input(
+    responses: Iterable[str] | Callable[[str], str | None],
+) -> Iterator[None]:
+    """Context manager within which user input is taken from `responses`.
+
+    Within the context `get_input` returns the next response of
+    `responses`, as if entered by the user. If input is requested when no
+    response remains then `get_input` raises `BeanaheadInputError`.
+
+    Parameters
+    ----------
+    responses
+        Responses to requests for user input, in the order requested.
+
+        Alternatively, a callable that receives the text introducing a
+        request for input and returns the response, or None if no
+        response is available.
+    """
+    global _scripted_responder  # noqa: PLW0603
+    if callable(responses):
+        responder = responses
+    else:
+        iterator = iter(responses)
+
+        def responder(_: str) -> str | None:
+            return next(iterator, None)
+
+    prev = _scripted_responder
+    _scripted_responder = responder
+    try:
+        yield
+    finally:
+        _scripted_responder = prev
+
+
 def get_input(text: str) -> str:
     """Get user input.
 
@@ -896,12 +1433,24 @@ def get_input(text: str) -> str:
     -------
         User input
 
+    Raises
+    ------
+    BeanaheadInputError
+        If input is scripted (see `scripted_input`) and no scripted
+        response remains.
+
     Notes
     -----
     Function included to facilitate mocking user input when testing.
     """
     print_it(text, end=": ")
-    return input()
+    if _scripted_responder is None:
+        return input()
+    response = _scripted_responder(text)
+    if response is None:
+        raise BeanaheadInputError(text)
+    print_it(response)
+    return response
 
 
 def response_is_valid_number(response: str, max_value: int) -> bool:
@@ -931,11 +1480,23 @@ def response_is_valid_number(response: str, max_value: int) -> bool:
     return 0 <= response <= max_value
 
 
-def inject_txns(injection: str, ledger: str):
+INJECT_CHUNK_SIZE = 2**16
+REGEX_ENTRY_LINE = re.compile(r"^\d{4}-\d{2}-\d{2}\s", flags=re.MULTILINE)
+
+
+def _count_entries(text: str) -> int:
+    """Count lines of text that open a dated beancount entry."""
+    return len(REGEX_ENTRY_LINE.findall(text))
+
+
+@profiling.profiled("inject")
+def inject_txns(injection: str | list[str], ledger: str) -> tuple[int, int]:
     """Inject new transactions to a ledger.
 
     New transactions are injected by way of appending the contents of
-    the `injection` file to the end of the `ledger` file.
+    each `injection` file to the end of the `ledger` file. Each injection
+    file is streamed to the ledger in chunks of `INJECT_CHUNK_SIZE`
+    characters.
 
     Parameters
     ----------
@@ -943,22 +1504,53 @@ def inject_txns(injection: str, ledger: str):
     to the cwd. It is not necessary to include the. beancount extension.
     For example, "rx" would refer to the file 'rx.beancount' in the cwd.
 
-    injection : str
-        Path to .beancount file containing the new transactions to be
-        injected to `ledger`.
+    injection : str | list[str]
+        Path to .beancount file, or list of paths to .beancount files,
+        containing the new transactions to be injected to `ledger`. Files
+        are injected in the order received.
 
     ledger: str
         Path to .beancount ledger file to which the new transactions are
         to be injected.
+
+    Returns
+    -------
+    2-tuple of int
+        [0] Number of bytes appended to `ledger`.
+        [1] Number of entries appended to `ledger`.
     """
-    injection_path = get_verified_path(injection)
-    content = get_content(injection_path)
-    content = content.removeprefix(HEADER)
-    content = "\n" + content
+    injections = [injection] if isinstance(injection, str) else injection
+    # verify all paths before writing anything
+    injection_paths = [get_verified_path(inj) for inj in injections]
     ledger_path = get_verified_path(ledger)
 
-    with ledger_path.open("at", encoding=config.ENCODING) as file:
-        file.write(content)
+    n_bytes = n_entries = 0
+    with (
+        locks.lock_files([ledger_path]),
+        ledger_path.open("at", encoding=config.ENCODING) as file,
+    ):
+        for injection_path in injection_paths:
+            tail = ""  # any incomplete last line of previous chunk
+            with injection_path.open("r", encoding=config.ENCODING) as src:
+                chunk = src.read(max(INJECT_CHUNK_SIZE, len(HEADER)))
+                chunk = "\n" + chunk.removeprefix(HEADER)
+                while chunk:
+                    file.write(chunk)
+                    n_bytes += len(chunk.encode(config.ENCODING))
+                    lines, _, tail = (tail + chunk).rpartition("\n")
+                    n_entries += _count_entries(lines)
+                    chunk = src.read(INJECT_CHUNK_SIZE)
+            n_entries += _count_entries(tail)
+        file.flush()
+        os.fsync(file.fileno())
+    BYTES_WRITTEN.inc(n_bytes)
+    FILES_WRITTEN.inc()
+
+    print_it(
+        f"{n_entries} entries ({n_bytes} bytes) from {len(injection_paths)}"
+        f" file(s) have been injected to the ledger '{ledger_path.stem}'."
+    )
+    return n_bytes, n_entries
 
 
 def remove_tags(txn: Transaction, tags: str | list | set) -> Transaction:
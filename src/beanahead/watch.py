@@ -0,0 +1,368 @@
+"""Watch a directory and reconcile new extraction files as they arrive.
+
+The watched directory is polled for beancount files (files with the
+extension defined by the 'extension' configuration option). A file is
+reconciled once it has been unchanged for a settle period, such that files
+still being written are not read. Reconciled entries are output to a
+destination directory, under the same name as the extraction file.
+
+A file is reconciled only once, unless it subsequently changes. A file is
+not reconciled if the destination directory already holds an output for it
+that is newer than the file (i.e. files reconciled by a previous watch are
+not reconciled again).
+
+Potential matches are decided without requesting user input, according to
+a policy (see `MATCH_POLICIES`). By default, reconciling a file that would
+require any decision fails and the file is left for the user to reconcile
+with the `recon` command.
+
+Ledgers are cached between files and only reloaded if changed (see
+`utils.enable_load_cache`).
+"""
+
+from __future__ import annotations
+
+import contextlib
+import datetime
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from . import config, reconcile, utils
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+INTERVAL_DFLT = 2.0
+SETTLE_DFLT = 2.0
+DEST_DIRNAME_DFLT = "reconciled"
+LOG_FILENAME = "beanahead_watch.log"
+
+FileState = tuple[int, int]  # (mtime_ns, size)
+
+# Policies for deciding potential matches:
+#   "fail" - fail the file if any potential match is found.
+#   "accept" - confirm a single potential match and choose the first of
+#       multiple potential matches.
+#   "skip" - reject all potential matches.
+#   "prompt" - request user decide, as the `recon` command. Only for
+#       attended use.
+MATCH_POLICIES = ("fail", "accept", "skip", "prompt")
+MATCH_POLICY_DFLT = "fail"
+
+
+def _respond_accept(text: str) -> str | None:
+    """Respond to a request for input by accepting the first match."""
+    if text == reconcile.MSG_SINGLE_MATCH:
+        return "y"
+    if text.startswith(reconcile.MSG_MULT_MATCH):
+        return "0"
+    return None
+
+
+def _respond_skip(text: str) -> str | None:
+    """Respond to a request for input by rejecting all matches."""
+    if text == reconcile.MSG_SINGLE_MATCH or text.startswith(reconcile.MSG_MULT_MATCH):
+        return "n"
+    return None
+
+
+def _respond_fail(_: str) -> None:
+    """Respond to a request for input by providing no response."""
+    return
+
+
+RESPONDERS: dict[str, Callable[[str], str | None]] = {
+    "fail": _respond_fail,
+    "accept": _respond_accept,
+    "skip": _respond_skip,
+}
+
+
+def _get_state(path: Path) -> FileState | None:
+    """Get state of a file, None if file does not exist."""
+    try:
+        stat = path.stat()
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+@dataclass
+class WatchResult:
+    """Result of reconciling an extraction file.
+
+    Attributes
+    ----------
+    path
+        Path to extraction file.
+
+    output
+        Path to which reconciled entries were output.
+
+    seconds
+        Seconds to reconcile file.
+
+    error
+        Any error raised when reconciling the file, None if no error
+        raised.
+    """
+
+    path: Path
+    output: Path
+    seconds: float = 0.0
+    error: Exception | None = None
+
+    @property
+    def ok(self) -> bool:
+        """Query if file was reconciled without error."""
+        return self.error is None
+
+
+class Watcher:
+    """Watch a directory and reconcile new extraction files.
+
+    Parameters
+    ----------
+    dirpath
+        Path to directory to watch.
+
+    ledgers
+        Paths to Expected Transactions Ledgers against which to reconcile
+        new transactions. Paths as for `reconcile.reconcile_new_txns`.
+
+    dest
+        Path to directory to which to output reconciled entries. Created
+        if it does not exist. By default, the 'reconciled' subdirectory
+        of `dirpath`. Cannot be `dirpath`.
+
+    interval
+        Seconds between polls of `dirpath`.
+
+    settle
+        Seconds for which a file must remain unchanged before it is
+        reconciled.
+
+    remove
+        As for `reconcile.reconcile_new_txns`.
+
+    ascending
+        As for `reconcile.reconcile_new_txns`.
+
+    matches
+        Policy by which to decide potential matches, one of
+        `MATCH_POLICIES`.
+    """
+
+    def __init__(
+        self,
+        dirpath: str | Path,
+        ledgers: list[str],
+        dest: str | Path | None = None,
+        *,
+        interval: float = INTERVAL_DFLT,
+        settle: float = SETTLE_DFLT,
+        remove: bool = True,
+        ascending: bool = True,
+        matches: str = MATCH_POLICY_DFLT,
+    ):
+        if matches not in MATCH_POLICIES:
+            msg = (
+                f"'{matches}' is not a valid match policy. Valid policies:"
+                f" {MATCH_POLICIES}."
+            )
+            raise ValueError(msg)
+        self.dirpath = Path(dirpath).resolve()
+        if not self.dirpath.is_dir():
+            msg = f"'{dirpath}' is not a directory."
+            raise NotADirectoryError(msg)
+        self.ledgers = [utils.get_verified_path(ledger) for ledger in ledgers]
+        self._ledgers = {ledger.resolve() for ledger in self.ledgers}
+        dest = self.dirpath / DEST_DIRNAME_DFLT if dest is None else dest
+        self.dest = Path(dest).resolve()
+        if self.dest == self.dirpath:
+            raise ValueError("'dest' cannot be the watched directory.")
+        self.dest.mkdir(parents=True, exist_ok=True)
+        self.interval = interval
+        self.settle = settle
+        self.remove = remove
+        self.ascending = ascending
+        self.matches = matches
+        # {path: (state, time first seen in state)}
+        self._pending: dict[Path, tuple[FileState, float]] = {}
+        self._done: dict[Path, FileState] = {}
+
+    def _is_done(self, path: Path, state: FileState) -> bool:
+        """Query if file has already been reconciled in its current state."""
+        if self._done.get(path) == state:
+            return True
+        out_state = _get_state(self.dest / path.name)
+        return out_state is not None and out_state[0] >= state[0]
+
+    def poll(self, now: float | None = None) -> list[Path]:
+        """Poll watched directory for files ready to be reconciled.
+
+        Parameters
+        ----------
+        now
+            Time of poll, as `time.monotonic`. By default, now.
+
+        Returns
+        -------
+        list of Path
+            Paths to files ready to be reconciled, sorted by name.
+        """
+        now = time.monotonic() if now is None else now
+        ready, seen = [], set()
+        for path in sorted(self.dirpath.glob(f"*{config.SETTINGS.extension}")):
+            if path in self._ledgers or (state := _get_state(path)) is None:
+                continue
+            seen.add(path)
+            if self._is_done(path, state):
+                continue
+            prev = self._pending.get(path)
+            if prev is None or prev[0] != state:
+                self._pending[path] = (state, now)
+            elif now - prev[1] >= self.settle:
+                ready.append(path)
+        for path in set(self._pending) - seen:
+            del self._pending[path]
+        return ready
+
+    def process(self, path: Path) -> WatchResult:
+        """Reconcile an extraction file.
+
+        Potential matches are decided according to the `matches` policy.
+        Any error raised when reconciling the file, including if a
+        decision is required under the "fail" policy, is recorded to the
+        result. The result is logged.
+        """
+        utils.refresh_today()
+        config.refresh_settings()
+        state = _get_state(path)
+        result = WatchResult(path, self.dest / path.name)
+        start = time.perf_counter()
+        responder = RESPONDERS.get(self.matches)
+        try:
+            with (
+                contextlib.nullcontext()
+                if responder is None
+                else utils.scripted_input(responder)
+            ):
+                reconcile.reconcile_new_txns(
+                    str(path),
+                    [str(ledger) for ledger in self.ledgers],
+                    remove=self.remove,
+                    output=str(result.output),
+                    ascending=self.ascending,
+                )
+        except Exception as err:  # noqa: BLE001
+            result.error = err
+        result.seconds = time.perf_counter() - start
+        self._pending.pop(path, None)
+        if state is not None:
+            self._done[path] = state
+        self._log(result)
+        return result
+
+    def _log(self, result: WatchResult):
+        """Print result and append to log file in destination directory."""
+        status = "ok" if result.ok else f"FAILED - {result.error!r}"
+        utils.print_it(f"{result.path.name} ({result.seconds:.3f}s): {status}")
+        timestamp = datetime.datetime.now().isoformat(timespec="seconds")  # noqa: DTZ005
+        line = f"{timestamp}\t{result.path.name}\t{result.seconds:.6f}\t{status}\n"
+        with (self.dest / LOG_FILENAME).open("a", encoding=config.ENCODING) as file:
+            file.write(line)
+
+    def run(self, max_polls: int | None = None) -> list[WatchResult]:
+        """Watch directory, reconciling files as they become ready.
+
+        Parameters
+        ----------
+        max_polls
+            Number of polls after which to stop watching. By default,
+            watch until interrupted.
+
+        Returns
+        -------
+        list of WatchResult
+            Results for each file reconciled.
+        """
+        results = []
+        utils.enable_load_cache()
+        try:
+            n = 0
+            while max_polls is None or n < max_polls:
+                results += [self.process(path) for path in self.poll()]
+                n += 1
+                if max_polls is None or n < max_polls:
+                    time.sleep(self.interval)
+        finally:
+            utils.enable_load_cache(False)  # noqa: FBT003
+        return results
+
+
+def watch(
+    dirpath: str,
+    ledgers: list[str],
+    dest: str | None = None,
+    *,
+    interval: float = INTERVAL_DFLT,
+    settle: float = SETTLE_DFLT,
+    remove: bool = True,
+    ascending: bool = True,
+    matches: str = MATCH_POLICY_DFLT,
+):
+    """Watch a directory and reconcile new extraction files until interrupted.
+
+    See module docstring.
+
+    Parameters
+    ----------
+    dirpath
+        Path to directory to watch.
+
+    ledgers
+        Paths to Expected Transactions Ledgers against which to reconcile
+        new transactions.
+
+    dest
+        Path to directory to which to output reconciled entries. By
+        default, the 'reconciled' subdirectory of `dirpath`.
+
+    interval
+        Seconds between polls of `dirpath`.
+
+    settle
+        Seconds for which a file must remain unchanged before it is
+        reconciled.
+
+    remove
+        As for `reconcile.reconcile_new_txns`.
+
+    ascending
+        As for `reconcile.reconcile_new_txns`.
+
+    matches
+        Policy by which to decide potential matches, one of
+        `MATCH_POLICIES`.
+    """
+    watcher = Watcher(
+        dirpath,
+        ledgers,
+        dest,
+        interval=interval,
+        settle=settle,
+        remove=remove,
+        ascending=ascending,
+        matches=matches,
+    )
+    utils.print_it(
+        f"Watching '{watcher.dirpath}'. Reconciled entries will be output to"
+        f" '{watcher.dest}'. Press Ctrl+C to stop."
+    )
+    try:
+        watcher.run()
+    except KeyboardInterrupt:
+        utils.print_it("Stopped watching.")
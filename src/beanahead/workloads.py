@@ -0,0 +1,401 @@
+"""End-to-end workloads on synthetic ledgers.
+
+Each workload administers a beanahead command against ledgers generated
+by `synthetic.generate`:
+    "addrx" - add Regular Expected Transactions through to 90 days after
+        the scale's end date.
+    "recon" - reconcile the extraction file against the 'rx' and 'x'
+        ledgers, accepting the first potential match offered for each
+        expected transaction.
+    "exp" - administer expired transactions on the 'x' and 'rx' ledgers,
+        rolling all expired transactions forwards.
+    "inject" - inject the extraction file to the main ledger.
+
+Workloads are administered as of the scale's end date (i.e. with today
+set to the end date), without requesting user input (see `respond`) and
+with output suppressed. Use `measure` to administer a
+workload on freshly generated ledgers and record its time and memory
+usage, or `bench` to benchmark workloads over repeated runs.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import datetime
+import io
+import math
+import statistics
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+from . import expired, profiling, reconcile, rx_txns, synthetic, utils
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterator
+
+ADDRX_DAYS = 90
+
+# scale of ledgers against which to warm up a workload before measuring it
+WARMUP_SCALE = synthetic.Scale(
+    n_txns=10, n_defs=2, n_x_txns=2, n_new=2, n_accounts=2, n_payees=2
+)
+WARMUP_DIRNAME = "warmup"
+
+
+def respond(text: str) -> str:
+    """Respond to a request for user input.
+
+    Confirms a single potential match and chooses the first of multiple
+    potential matches. Responds 'n' to any other request.
+
+    Parameters
+    ----------
+    text
+        Text introducing request for user input.
+    """
+    if text == reconcile.MSG_SINGLE_MATCH:
+        return "y"
+    if text.startswith(reconcile.MSG_MULT_MATCH):
+        return "0"
+    return "n"
+
+
+@contextlib.contextmanager
+def _today(today: datetime.date) -> Iterator[None]:
+    """Context manager within which today is set to `today`.
+
+    Prior value of today is restored on exit.
+    """
+    prev = utils.TODAY
+    utils.refresh_today(today)
+    try:
+        yield
+    finally:
+        utils.refresh_today(prev)
+
+
+def addrx(generated: synthetic.Generated):
+    """Add Regular Expected Transactions."""
+    paths = generated.paths
+    admin = rx_txns.Admin(str(paths["rx_def"]), str(paths["rx"]), str(paths["main"]))
+    admin.add_txns(generated.scale.end + datetime.timedelta(ADDRX_DAYS))
+
+
+def recon(generated: synthetic.Generated):
+    """Reconcile new transactions, accepting first match offered."""
+    paths = generated.paths
+    output = paths["extraction"].with_name("reconciled" + paths["extraction"].suffix)
+    reconcile.reconcile_new_txns(
+        str(paths["extraction"]),
+        [str(paths["rx"]), str(paths["x"])],
+        output=str(output),
+    )
+
+
+def exp(generated: synthetic.Generated):
+    """Administer expired transactions, rolling all forwards."""
+    paths = generated.paths
+    expired.admin_expired_txns([str(paths["x"]), str(paths["rx"])], ["roll"], auto=True)
+
+
+def inject(generated: synthetic.Generated):
+    """Inject new transactions to the main ledger."""
+    utils.inject_txns(str(generated.paths["extraction"]), str(generated.paths["main"]))
+
+
+WORKLOADS: dict[str, Callable[[synthetic.Generated], None]] = {
+    "addrx": addrx,
+    "recon": recon,
+    "exp": exp,
+    "inject": inject,
+}
+
+
+@dataclass
+class Measurement:
+    """Measurement of a workload.
+
+    Attributes
+    ----------
+    name
+        Workload name.
+
+    scale
+        Scale of ledgers against which workload administered.
+
+    seconds
+        Wall time to administer workload. If memory was profiled then
+        includes the overhead of tracing memory allocations.
+
+    peak_bytes
+        Peak memory allocated whilst administering workload, relative to
+        memory allocated when the workload started. 0 if memory not
+        profiled.
+
+    retained_bytes
+        Memory allocated by the workload that had not been released when
+        it finished. 0 if memory not profiled.
+
+    report
+        Profiling report of workload's phases, as `profiling.get_report`.
+    """
+
+    name: str
+    scale: synthetic.Scale
+    seconds: float
+    peak_bytes: int
+    retained_bytes: int
+    report: dict[str, dict[str, Any]]
+
+
+def run(name: str, generated: synthetic.Generated):
+    """Administer a workload.
+
+    Parameters
+    ----------
+    name
+        Workload name, key of `WORKLOADS`.
+
+    generated
+        Ledgers against which to administer workload. Ledgers may be
+        modified. Workload is administered with today set to the end date
+        of the ledgers' scale.
+    """
+    if name not in WORKLOADS:
+        msg = f"'{name}' is not a valid workload. Valid workloads: {list(WORKLOADS)}."
+        raise ValueError(msg)
+    with (
+        _today(generated.scale.end),
+        synthetic.account_root_names(generated.scale.root_names),
+        contextlib.redirect_stdout(io.StringIO()),
+        contextlib.redirect_stderr(io.StringIO()),
+        utils.scripted_input(respond),
+    ):
+        WORKLOADS[name](generated)
+
+
+def measure(
+    name: str,
+    scale: synthetic.Scale,
+    dirpath: str | Path,
+    memory: bool = True,  # noqa: FBT001, FBT002
+    warmup: bool = True,  # noqa: FBT001, FBT002
+) -> Measurement:
+    """Measure a workload administered on freshly generated ledgers.
+
+    Parameters
+    ----------
+    name
+        Workload name, key of `WORKLOADS`.
+
+    scale
+        Scale of ledgers against which to administer workload.
+
+    dirpath
+        Path to directory to which to generate ledgers. Any existing
+        generated ledgers will be overwritten.
+
+    memory
+        True to profile memory, False to only time workload.
+
+    warmup
+        True to administer the workload on minimal ledgers (generated to
+        a 'warmup' subdirectory of `dirpath`) before measuring it, such
+        that one-off costs (for example lazy imports and caches) are
+        excluded from the measurement.
+    """
+    if warmup:
+        dirpath_warmup = Path(dirpath) / WARMUP_DIRNAME
+        run(name, synthetic.generate(dirpath_warmup, WARMUP_SCALE))
+    generated = synthetic.generate(dirpath, scale)
+    phase_name = f"workload.{name}"
+    with profiling.profile(memory=memory):
+        start = time.perf_counter()
+        with profiling.phase(phase_name):
+            run(name, generated)
+        seconds = time.perf_counter() - start
+    report = profiling.get_report()
+    stats = report[phase_name]
+    return Measurement(
+        name, scale, seconds, stats["peak_bytes"], stats["retained_bytes"], report
+    )
+
+
+PERCENTILES = (50, 90, 99)
+
+
+def get_scale(n_txns: int = 10_000, seed: int = 0) -> synthetic.Scale:
+    """Get a scale with ledger sizes proportional to the main ledger.
+
+    Parameters
+    ----------
+    n_txns
+        Number of transactions on the main ledger.
+
+    seed
+        Seed of random number generator.
+    """
+    return synthetic.Scale(
+        n_txns=n_txns,
+        n_defs=max(n_txns // 100, 1),
+        n_x_txns=max(n_txns // 100, 1),
+        n_new=max(n_txns // 50, 1),
+        n_payees=max(n_txns // 20, 1),
+        seed=seed,
+    )
+
+
+def count_entries(name: str, counts: dict[str, int]) -> int:
+    """Count entries processed by a workload.
+
+    Parameters
+    ----------
+    name
+        Workload name, key of `WORKLOADS`.
+
+    counts
+        Number of entries of each generated file, as `Generated.counts`.
+    """
+    keys = {
+        # the main ledger, which includes the 'rx' and 'x' ledgers, is loaded
+        "addrx": ("main", "rx", "x", "rx_def"),
+        "recon": ("extraction", "rx", "x"),
+        "exp": ("rx", "x"),
+        "inject": ("extraction",),
+    }[name]
+    return sum(counts[k] for k in keys)
+
+
+def percentile(values: list[float], q: float) -> float:
+    """Get percentile of values by nearest rank.
+
+    Parameters
+    ----------
+    values
+        Values, need not be sorted.
+
+    q
+        Percentile, 0 < q <= 100.
+    """
+    values = sorted(values)
+    return values[max(math.ceil(q / 100 * len(values)), 1) - 1]
+
+
+@dataclass
+class BenchResult:
+    """Result of benchmarking a workload.
+
+    Attributes
+    ----------
+    name
+        Workload name.
+
+    scale
+        Scale of ledgers against which workload administered.
+
+    entries
+        Number of entries processed by each run of the workload.
+
+    seconds
+        Wall time of each run.
+
+    peak_bytes
+        Peak memory allocated by a run, None if memory not measured.
+    """
+
+    name: str
+    scale: synthetic.Scale
+    entries: int
+    seconds: list[float]
+    peak_bytes: int | None = None
+
+    @property
+    def throughput(self) -> float:
+        """Entries processed per second, based on median run time."""
+        return self.entries / statistics.median(self.seconds)
+
+    def percentile(self, q: float) -> float:
+        """Get percentile of run times, in seconds."""
+        return percentile(self.seconds, q)
+
+
+def bench(
+    names: list[str],
+    scale: synthetic.Scale,
+    dirpath: str | Path,
+    repeat: int = 5,
+    memory: bool = True,  # noqa: FBT001, FBT002
+) -> list[BenchResult]:
+    """Benchmark workloads.
+
+    Each workload is warmed up and then timed over `repeat` runs, each on
+    freshly generated ledgers. Memory is measured over a further run, such
+    that the overhead of tracing memory does not inflate run times.
+
+    Parameters
+    ----------
+    names
+        Names of workloads to benchmark, keys of `WORKLOADS`.
+
+    scale
+        Scale of ledgers against which to administer workloads.
+
+    dirpath
+        Path to directory to which to generate ledgers.
+
+    repeat
+        Number of timed runs of each workload.
+
+    memory
+        True to measure peak memory of each workload.
+    """
+    if repeat < 1:
+        msg = f"'repeat' must be a positive integer, although received {repeat}."
+        raise ValueError(msg)
+    results = []
+    for name in names:
+        seconds = [
+            measure(name, scale, dirpath, memory=False, warmup=not i).seconds
+            for i in range(repeat)
+        ]
+        peak = None
+        if memory:
+            peak = measure(name, scale, dirpath, warmup=False).peak_bytes
+        counts = synthetic.read_manifest(dirpath).counts
+        results.append(
+            BenchResult(name, scale, count_entries(name, counts), seconds, peak)
+        )
+    return results
+
+
+def format_bench_report(results: list[BenchResult]) -> str:
+    """Format results of benchmarking workloads as a table.
+
+    Run times are reported as percentiles (see `PERCENTILES`), in
+    milliseconds.
+    """
+    header = f"{'workload':<9}  {'entries':>9}  {'entries/s':>11}"
+    header += "".join(f"  {f'p{q} ms':>10}" for q in PERCENTILES)
+    header += f"  {'peak MiB':>9}"
+    lines = [header]
+    for result in results:
+        line = f"{result.name:<9}  {result.entries:>9}  {result.throughput:>11.1f}"
+        line += "".join(f"  {result.percentile(q) * 1000:>10.1f}" for q in PERCENTILES)
+        peak = "-" if result.peak_bytes is None else f"{result.peak_bytes / 2**20:.1f}"
+        line += f"  {peak:>9}"
+        lines.append(line)
+    return "\n".join(lines)
+
+
+def print_bench_report(results: list[BenchResult]):
+    """Print results of benchmarking workloads."""
+    if results:
+        result = results[0]
+        utils.print_it(
+            f"Benchmark of {len(results)} workload(s) on synthetic ledgers of"
+            f" {result.scale.n_txns} transactions (seed {result.scale.seed}),"
+            f" {len(result.seconds)} timed run(s) each.\n"
+        )
+    utils.print_it(format_bench_report(results))
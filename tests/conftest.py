@@ -155,6 +155,7 @@ def settings_dflt() -> abc.Iterator[config.Settings]:
         name_liabilities="Liabilities",
         print_stream=config.PrintStream.STDOUT,
         extension=".beancount",
+        lock_timeout=10.0,
     )
 
 
@@ -172,6 +173,7 @@ def settings_alt() -> abc.Iterator[config.Settings]:
         name_expenses="Gastos",
         print_stream=config.PrintStream.STDERR,
         extension=".bean",
+        lock_timeout=5.0,
     )
 
 
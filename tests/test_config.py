@@ -29,6 +29,9 @@ def dflt_config() -> abc.Iterator[str]:
 
         print-stream = stdout  # from ('stdout', 'stderr')
         extension = beancount  # Default extension for beancount files
+        lock-timeout = 10  # Seconds to wait to acquire a file lock
+        holidays =   # Path to file of holiday dates, one per line
+        exp-rules =   # Rules to administer expired txns, e.g. remove,days=30;roll
         """
     )
 
@@ -50,6 +53,9 @@ def test_constants(account_root_names_dflt, encoding, dflt_config):
         "name-expenses": "Expenses",
         "print-stream": "stdout",
         "extension": "beancount",
+        "lock-timeout": "10",
+        "holidays": "",
+        "exp-rules": "",
     }
     assert account_root_names_dflt == m.BC_DEFAULT_ACCOUNT_ROOT_NAMES
     assert dflt_config == m.DFLT_CONFIG
@@ -168,6 +174,24 @@ def test_parse_config(config_dflt, settings_dflt, config_alt, settings_alt):
     assert parsed_settings == settings_dflt  # Check all as default values
     assert parsed_settings.name_assets == "Assets"  # Double check default value used
 
+    # Test 'lock-timeout'
+    valid_config = copy.copy(config_dflt)
+    valid_config["lock-timeout"] = "2.5"
+    assert m.parse_config(valid_config).lock_timeout == 2.5
+    for value in ("-1", "never"):
+        invalid_config = copy.copy(config_dflt)
+        invalid_config["lock-timeout"] = value
+        with pytest.warns(
+            m.ConfigInvalidValueWarning,
+            match=(
+                f"'{value}' is not a valid value for the configuration"
+                " option lock-timeout"
+            ),
+        ):
+            parsed_settings = m.parse_config(invalid_config)
+        assert parsed_settings == settings_dflt
+        assert parsed_settings.lock_timeout == 10.0
+
 
 @pytest.mark.usefixtures("config_path_mp_alt")
 def test_load_config(config_alt):
@@ -181,6 +205,22 @@ def test_get_settings_from_config(settings_alt):
     assert m.get_settings_from_config() == settings_alt
 
 
+@pytest.mark.usefixtures("config_path_mp_alt")
+def test_refresh_settings(monkeypatch, settings_dflt, settings_alt):
+    """Test settings reset only when configuration file changed."""
+    # register with monkeypatch to restore on teardown
+    monkeypatch.setattr("beanahead.config.SETTINGS", settings_dflt)
+    monkeypatch.setattr("beanahead.config._config_file_state", None)
+    version = m.SETTINGS_VERSION
+    assert m.refresh_settings()
+    assert settings_alt == m.SETTINGS
+    assert version + 1 == m.SETTINGS_VERSION
+    settings = m.SETTINGS
+    assert not m.refresh_settings()
+    assert m.SETTINGS is settings
+    assert version + 1 == m.SETTINGS_VERSION
+
+
 def test_default_print_stream(capsys):
     """Verify default print stream and effect."""
     assert m.SETTINGS.print_stream == m.PrintStream.STDOUT
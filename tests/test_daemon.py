@@ -0,0 +1,181 @@
+"""Tests for `daemon` module."""
+
+import datetime
+import shutil
+import threading
+from collections import abc
+from pathlib import Path
+
+import pytest
+
+from beanahead import config, utils
+from beanahead import daemon as m
+from beanahead.scripts import cli
+
+from .conftest import set_cl_args
+
+
+@pytest.fixture
+def ledgers_copy(res_dir, temp_dir) -> abc.Iterator[dict[str, Path]]:
+    """Paths to copies of the 'expired' x and rx ledgers in temp_dir."""
+    d = {}
+    for k in ("x", "rx"):
+        d[k] = Path(shutil.copy(res_dir / "expired" / f"{k}.beancount", temp_dir))
+    yield d
+    for path in d.values():
+        path.unlink()
+
+
+@pytest.fixture
+def socket_path(temp_dir) -> abc.Iterator[Path]:
+    path = temp_dir / "beanahead.sock"
+    yield path
+    path.unlink(missing_ok=True)
+
+
+@pytest.fixture
+def today_mp(monkeypatch) -> abc.Iterator[datetime.date]:
+    """Set today as 2022-11-15, restoring all dependent values on teardown."""
+    today = datetime.date(2022, 11, 15)
+    # register attributes with monkeypatch so restored on teardown
+    for attr in ("utils.TODAY", "expired.TODAY", "expired.TOMORROW"):
+        monkeypatch.setattr(f"beanahead.{attr}", today)
+    monkeypatch.setattr("beanahead.rx_txns.END_DFLT", today)
+    monkeypatch.setattr("beanahead.utils.get_today", lambda: today)
+    utils.refresh_today(today - datetime.timedelta(1))
+    yield today
+
+
+@pytest.mark.usefixtures("today_mp")
+def test_handle_request(ledgers_copy, temp_dir, encoding):
+    f = m.handle_request
+    x, rx = ledgers_copy["x"], ledgers_copy["rx"]
+
+    rtrn = f({"cmd": "ping"})
+    assert rtrn == {"ok": True, "output": "", "result": None, "error": None}
+
+    rtrn = f({"cmd": "nope"})
+    assert not rtrn["ok"]
+    assert rtrn["error"].startswith("'nope' is not a valid cmd.")
+
+    # verify today refreshed from clock and paths relative to cwd
+    args = {"ledgers": ["x", "rx"], "rules": ["roll,tag=rx_txn"], "auto": True}
+    rtrn = f({"cmd": "exp", "args": args, "cwd": str(temp_dir)})
+    assert rtrn["ok"] and rtrn["error"] is None
+    out = rtrn["output"]
+    assert "x: 0 rolled forwards to 2022-11-16, 0 removed, 4 left as is." in out
+    assert "rx: 1 rolled forwards to 2022-11-16" in out
+    assert "2022-11-16" in rx.read_text(encoding)
+
+    # verify scripted input, 4 responses required although only 1 provided
+    args = {"ledgers": [str(x)], "rules": []}
+    rtrn = f({"cmd": "exp", "args": args, "input": ["3"]})
+    assert not rtrn["ok"]
+    assert rtrn["error"].startswith("BeanaheadInputError: Input was requested")
+    assert "The following transaction has expired." in rtrn["output"]
+
+    # remove A and B, leave C and D
+    rtrn = f({"cmd": "exp", "args": args, "input": ["2", "2", "3", "3"]})
+    assert rtrn["ok"]
+    payees = [txn.payee for txn in utils.get_unverified_txns(x)]
+    assert payees == ["C", "D", "E"]
+
+    rtrn = f({"cmd": "exp", "args": {"not_a_param": 3}})
+    assert not rtrn["ok"]
+    assert rtrn["error"].startswith("TypeError:")
+
+    rtrn = f({"cmd": "exp", "args": ["x"]})
+    assert not rtrn["ok"]
+    assert rtrn["error"] == "TypeError: args must be a JSON object."
+
+
+def test_handle_request_settings_error(monkeypatch):
+    """Test error reading settings is returned in the response."""
+
+    def raise_():
+        raise ValueError("invalid configuration")
+
+    monkeypatch.setattr("beanahead.config.refresh_settings", raise_)
+    rtrn = m.handle_request({"cmd": "exp", "args": {"ledgers": []}})
+    assert rtrn == {
+        "ok": False,
+        "output": "",
+        "result": None,
+        "error": "ValueError: invalid configuration",
+    }
+
+
+def test_handle_request_account_root_names(res_dir, monkeypatch):
+    """Test account root names set for a request are reverted."""
+    names = config.get_account_root_names()
+    main = str(res_dir / "defs" / "ledger_opts.beancount")
+
+    def get_names(**_) -> dict[str, str]:
+        return config.get_account_root_names()
+
+    for cmd in m.OPERATIONS:
+        monkeypatch.setitem(m.OPERATIONS, cmd, get_names)
+    for cmd in ("recon", "exp", "inject"):
+        rtrn = m.handle_request({"cmd": cmd, "main": main})
+        assert rtrn["ok"], rtrn["error"]
+        assert rtrn["result"]["name_assets"] == "Biens"
+        assert config.get_account_root_names() == names
+
+    # verify names from 'main' arg of addrx
+    rtrn = m.handle_request({"cmd": "addrx", "args": {"main": main}})
+    assert rtrn["result"]["name_assets"] == "Biens"
+    assert config.get_account_root_names() == names
+
+    # verify daemon's names used if 'main' not passed
+    assert m.handle_request({"cmd": "inject"})["result"] == names
+
+    # verify names reverted if request fails
+    monkeypatch.setitem(m.OPERATIONS, "inject", utils.inject_txns)
+    rtrn = m.handle_request({"cmd": "inject", "main": main})
+    assert not rtrn["ok"]
+    assert config.get_account_root_names() == names
+
+
+@pytest.mark.usefixtures("today_mp")
+def test_server(ledgers_copy, socket_path, temp_dir):
+    server = m.Server(socket_path)
+    thread = threading.Thread(target=server.serve)
+    thread.start()
+    try:
+        assert m.is_serving(socket_path)
+        with pytest.raises(OSError, match="A daemon is already listening"):
+            m.Server(socket_path)
+
+        assert m.send_request({"cmd": "ping"}, socket_path)["ok"]
+        args = {"ledgers": ["x", "rx"], "rules": ["remove"], "auto": True}
+        request = {"cmd": "exp", "args": args, "cwd": str(temp_dir)}
+        rtrn = m.send_request(request, socket_path)
+        assert rtrn["ok"], rtrn["error"]
+        txns = utils.get_unverified_txns(ledgers_copy["x"])
+        assert [txn.payee for txn in txns] == ["E"]
+        assert m.send_request({"cmd": "shutdown"}, socket_path)["ok"]
+    finally:
+        thread.join(timeout=5)
+    assert not thread.is_alive()
+    assert not socket_path.exists()
+    assert utils._load_cache is None
+
+
+@pytest.mark.usefixtures("today_mp", "ledgers_copy")
+def test_cli_serve(socket_path, temp_dir, capsys):
+    set_cl_args(f"serve --socket {socket_path}")
+    thread = threading.Thread(target=cli.main)
+    thread.start()
+    try:
+        for _ in range(100):
+            if m.is_serving(socket_path):
+                break
+            threading.Event().wait(0.05)
+        request = {"cmd": "inject", "args": {"injection": "x", "ledger": "rx"}}
+        rtrn = m.send_request({**request, "cwd": str(temp_dir)}, socket_path)
+        assert rtrn["ok"], rtrn["error"]
+        assert rtrn["result"][1] == 5  # entries injected
+    finally:
+        m.send_request({"cmd": "shutdown"}, socket_path)
+        thread.join(timeout=5)
+    assert capsys.readouterr().out.startswith("beanahead daemon listening on")
@@ -62,3 +62,13 @@ def test_BeanaheadWriteError(path):
     error = m.BeanaheadWriteError(path, reverted=None, overwrite=False)
     expected = f"An error occurred when attempting to write to '{path}'."
     assert str(error) == expected
+
+
+def test_BeanaheadInputError():
+    error = m.BeanaheadInputError("Choose one of the above options, [0-3]:")
+    assert isinstance(error, Exception)
+    expected = (
+        "Input was requested although no further input is available. The"
+        " request was:\nChoose one of the above options, [0-3]:"
+    )
+    assert str(error) == expected
@@ -8,7 +8,7 @@ from pathlib import Path
 
 import pytest
 
-from beanahead import errors
+from beanahead import errors, utils
 from beanahead import expired as m
 from beanahead.scripts import cli
 
@@ -195,10 +195,17 @@ def test_overwrite_ledgers(filepaths_recon_copy, encoding):
 
     chgd_x_contents = orig_contents_x.replace(x_first_line, "")
     chgd_rx_contents = orig_contents_x.replace(rx_first_line, "")
-    m.overwrite_ledgers({x: chgd_x_contents, rx: chgd_rx_contents})
+    rtrn = m.overwrite_ledgers({x: chgd_x_contents, rx: chgd_rx_contents})
+    assert rtrn == [x, rx]
     assert x.read_text(encoding) == chgd_x_contents
     assert rx.read_text(encoding) == chgd_rx_contents
 
+    # verify only writes ledgers with changed content
+    rtrn = m.overwrite_ledgers({x: chgd_x_contents, rx: orig_contents_rx})
+    assert rtrn == [rx]
+    assert rx.read_text(encoding) == orig_contents_rx
+    assert m.overwrite_ledgers({x: chgd_x_contents, rx: chgd_rx_contents}) == [rx]
+
     # check raises and reverts when new contents would result in loading error
     invalid_contents_rx = orig_contents_rx[3:]
     with pytest.raises(errors.BeanaheadWriteError):
@@ -225,6 +232,53 @@ def test_overwrite_ledgers(filepaths_recon_copy, encoding):
     assert rx.read_text(encoding) == orig_contents_rx
 
 
+def test_rule_from_string():
+    f = m.Rule.from_string
+    assert f("roll") == m.Rule(m.Action.ROLL)
+    rule = f(" Remove, days=30 ,tag=trip,account=Liabilities:US:Chase ")
+    assert rule == m.Rule(m.Action.REMOVE, 30, "trip", "Liabilities:US:Chase")
+    assert str(rule) == "remove,days=30,tag=trip,account=Liabilities:US:Chase"
+    assert f(str(rule)) == rule
+
+    with pytest.raises(ValueError, match="'move' is not a valid action"):
+        f("move,days=3")
+    with pytest.raises(ValueError, match="'dayz=3' is not a valid filter"):
+        f("roll,dayz=3")
+    with pytest.raises(ValueError, match="'days' must be a non-negative integer"):
+        f("roll,days=-3")
+
+    rules = m.parse_rules("remove,days=30;; leave,tag=trip ;roll")
+    assert rules == [
+        m.Rule(m.Action.REMOVE, days=30),
+        m.Rule(m.Action.LEAVE, tag="trip"),
+        m.Rule(m.Action.ROLL),
+    ]
+    assert m.parse_rules("") == []
+
+
+def test_rule_matches(monkeypatch, filepaths_copy):
+    mock_today(datetime.date(2022, 11, 15), monkeypatch)
+    a, b, c, d, _ = utils.get_unverified_txns(filepaths_copy["x"])
+    f, _ = utils.get_unverified_txns(filepaths_copy["rx"])
+
+    rule = m.Rule(m.Action.REMOVE, days=41)
+    assert rule.matches(a) and rule.matches(b) and rule.matches(c)
+    assert not rule.matches(d)
+
+    assert m.Rule(m.Action.ROLL, tag="rx_txn").matches(f)
+    assert not m.Rule(m.Action.ROLL, tag="rx_txn").matches(a)
+
+    for account in ("Liabilities:US:Chase", "Liabilities:US:Chase:Slate"):
+        assert m.Rule(m.Action.LEAVE, account=account).matches(a)
+    assert not m.Rule(m.Action.LEAVE, account="Liabilities:US:Cha").matches(a)
+    assert not m.Rule(m.Action.LEAVE, account="Liabilities:US:Chase").matches(f)
+
+    rules = m.parse_rules("remove,days=41,account=Liabilities;roll,tag=rx_txn")
+    assert m.get_action(a, rules) is m.Action.REMOVE
+    assert m.get_action(f, rules) is m.Action.ROLL
+    assert m.get_action(d, rules) is None
+
+
 class TestAdminExpiredTxns:
     """Tests for function `admin_expired_txns`."""
 
@@ -388,3 +442,105 @@ class TestAdminExpiredTxns:
         assert capsys.readouterr().err.endswith(expected_print)
         assert filepath_x.read_text(encoding) == expected_x
         assert filepath_rx.read_text(encoding) == expected_rx
+
+    def test_rules_auto(self, monkeypatch, filepaths_copy, encoding, capsys):
+        mock_today(datetime.date(2022, 11, 15), monkeypatch)
+        tomorrow = datetime.date(2022, 11, 16)
+        mock_tomorrow(tomorrow, monkeypatch)
+
+        filepath_x = filepaths_copy["x"]
+        filepath_rx = filepaths_copy["rx"]
+        rules = ["remove,days=41,account=Liabilities:US:Chase", "roll"]
+        m.admin_expired_txns([str(filepath_x), str(filepath_rx)], rules, auto=True)
+
+        expected_print = get_expected_output(
+            rf"""
+            Expired transactions administered by rules:
+            x: 1 rolled forwards to {tomorrow}, 3 removed, 0 left as is.
+            rx: 1 rolled forwards to {tomorrow}, 0 removed, 0 left as is.
+
+            The following ledgers have been updated:
+            {filepath_x}
+            {filepath_rx}
+            """
+        )
+        assert capsys.readouterr().out == expected_print
+
+        txns_x = utils.get_unverified_txns(filepath_x)
+        assert [(txn.payee, txn.date) for txn in txns_x] == [
+            ("D", tomorrow),
+            ("E", datetime.date(2022, 11, 30)),
+        ]
+        txns_rx = utils.get_unverified_txns(filepath_rx)
+        assert [(txn.payee, txn.date) for txn in txns_rx] == [
+            ("F", tomorrow),
+            ("H", datetime.date(2022, 11, 28)),
+        ]
+
+        # verify ledgers not altered when auto leaves all expired txns
+        mock_today(datetime.date(2022, 12, 1), monkeypatch)
+        content_x = filepath_x.read_text(encoding)
+        m.admin_expired_txns([str(filepath_x)], [], auto=True)
+        expected_print = get_expected_output(
+            """
+            Expired transactions administered by rules:
+            x: 0 rolled forwards to 2022-11-16, 0 removed, 2 left as is.
+
+            No expired transactions have been modified.
+            """
+        )
+        assert capsys.readouterr().out == expected_print
+        assert filepath_x.read_text(encoding) == content_x
+
+    def test_rules_interactive(
+        self, monkeypatch, mock_input, filepaths_copy, encoding, capsys
+    ):
+        """Test expired txns not matched by a rule are administered interactively."""
+        mock_today(datetime.date(2022, 11, 15), monkeypatch)
+        tomorrow = datetime.date(2022, 11, 16)
+        mock_tomorrow(tomorrow, monkeypatch)
+        monkeypatch.setattr("beanahead.config.SETTINGS.exp_rules", "remove,days=41")
+
+        filepath_x = filepaths_copy["x"]
+        filepath_rx = filepaths_copy["rx"]
+        mock_input(v for v in ["2", "0"])  # remove D, roll F
+        m.admin_expired_txns([str(filepath_x), str(filepath_rx)])
+
+        out = capsys.readouterr().out
+        assert (
+            "x: 0 rolled forwards to 2022-11-16, 3 removed, 0 left as is, 1"
+            " administered interactively."
+        ) in out
+        assert (
+            "rx: 0 rolled forwards to 2022-11-16, 0 removed, 0 left as is, 1"
+            " administered interactively."
+        ) in out
+        assert [t.payee for t in utils.get_unverified_txns(filepath_x)] == ["E"]
+        txns_rx = utils.get_unverified_txns(filepath_rx)
+        assert [(txn.payee, txn.date) for txn in txns_rx] == [
+            ("F", tomorrow),
+            ("H", datetime.date(2022, 11, 28)),
+        ]
+        assert filepath_x.read_text(encoding).count("2022-10-") == 0
+
+    @pytest.mark.usefixtures("cwd_as_temp_dir")
+    def test_cli_exp_rules(self, monkeypatch, filepaths_copy, capsys):
+        mock_today(datetime.date(2022, 11, 15), monkeypatch)
+        tomorrow = datetime.date(2022, 11, 16)
+        mock_tomorrow(tomorrow, monkeypatch)
+
+        set_cl_args("exp x rx --rule remove,tag=rx_txn --rule leave,days=41 --auto")
+        cli.main()
+        expected_print = get_expected_output(
+            rf"""
+            Expired transactions administered by rules:
+            x: 0 rolled forwards to {tomorrow}, 0 removed, 4 left as is.
+            rx: 0 rolled forwards to {tomorrow}, 1 removed, 0 left as is.
+
+            The following ledgers have been updated:
+            {filepaths_copy["rx"]}
+            """
+        )
+        assert capsys.readouterr().out.endswith(expected_print)
+        txns_rx = utils.get_unverified_txns(filepaths_copy["rx"])
+        assert [txn.payee for txn in txns_rx] == ["H"]
@@ -0,0 +1,142 @@
+"""Tests for `forecast` module."""
+
+import datetime
+import shutil
+from collections import abc, defaultdict
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from beanahead import forecast as m
+from beanahead import rx_txns
+from beanahead.scripts import cli
+
+from .conftest import set_cl_args
+
+START = datetime.date(2022, 10, 1)
+END = datetime.date(2022, 12, 31)
+CHECKING = "Assets:US:BofA:Checking"
+
+
+@pytest.fixture
+def filepaths(res_dir, temp_dir) -> abc.Iterator[dict[str, Path]]:
+    """Copies of defs, rx ledger and main ledger in temporary folder."""
+    d = {}
+    for k in ("defs", "rx", "ledger"):
+        d[k] = Path(shutil.copy(res_dir / "defs" / f"{k}.beancount", temp_dir))
+    yield d
+
+
+@pytest.fixture
+def admin(filepaths) -> abc.Iterator[rx_txns.Admin]:
+    yield rx_txns.Admin(filepaths["defs"], filepaths["rx"], filepaths["ledger"])
+
+
+def get_expected_balances(
+    txns: list, dates: np.ndarray, account: str, opening: float
+) -> np.ndarray:
+    """Evaluate balances of an account from transactions, one by one."""
+    flows = defaultdict(float)
+    for txn in txns:
+        for posting in txn.postings:
+            if posting.account == account:
+                flows[max(txn.date, START)] += float(posting.units.number)
+    balances = []
+    for date in dates.astype(datetime.date):
+        balance = opening + sum(v for d, v in flows.items() if d <= date)
+        balances.append(balance)
+    return np.array(balances)
+
+
+def test_project_balances(admin, filepaths, encoding):
+    contents = {k: path.read_text(encoding) for k, path in filepaths.items()}
+    projection = m.project_balances(admin, end=END, start=START)
+
+    # verify no files written to
+    for k, path in filepaths.items():
+        assert path.read_text(encoding) == contents[k]
+
+    assert len(projection.dates) == 92
+    assert projection.dates[0] == np.datetime64(START)
+    assert projection.dates[-1] == np.datetime64(END)
+    assert (CHECKING, "USD") in projection.columns
+    assert projection.columns == sorted(projection.columns)
+    assert projection.balances.shape == (92, len(projection.columns))
+    balances = projection.get_balances(CHECKING)
+    assert balances[0] == 3262.01  # opening balance
+
+    # verify against transactions as would be added to the rx ledger
+    new_txns, _ = admin._get_new_txns_data(END)
+    expected = get_expected_balances(new_txns, projection.dates, CHECKING, 3262.01)
+    np.testing.assert_allclose(balances, expected)
+
+    # verify alternative frequency and accounts
+    proj_me = m.project_balances(
+        admin, end=END, start=START, freq="ME", accounts=["Liabilities:US:Chase"]
+    )
+    assert proj_me.dates.astype(str).tolist() == [
+        "2022-10-01",
+        "2022-10-31",
+        "2022-11-30",
+        "2022-12-31",
+    ]
+    assert proj_me.columns == [
+        ("Liabilities:US:Chase:HirePurchase", "USD"),
+        ("Liabilities:US:Chase:Slate", "USD"),
+    ]
+    idx = [0, 30, 60, 91]
+    for column in proj_me.columns:
+        np.testing.assert_allclose(
+            proj_me.get_balances(*column), projection.get_balances(*column)[idx]
+        )
+
+    # verify transactions on rx ledger not double counted
+    admin.add_txns(datetime.date(2022, 10, 31))
+    projection_ = m.project_balances(admin, end=END, start=START)
+    np.testing.assert_allclose(projection_.balances, projection.balances)
+
+    with pytest.raises(ValueError, match="cannot be earlier than 'start'"):
+        m.project_balances(admin, end=START, start=END)
+
+
+def test_projection_to_csv(admin, temp_dir, encoding):
+    projection = m.project_balances(
+        admin, end=END, start=START, freq="ME", accounts=[CHECKING]
+    )
+    expected = (
+        f"date,{CHECKING} USD\n"
+        "2022-10-01,3262.01\n"
+        "2022-10-31,5267.21\n"
+        "2022-11-30,3272.41\n"
+        "2022-12-31,6950.21\n"
+    )
+    assert projection.to_csv() == expected
+    path = temp_dir / "projection.csv"
+    projection.to_csv(path)
+    assert path.read_text(encoding) == expected
+
+
+@pytest.mark.usefixtures("cwd_as_temp_dir", "filepaths")
+def test_cli_project(monkeypatch, encoding, capsys):
+    """Test calling `project_balances` via cli."""
+    monkeypatch.setattr("beanahead.utils.TODAY", START)
+    cl = f"project defs rx ledger -e {END} -f ME -a {CHECKING}"
+    set_cl_args(cl)
+    cli.main()
+    expected = (
+        f"date,{CHECKING} USD\n"
+        "2022-10-01,3262.01\n"
+        "2022-10-31,5267.21\n"
+        "2022-11-30,3272.41\n"
+        "2022-12-31,6950.21\n"
+    )
+    assert capsys.readouterr().out == expected
+
+    set_cl_args(cl + " -o projection.csv")
+    cli.main()
+    assert capsys.readouterr().out == (
+        "Projected balances of 1 accounts over 4 dates have been exported to"
+        " 'projection.csv'.\n"
+    )
+    assert Path("projection.csv").read_text(encoding) == expected
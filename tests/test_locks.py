@@ -0,0 +1,124 @@
+"""Tests for `locks` module."""
+
+import re
+import subprocess
+import sys
+import threading
+import time
+from collections import abc
+from pathlib import Path
+
+import pytest
+
+from beanahead import errors
+from beanahead import locks as m
+
+
+@pytest.fixture
+def paths(temp_dir) -> abc.Iterator[list[Path]]:
+    """Paths to two files in the temporary directory."""
+    paths = [temp_dir / "b.beancount", temp_dir / "a.beancount"]
+    for path in paths:
+        path.write_text("")
+    yield paths
+
+
+@pytest.fixture(autouse=True)
+def reset_lock_waits() -> abc.Iterator[None]:
+    m.reset_lock_waits()
+    yield
+    m.reset_lock_waits()
+
+
+def hold_lock_in_subprocess(path: Path, seconds: float) -> subprocess.Popen:
+    """Hold lock on a file from a separate process."""
+    code = (
+        "import sys, time\n"
+        "from pathlib import Path\n"
+        "from beanahead import locks\n"
+        "with locks.lock_files([Path(sys.argv[1])], timeout=5):\n"
+        "    print('locked', flush=True)\n"
+        "    time.sleep(float(sys.argv[2]))\n"
+    )
+    proc = subprocess.Popen(  # noqa: S603
+        [sys.executable, "-c", code, str(path), str(seconds)],
+        stdout=subprocess.PIPE,
+        text=True,
+        env={"PYTHONPATH": ":".join(sys.path)},
+    )
+    assert proc.stdout.readline().strip() == "locked"
+    return proc
+
+
+def test_lock_files(paths):
+    """Test locks acquired in order, are reentrant and released."""
+    with m.lock_files(paths):
+        assert list(m._held) == sorted(path.resolve() for path in paths)
+        for path in paths:
+            assert m.get_lock_path(path).is_file()
+        # verify reentrant for the same thread
+        with m.lock_files(paths[:1]):
+            assert m._held[paths[0].resolve()].count == 2
+        assert m._held[paths[0].resolve()].count == 1
+    assert not m._held
+    assert not m.get_lock_waits()
+
+
+def test_lock_files_threads(paths):
+    """Test lock is respected by another thread and wait is recorded."""
+    path = paths[0]
+    order = []
+
+    def other_thread():
+        with m.lock_files([path], timeout=5):
+            order.append("other")
+
+    with m.lock_files([path]):
+        thread = threading.Thread(target=other_thread)
+        thread.start()
+        time.sleep(0.2)
+        order.append("main")
+    thread.join()
+    assert order == ["main", "other"]
+    waits = m.get_lock_waits()
+    assert len(waits) == 1
+    assert waits[0][0] == path.resolve()
+    assert waits[0][1] >= 0.1
+
+    # verify independent files can be locked in parallel
+    with m.lock_files([paths[0]]):
+        thread = threading.Thread(target=lambda: m.lock_files([paths[1]], 0))
+        thread.start()
+        thread.join()
+
+
+def test_lock_waits_capped(paths):
+    """Test only the most recent waits are recorded."""
+    for i in range(m.LOCK_WAITS_MAX + 5):
+        m.LOCK_WAITS.append((paths[0], float(i)))
+    waits = m.get_lock_waits()
+    assert len(waits) == m.LOCK_WAITS_MAX
+    assert waits[0][1] == 5.0
+    assert waits[-1][1] == m.LOCK_WAITS_MAX + 4
+
+
+def test_lock_files_timeout(paths, capsys):
+    """Test raises error if a lock held by another process is not released."""
+    path = paths[0]
+    proc = hold_lock_in_subprocess(path, 1)
+    try:
+        match = re.escape(f"Unable to acquire a lock on '{path.resolve()}' within 0.1")
+        with (
+            pytest.raises(errors.BeanaheadLockTimeoutError, match=match),
+            m.lock_files(paths, timeout=0.1),
+        ):
+            pass
+        assert not m._held  # verify lock on other path released
+
+        # verify waits for lock to be released
+        with m.lock_files([path], timeout=5):
+            pass
+        assert capsys.readouterr().out.startswith("Waited ")
+        assert m.get_lock_waits()[0][0] == path.resolve()
+    finally:
+        proc.wait()
@@ -0,0 +1,99 @@
+"""Tests for `metrics` module."""
+
+import json
+import math
+from collections import abc
+
+import pytest
+
+from beanahead import metrics as m
+
+
+@pytest.fixture
+def registry(monkeypatch) -> abc.Iterator[dict]:
+    """Isolate registry of metrics for fixture's duration."""
+    registry = {}
+    monkeypatch.setattr("beanahead.metrics._registry", registry)
+    yield registry
+
+
+@pytest.mark.usefixtures("registry")
+def test_counter():
+    counter = m.counter("a_total", "Things counted.")
+    assert counter.value == 0
+    counter.inc()
+    counter.inc(3)
+    assert counter.value == 4
+    assert m.counter("a_total", "Things counted.") is counter
+
+    with pytest.raises(ValueError, match="A counter named 'a_total' is already"):
+        m.histogram("a_total", "Things observed.")
+
+    m.reset()
+    assert counter.value == 0
+
+
+@pytest.mark.usefixtures("registry")
+def test_histogram():
+    hist = m.histogram("b", "Things observed.", (0, 2, 5))
+    assert hist.buckets == (0, 2, 5, math.inf)
+    for value in (0, 1, 2, 3, 8, 0):
+        hist.observe(value)
+    assert hist.counts == [2, 2, 1, 1]
+    assert hist.cumulative_counts() == [2, 4, 5, 6]
+    assert hist.sum == 14
+    assert hist.count == 6
+
+    m.reset()
+    assert hist.counts == [0, 0, 0, 0]
+    assert hist.count == hist.sum == 0
+
+    with pytest.raises(ValueError, match="buckets must be in ascending order"):
+        m.histogram("c", "Things observed.", (2, 1))
+
+
+@pytest.mark.usefixtures("registry")
+def test_format_metrics(temp_dir, encoding):
+    m.counter("z_total", "Zs counted.").inc(2)
+    hist = m.histogram("a", "As observed.", (1, 2))
+    hist.observe(1)
+    hist.observe(3)
+
+    rtrn = json.loads(m.format_metrics())
+    assert rtrn == {
+        "a": {
+            "type": "histogram",
+            "help": "As observed.",
+            "buckets": {"1": 1, "2": 1, "+Inf": 2},
+            "sum": 4,
+            "count": 2,
+        },
+        "z_total": {"type": "counter", "help": "Zs counted.", "value": 2},
+    }
+
+    expected = (
+        "# HELP a As observed.\n"
+        "# TYPE a histogram\n"
+        'a_bucket{le="1"} 1\n'
+        'a_bucket{le="2"} 1\n'
+        'a_bucket{le="+Inf"} 2\n'
+        "a_sum 4\n"
+        "a_count 2\n"
+        "# HELP z_total Zs counted.\n"
+        "# TYPE z_total counter\n"
+        "z_total 2\n"
+    )
+    assert m.format_metrics("prometheus") == expected
+
+    with pytest.raises(ValueError, match="'xml' is not a valid metrics format"):
+        m.format_metrics("xml")
+
+    paths = [temp_dir / "metrics.json", temp_dir / "metrics.prom"]
+    try:
+        for path in paths:
+            m.write_metrics(path)
+        assert json.loads(paths[0].read_text(encoding)) == rtrn
+        assert paths[1].read_text(encoding) == expected
+    finally:
+        for path in paths:
+            path.unlink(missing_ok=True)
@@ -2,9 +2,24 @@
 
 import copy
 import datetime
+import importlib
+import json
+import os
+import shutil
+import subprocess
+import sys
+from collections import abc
 from decimal import Decimal
+from pathlib import Path
 
+import beancount
+import pytest
+from beancount.core import data
+
+from beanahead import config, rx_txns, utils
 from beanahead.plugins import rx_txn_plugin as m
+from beanahead.plugins import rx_virtual_plugin as vm
+from beanahead.utils import TAG_RX
 
 from .conftest import get_entries_from_string
 
@@ -80,3 +95,225 @@ def test_convert_meta():
         "roll": True,
     }
     make_assertion(5, meta)
+
+
+def test_convert_meta_validates():
+    input_ = """
+        2022-10-01 open Assets:US:BofA:Checking
+
+        2022-10-03 * "Metro" "Tram tickets" #rx_txn
+          freq: "SMS"
+          roll: "preceding"
+          Assets:US:BofA:Checking    -40.00 USD
+          Expenses:Transport:Tram
+
+        2022-10-05 * "Account Fee" "Monthly bank fee" #rx_txn
+          freq: "5th monday"
+          roll: "sideways"
+          Assets:US:BofA:Checking  -4.00 USD
+          Expenses:Financial:Fees
+
+        2022-10-07 * "EDISON" "Electricity" #rx_txn
+          final: "2023-07-05"
+          Assets:US:BofA:Checking    -65.00 USD
+          Expenses:Home:Electricity
+
+        2022-10-07 * "Untagged" "Not a regular transaction"
+          freq: "not validated"
+          Assets:US:BofA:Checking    -65.00 USD
+          Expenses:Home:Electricity
+    """
+    entries = get_entries_from_string(input_)
+    rtrn_entries, errors = m.convert_meta(entries, {})
+    assert rtrn_entries is entries  # invalid entries are not removed
+
+    messages = [error.message for error in errors]
+    assert len(messages) == 4
+    assert messages[0].startswith(
+        "Regular expected transaction 'Account Fee' is invalid: '5th monday' is"
+        " not a valid frequency: "
+    )
+    assert messages[1] == (
+        "'sideways' is not a valid value for the 'roll' meta field of the regular"
+        " expected transaction 'Account Fee'. Valid values are: ['TRUE', 'FALSE',"
+        " 'following', 'preceding', 'modified-following', 'modified-preceding']."
+    )
+    assert messages[2] == (
+        "Regular expected transaction 'EDISON' is invalid: the 'freq' meta field"
+        " is not defined."
+    )
+    assert messages[3] == (
+        "Regular expected transaction 'EDISON' is invalid: the 'final' meta field"
+        " must be an (unquoted) date, not '2023-07-05'."
+    )
+    assert [error.entry.payee for error in errors] == ["Account Fee"] * 2 + [
+        "EDISON"
+    ] * 2
+    assert errors[0].source["lineno"] == 10
+    assert all(isinstance(error, m.RxMetaError) for error in errors)
+
+    # verify valid frequency compiled and cached
+    rx_txns._compile_freq.cache_clear()
+    m.convert_meta(entries, {})
+    rx_txns.compile_freq("SMS")
+    assert rx_txns._compile_freq.cache_info().hits >= 1
+
+
+def test_convert_meta_lazy_import(res_dir):
+    """Test loading a file without rx txns does not import pandas."""
+    path = res_dir / "defs" / "rx.beancount"
+    code = (
+        "import sys; import beanahead; from beancount import loader;"
+        f" _, errors, _ = loader.load_file({str(path)!r});"
+        " assert not errors, errors;"
+        " assert 'pandas' not in sys.modules"
+    )
+    subprocess.run([sys.executable, "-c", code], check=True)  # noqa: S603
+
+
+class TestRxVirtualPlugin:
+    """Tests for `rx_virtual_plugin`."""
+
+    @pytest.fixture
+    def loaded_vm(self):
+        """Plugin module as imported by beancount when loading a ledger.
+
+        Beancount imports the plugin by its name on the plugins directory,
+        as a module distinct from `vm`.
+        """
+        return importlib.import_module("rx_virtual_plugin")
+
+    @pytest.fixture
+    def ledger_path(self, res_dir, temp_dir) -> abc.Iterator[Path]:
+        """Main ledger that includes definitions, in temporary folder."""
+        defs_dir = res_dir / "defs"
+        defs_path = Path(shutil.copy(defs_dir / "defs.beancount", temp_dir))
+        path = temp_dir / "ledger_virtual.beancount"
+        content = (defs_dir / "ledger.beancount").read_text(config.ENCODING)
+        content = content.replace(
+            'include "rx.beancount"',
+            'include "defs.beancount"\nplugin "rx_virtual_plugin"'
+            f' "horizon=2022-12-31, cache={temp_dir / "rx_virtual.json"}"',
+        )
+        path.write_text(content, config.ENCODING)
+        yield path
+        for path_ in (path, defs_path, temp_dir / "rx_virtual.json"):
+            path_.unlink(missing_ok=True)
+
+    def test_parse_config(self, monkeypatch, temp_dir):
+        f = vm.parse_config
+        monkeypatch.setattr("beanahead.utils.TODAY", datetime.date(2022, 10, 1))
+        default = vm.CACHE_DIR_DFLT / "rx_virtual.json"
+        assert f(None) == (datetime.date(2022, 12, 31), default)
+        assert f("horizon=2023-06-30") == (datetime.date(2023, 6, 30), default)
+        path = temp_dir / "cache.json"
+        assert f(f" horizon = 2w, cache={path}") == (datetime.date(2022, 10, 15), path)
+        assert f("cache=none")[1] is None
+
+        # default cache file is dedicated to the ledger
+        ledger_a, ledger_b = temp_dir / "a.beancount", temp_dir / "b.beancount"
+        path_a = f(None, str(ledger_a))[1]
+        assert path_a.parent == vm.CACHE_DIR_DFLT
+        assert path_a == vm.get_cache_path_dflt(str(ledger_a))
+        assert path_a != f(None, str(ledger_b))[1]
+        assert f("cache=none", str(ledger_a))[1] is None
+        assert f(f"cache={path}", str(ledger_a))[1] == path
+
+        with pytest.raises(ValueError, match="'horizon' is not a valid rx_virtual"):
+            f("horizon")
+        with pytest.raises(ValueError, match="'freq=2w' is not a valid rx_virtual"):
+            f("freq=2w")
+        with pytest.raises(ValueError, match=r"'2w3' is not a valid horizon\."):
+            f("horizon=2w3")
+
+    def test_generate_rx_txns(
+        self, ledger_path, res_dir, temp_dir, monkeypatch, loaded_vm
+    ):
+        entries, errors, _ = beancount.loader.load_file(ledger_path)
+        assert not errors
+        txns = [e for e in entries if isinstance(e, data.Transaction)]
+        rx_txns_ = [txn for txn in txns if TAG_RX in txn.tags]
+
+        # verify as would be added to the rx ledger
+        expected = beancount.loader.load_file(res_dir / "defs" / "rx_221231.beancount")[
+            0
+        ]
+        assert len(rx_txns_) == len(expected) == 42
+
+        def key(txn):
+            return (txn.date, txn.payee)
+
+        assert sorted(map(key, rx_txns_)) == sorted(map(key, expected))
+        assert entries == sorted(entries, key=data.entry_sortkey)
+
+        # verify cache written and used
+        cache_path = temp_dir / "rx_virtual.json"
+        cache = json.loads(cache_path.read_text(config.ENCODING))
+        # definitions with same date, freq, final and roll share a key
+        assert len(cache) == 10
+        mtime = cache_path.stat().st_mtime_ns
+
+        def raise_(*_, **__):
+            raise AssertionError
+
+        monkeypatch.setattr(loaded_vm, "get_dates", raise_)
+        entries_, errors, _ = beancount.loader.load_file(ledger_path)
+        assert not errors
+        assert entries_ == entries
+        assert cache_path.stat().st_mtime_ns == mtime
+
+    def test_generate_rx_txns_default_cache(
+        self, ledger_path, temp_dir, monkeypatch, encoding, loaded_vm
+    ):
+        """Verify ledgers loaded in turn do not clobber each other's cache."""
+        cache_dir = temp_dir / "cache"
+        monkeypatch.setattr(loaded_vm, "CACHE_DIR_DFLT", cache_dir)
+        content = ledger_path.read_text(encoding)
+        content = content.replace(f", cache={temp_dir / 'rx_virtual.json'}", "")
+        ledger_path.write_text(content, encoding)
+        other_path = temp_dir / "ledger_virtual_other.beancount"
+        other_path.write_text(
+            content.replace("horizon=2022-12-31", "horizon=2023-06-30"), encoding
+        )
+        try:
+            entries, errors, _ = beancount.loader.load_file(ledger_path)
+            assert not errors
+            other_entries, errors, _ = beancount.loader.load_file(other_path)
+            assert not errors
+            assert len(other_entries) > len(entries)
+            assert len(list(cache_dir.iterdir())) == 2
+
+            def raise_(*_, **__):
+                raise AssertionError
+
+            monkeypatch.setattr(loaded_vm, "get_dates", raise_)
+            assert beancount.loader.load_file(ledger_path)[0] == entries
+            assert beancount.loader.load_file(other_path)[0] == other_entries
+        finally:
+            other_path.unlink(missing_ok=True)
+            shutil.rmtree(cache_dir, ignore_errors=True)
+
+    def test_is_definitions_file(self, temp_dir, encoding):
+        """Verify a file is requeried when modified."""
+        f = vm._is_definitions_file
+        path = temp_dir / "maybe_defs.beancount"
+        path.write_text("* not a definitions file\n", encoding)
+        try:
+            assert not f(str(path))
+            path.write_text("".join(utils.compose_header_footer("rx_def")), encoding)
+            os.utime(path, ns=(0, path.stat().st_mtime_ns + 10**9))
+            assert f(str(path))
+        finally:
+            path.unlink()
+        assert not f(str(path))
+        assert not f("<string>")
+        assert not f(None)
+
+    def test_generate_rx_txns_errors(self, ledger_path, encoding):
+        content = ledger_path.read_text(encoding)
+        ledger_path.write_text(
+            content.replace('"horizon=2022-12-31, ', '"horizon=soon, '), encoding
+        )
+        _, errors, _ = beancount.loader.load_file(ledger_path)
+        assert len(errors) == 1
+        assert errors[0].message.startswith("'soon' is not a valid horizon.")
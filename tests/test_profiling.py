@@ -0,0 +1,169 @@
+"""Tests for `profiling` module."""
+
+import datetime
+import json
+import shutil
+import tracemalloc
+from collections import abc
+
+import pytest
+
+from beanahead import profiling as m
+from beanahead.scripts import cli
+
+from .conftest import set_cl_args
+
+
+@pytest.fixture
+def profiling_reset() -> abc.Iterator[None]:
+    """Reset profiling statistics and state on teardown."""
+    yield
+    m.disable()
+    m.reset()
+
+
+@pytest.mark.usefixtures("profiling_reset")
+def test_phase():
+    assert not m.ENABLED
+    with m.phase("a", 3) as phase:
+        phase.count(2)
+    assert m.phase("a") is m.phase("b")  # shared no-op when disabled
+    assert m.get_report() == {}
+
+    with m.profile():
+        assert m.ENABLED
+        with m.phase("b", 3) as phase:
+            phase.count(2)
+        with m.phase("a"):
+            pass
+        with m.phase("b"), m.phase("b.c", 1):
+            pass
+    assert not m.ENABLED
+
+    report = m.get_report()
+    assert list(report) == ["a", "b", "b.c"]
+    assert report["a"]["calls"] == 1
+    assert report["a"]["entries"] == 0
+    assert report["b"]["calls"] == 2
+    assert report["b"]["entries"] == 5
+    assert report["b.c"] == {
+        "calls": 1,
+        "seconds": report["b.c"]["seconds"],
+        "entries": 1,
+        "peak_bytes": 0,
+        "retained_bytes": 0,
+    }
+    assert report["b"]["seconds"] >= report["b.c"]["seconds"] > 0
+
+    # verify statistics reset on entering profile context
+    with m.profile():
+        pass
+    assert m.get_report() == {}
+
+
+@pytest.mark.usefixtures("profiling_reset")
+def test_phase_memory():
+    assert not tracemalloc.is_tracing()
+    mib = 1024 * 1024
+    kept = []
+    with m.profile(memory=True):
+        assert tracemalloc.is_tracing()
+        with m.phase("outer"):
+            data = bytearray(6 * mib)
+            del data
+            with m.phase("inner"):
+                data = bytearray(4 * mib)
+                del data
+            with m.phase("inner"):
+                kept.append(bytearray(mib))
+            with m.phase("inner"):
+                pass
+    assert not tracemalloc.is_tracing()
+    assert not m.TRACE_MEMORY
+
+    report = m.get_report()
+    inner, outer = report["inner"], report["outer"]
+    assert 4 * mib <= inner["peak_bytes"] < 5 * mib
+    assert mib <= inner["retained_bytes"] < 2 * mib
+    # peak of outer phase includes any peak prior to a nested phase
+    assert 6 * mib <= outer["peak_bytes"] < 7 * mib
+    assert mib <= outer["retained_bytes"] < 2 * mib
+
+    lines = m.format_report().split("\n")
+    assert lines[0].split()[-4:] == ["peak", "KiB", "retained", "KiB"]
+    assert float(lines[1].split()[-2]) >= 4 * 1024
+
+
+@pytest.mark.usefixtures("profiling_reset")
+def test_profiled():
+    @m.profiled("f")
+    def f(a, b=1):
+        """Docstring."""
+        return a + b
+
+    assert f.__doc__ == "Docstring."
+    assert f(1, b=2) == 3
+    assert m.get_report() == {}
+
+    with m.profile():
+        assert f(1) == 2
+        assert f(2) == 3
+    assert m.get_report()["f"]["calls"] == 2
+
+
+@pytest.mark.usefixtures("profiling_reset")
+def test_format_report():
+    with m.profile():
+        with m.phase("recon.match", 12):
+            pass
+        with m.phase("io.load"):
+            pass
+
+    lines = m.format_report().split("\n")
+    assert len(lines) == 3
+    assert lines[0].split() == ["phase", "calls", "seconds", "entries"]
+    assert lines[1].startswith("io.load ")
+    assert lines[1].split()[1::2] == ["1", "0"]
+    assert lines[2].startswith("recon.match ")
+    assert lines[2].split()[1::2] == ["1", "12"]
+
+    assert json.loads(m.format_report("json")) == m.get_report()
+
+    with pytest.raises(ValueError, match="'xml' is not a valid report format"):
+        m.format_report("xml")
+
+
+@pytest.mark.usefixtures("cwd_as_temp_dir", "profiling_reset")
+def test_cli_profile(res_dir, temp_dir, monkeypatch, capsys):
+    for k in ("x", "rx"):
+        shutil.copy(res_dir / "expired" / f"{k}.beancount", temp_dir)
+    today = datetime.date(2022, 11, 15)
+    for attr in ("utils.TODAY", "expired.TODAY", "expired.TOMORROW"):
+        monkeypatch.setattr(f"beanahead.{attr}", today)
+    try:
+        set_cl_args("exp x rx --rule remove --auto --profile json")
+        cli.main()
+        report = json.loads(capsys.readouterr().err)
+        assert not m.ENABLED
+        assert report["exp.load"]["entries"] == 7
+        assert report["exp.administer"]["calls"] == 2
+        assert report["exp.write"]["calls"] == 1
+        # each ledger loaded to verify file key and again to get txns
+        assert report["io.load"]["calls"] == 4
+
+        set_cl_args("exp x rx --auto --profile")
+        cli.main()
+        err = capsys.readouterr().err
+        assert err.startswith("phase ")
+        assert "\nexp.load " in err
+        assert "peak KiB" not in err
+
+        set_cl_args("exp x rx --auto --profile-memory")
+        cli.main()
+        err = capsys.readouterr().err
+        assert err.startswith("phase ")
+        assert "peak KiB" in err
+        assert not tracemalloc.is_tracing()
+    finally:
+        for k in ("x", "rx"):
+            (temp_dir / f"{k}.beancount").unlink()
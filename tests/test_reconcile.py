@@ -3,6 +3,7 @@
 import copy
 import datetime
 import itertools
+import json
 import re
 from collections import abc
 from decimal import Decimal
@@ -13,6 +14,7 @@ import beancount
 import pytest
 from beancount.core import data
 
+from beanahead import metrics
 from beanahead import reconcile as m
 from beanahead.scripts import cli
 
@@ -1220,6 +1222,35 @@ class TestReconcileNewTxns:
         assert expected_rx_content == rx_path.read_text(encoding)
         assert expected_x_content == x_path.read_text(encoding)
 
+    @pytest.mark.usefixtures("cwd_as_temp_dir")
+    def test_cli_recon_metrics(
+        self, filepaths_recon_copy, temp_dir, mock_input, input_responses, encoding
+    ):
+        """Test calling `reconcile_new_txns` via cli with metrics option."""
+        x_path = filepaths_recon_copy["x"]
+        rx_path = filepaths_recon_copy["rx"]
+        extraction = filepaths_recon_copy["extraction"]
+        path = temp_dir / "metrics.json"
+        metrics.reset()
+        mock_input(input_responses)
+        set_cl_args("recon extraction rx x --metrics metrics.json")
+        try:
+            cli.main()
+            rtrn = json.loads(path.read_text(encoding))
+        finally:
+            path.unlink(missing_ok=True)
+        assert rtrn["beanahead_reconcile_x_txns_total"]["value"] == 52
+        candidates = rtrn["beanahead_reconcile_candidates"]
+        assert candidates["count"] == 52
+        assert candidates["buckets"]["0"] == 31
+        assert candidates["buckets"]["+Inf"] == 52
+        assert rtrn["beanahead_reconcile_number_fallbacks_total"]["value"] == 5
+        assert rtrn["beanahead_reconcile_prompts_total"]["value"] == 18
+        assert rtrn["beanahead_reconcile_matches_total"]["value"] == 18
+        assert rtrn["beanahead_files_written_total"]["value"] == 3
+        size = sum(p.stat().st_size for p in (x_path, rx_path, extraction))
+        assert rtrn["beanahead_bytes_written_total"]["value"] == size
+
     @pytest.mark.usefixtures("cwd_as_temp_dir")
     def test_cli_recon_output(
         self,
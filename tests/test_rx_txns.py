@@ -202,6 +202,40 @@ def test_get_freq_offset(rx_txn_chase, rx_txn_edison):
     assert f(rx_txn_edison) == pd.DateOffset(months=1)
 
 
+def test_compile_freq():
+    f = m.compile_freq
+    m._compile_freq.cache_clear()
+    assert f("3m") == pd.DateOffset(months=3)
+    assert f("BME") == pd.offsets.BusinessMonthEnd()
+    assert f("BME") is f("BME")  # verify cached
+    assert m._compile_freq.cache_info().hits == 2
+
+    # verify extended frequency expressions
+    assert f("last business day of month") == pd.offsets.BusinessMonthEnd()
+    assert f("First  Business Day") == pd.offsets.BusinessMonthBegin()
+    assert f("last day of the month") == pd.offsets.MonthEnd()
+    assert f("first day of each month") == pd.offsets.MonthBegin()
+    assert f("2nd Tuesday") == pd.offsets.WeekOfMonth(week=1, weekday=1)
+    assert f("1st monday of month") == pd.offsets.WeekOfMonth(week=0, weekday=0)
+    assert f("last friday") == pd.offsets.LastWeekOfMonth(weekday=4)
+
+    dates = pd.date_range("2022-10-01", "2022-12-31", freq=f("2nd tuesday"))
+    assert dates.strftime("%Y-%m-%d").tolist() == [
+        "2022-10-11",
+        "2022-11-08",
+        "2022-12-13",
+    ]
+
+    # verify invalid frequencies raise and are cached
+    for freq in ("5th monday", "last fortnight", "3mm"):
+        m._compile_freq.cache_clear()
+        match = re.escape(f"'{freq}' is not a valid frequency: ")
+        for _ in range(2):
+            with pytest.raises(ValueError, match=match):
+                f(freq)
+        assert m._compile_freq.cache_info().hits == 1
+
+
 def test_create_entries_and_final_roll(def_chase, def_verizon, monkeypatch):
     """Test various functions.
 
@@ -301,6 +335,190 @@ def test_create_entries_and_final_roll(def_chase, def_verizon, monkeypatch):
         assert txn._replace(date=def_date) == def_verizon
 
 
+def test_roll_txns(def_verizon, temp_dir, monkeypatch):
+    """Test `m.roll_txns` with holidays and roll conventions."""
+    path = temp_dir / "holidays.txt"
+    path.write_text("# US holidays\n\n2022-12-26  # Christmas\n2023-01-02\n")
+    assert m.read_holidays(path) == [
+        datetime.date(2022, 12, 26),
+        datetime.date(2023, 1, 2),
+    ]
+    calendar = m.get_busday_calendar(path)
+    assert list(calendar.holidays) == [
+        pd.Timestamp("2022-12-26").to_datetime64(),
+        pd.Timestamp("2023-01-02").to_datetime64(),
+    ]
+    assert m.get_busday_calendar(path) is calendar  # verify cached
+
+    dates = [
+        datetime.date(2022, 12, 23),  # friday
+        datetime.date(2022, 12, 24),  # saturday
+        datetime.date(2022, 12, 26),  # monday, holiday
+        datetime.date(2022, 12, 31),  # saturday, month end
+        datetime.date(2023, 1, 1),  # sunday
+    ]
+    txns = [def_verizon._replace(date=date) for date in dates]
+
+    def get_dates(roll) -> list[datetime.date]:
+        txns_ = [txn._replace(meta=txn.meta | {"roll": roll}) for txn in txns]
+        return [txn.date for txn in m.roll_txns(txns_, calendar)]
+
+    # following
+    expected = [
+        datetime.date(2022, 12, 23),
+        datetime.date(2022, 12, 27),
+        datetime.date(2022, 12, 27),
+        datetime.date(2023, 1, 3),
+        datetime.date(2023, 1, 3),
+    ]
+    assert get_dates(roll=True) == get_dates("following") == expected
+    assert get_dates(roll=False) == dates
+    assert get_dates("preceding") == [
+        datetime.date(2022, 12, 23),
+        datetime.date(2022, 12, 23),
+        datetime.date(2022, 12, 23),
+        datetime.date(2022, 12, 30),
+        datetime.date(2022, 12, 30),
+    ]
+    assert get_dates("Modified-Following") == [
+        datetime.date(2022, 12, 23),
+        datetime.date(2022, 12, 27),
+        datetime.date(2022, 12, 27),
+        datetime.date(2022, 12, 30),  # would otherwise roll into next month
+        datetime.date(2023, 1, 3),
+    ]
+
+    # verify conventions can be mixed
+    rolls = [True, "preceding", False, "modified-following", "following"]
+    txns_ = [
+        txn._replace(meta=txn.meta | {"roll": roll})
+        for txn, roll in zip(txns, rolls, strict=True)
+    ]
+    rolled = m.roll_txns(txns_, calendar)
+    assert [txn.date for txn in rolled] == [
+        datetime.date(2022, 12, 23),
+        datetime.date(2022, 12, 23),
+        datetime.date(2022, 12, 26),
+        datetime.date(2022, 12, 30),
+        datetime.date(2023, 1, 3),
+    ]
+    assert rolled[0] is txns_[0]  # verify unrolled txns not replaced
+    assert m.roll_txns([], calendar) == []
+
+    # verify by default uses holidays as configuration option
+    assert m.get_roll_convention(txns[1]) == "following"
+    assert m.roll_txns(txns[2:3])[0].date == datetime.date(2022, 12, 26)
+    monkeypatch.setattr("beanahead.config.SETTINGS.holidays", str(path))
+    assert m.roll_txns(txns[2:3])[0].date == datetime.date(2022, 12, 27)
+
+    txn = txns[0]._replace(meta=txns[0].meta | {"roll": "nearest"})
+    match = re.escape(
+        "'nearest' is not a valid value for the 'roll' meta field of the regular"
+        " expected transaction 'Verizon'. Valid values are: ['TRUE', 'FALSE',"
+        " 'following', 'preceding', 'modified-following', 'modified-preceding']."
+    )
+    with pytest.raises(errors.RegularTransactionsDefinitionError, match=match):
+        m.roll_txns([txn], calendar)
+
+    path.write_text("2022-12-26\nnot a date\n")
+    match = re.escape(
+        f"Line 2 of holidays file '{path}' does not represent a date in iso"
+        " format: 'not a date'."
+    )
+    with pytest.raises(ValueError, match=match):
+        m.get_busday_calendar(path)
+
+    path.unlink()
+    with pytest.raises(FileNotFoundError, match="The holidays file"):
+        m.get_busday_calendar(path)
+
+
+def test_rx_instances(def_chase):
+    """Test `m.RxInstances` as returned by `m.create_entries`."""
+    txns, new_def = m.create_entries(def_chase, datetime.date(2023, 2, 28))
+    assert isinstance(txns, m.RxInstances)
+    assert len(txns) == 5
+    assert txns.definition is def_chase
+
+    # verify instances share postings, tags and meta of definition
+    for txn in txns:
+        assert txn.postings is def_chase.postings
+        assert txn.tags is def_chase.tags
+        assert txn.meta is def_chase.meta
+    assert new_def.postings is def_chase.postings
+
+    # verify indexing, slicing and comparison
+    assert txns[-1].date == datetime.date(2023, 2, 28)
+    sliced = txns[1:3]
+    assert isinstance(sliced, m.RxInstances)
+    assert [txn.date for txn in sliced] == [
+        datetime.date(2022, 11, 30),
+        datetime.date(2022, 12, 30),
+    ]
+    assert sliced == [txns[1], txns[2]]
+    assert sliced == txns[1:3]
+    assert sliced != txns[:2]
+
+
+def test_definition_registry(defs, defs_dir):
+    """Test `m.DefinitionRegistry`."""
+    registry = m.DefinitionRegistry(defs)
+    assert len(registry) == 12
+    assert list(registry) == [txn.payee for txn in defs]
+    edison = registry["EDISON"]
+    assert edison.payee == "EDISON"
+    assert registry.find("edison") is registry.find("Edison") is edison
+    assert registry.find("not a payee") is None
+    with pytest.raises(KeyError):
+        registry["edison"]
+
+    def payees(txns: list[data.Transaction]) -> list[str]:
+        return [txn.payee for txn in txns]
+
+    assert payees(registry.with_account("Liabilities:US:Chase:Slate")) == [
+        "Metro",
+        "Slate",
+    ]
+    assert payees(registry.with_account("Assets:US:ETrade:Cash")) == [
+        "ETrade Transfer",
+        "Dividend",
+    ]
+    assert registry.with_account("Assets:US:Not:An:Account") == []
+    assert "Assets:US:Vanguard:Cash" in registry.accounts
+    assert payees(registry.with_freq("2w")) == ["BayBook", "VBMPX", "RGAGX"]
+    assert payees(registry.with_freq("3m")) == ["ETrade Transfer", "Dividend"]
+    assert "Chase" in payees(registry.with_final_from(datetime.date(2022, 11, 30)))
+    assert "Chase" not in payees(registry.with_final_from(datetime.date(2022, 12, 1)))
+    assert len(registry.with_final_from(datetime.date(2022, 12, 1))) == 11
+
+    f = registry.active_on
+    start, end = datetime.date(2022, 12, 1), datetime.date(2022, 12, 31)
+    assert payees(f("Assets:US:ETrade", start, end)) == ["Dividend"]
+    assert payees(f(["Liabilities:US:Chase"], start, end)) == ["Metro", "Slate"]
+    # excludes 'Chase' (final), 'Erie' (starts 2023) and 'ETrade Transfer' (3m)
+    assert len(f(None, start, end)) == 9
+    assert payees(f("Assets:US:ETrade:Cash", start, datetime.date(2023, 2, 13))) == [
+        "ETrade Transfer",
+        "Dividend",
+    ]
+    # verify 'Chase' excluded from window after final
+    start, end = datetime.date(2022, 11, 1), datetime.date(2022, 11, 30)
+    assert "Chase" in payees(f("Liabilities:US:Chase:HirePurchase", start, end))
+    start, end = datetime.date(2022, 11, 1), datetime.date(2022, 11, 29)
+    assert "Chase" not in payees(f("Liabilities:US:Chase:HirePurchase", start, end))
+
+    # verify raises error if payees not unique
+    txns = beancount.loader.load_file(defs_dir / "defs_repeat_payee.beancount")[0]
+    txns = [txn for txn in txns if isinstance(txn, data.Transaction)]
+    match = re.escape(
+        "The payee of each regular expected transaction must be unique"
+        " (case insensitive) although the following payees are"
+        " repeated in the file None:\n['edison']."
+    )
+    with pytest.raises(errors.RegularTransactionsDefinitionError, match=match):
+        m.DefinitionRegistry(txns)
+
+
 def test_get_definition_group(
     def_slate, def_chase, def_rgagx, def_dividend, def_baybook
 ):
@@ -575,6 +793,114 @@ class TestAdmin:
         assert admin_opts.rx_files == [defs_opts_path, rx_opts_path]
         cmn.assert_txns_equal(admin_opts.rx_txns, rx_opts_txns_221231)
 
+    def test_iter_new_txns(self, filepaths_defs_copy_0):
+        """Test new txns streamed in order, as if generated all at once."""
+        paths = filepaths_defs_copy_0
+        admin = m.Admin(paths["defs"], paths["rx"], paths["ledger"])
+        end = datetime.date(2027, 12, 31)
+        raw_entries, _ = admin.create_raw_new_entries(end)
+        expected = m.roll_txns(m.remove_after_final(raw_entries))
+        expected.sort(key=data.entry_sortkey)
+
+        txns, n, new_defs = admin._iter_new_txns(end)
+        assert isinstance(txns, abc.Iterator)
+        assert n == len(expected)
+        assert list(txns) == expected
+        assert [d.payee for d in new_defs] == [
+            d.payee for d in admin.rx_defs.values() if d.payee != "Chase"
+        ]
+
+        # verify rolling in chunks as rolling all at once
+        instances, _ = admin._create_new_instances(end)
+        for txns_ in instances:
+            rolled = m.roll_txns(list(txns_))
+            assert list(m.iter_rolled(txns_, size=7)) == rolled
+
+    def test_add_txns_idempotent(
+        self,
+        filepaths_defs_copy_0,
+        defs_221231_content,
+        rx_221231_content,
+        defs_230630_content,
+        rx_txns_230630,
+        encoding,
+        capsys,
+    ):
+        """Test rerunning `add_txns` against stale defs adds no duplicates."""
+        paths = filepaths_defs_copy_0
+        defs_content = paths["defs"].read_text(encoding)
+        admin = m.Admin(paths["defs"], paths["rx"], paths["ledger"])
+        assert admin.add_txns("2022-12-31") == 42
+        assert paths["rx"].read_text(encoding) == rx_221231_content
+        assert paths["defs"].read_text(encoding) == defs_221231_content
+
+        index = m.EntryIndex(admin.rx_txns)
+        assert len(index) == 42
+        assert admin.rx_txns[0] in index
+        assert admin.rx_defs["EDISON"] not in index
+
+        # simulate defs drifting from ledger, i.e. reverted to prior content
+        paths["defs"].write_text(defs_content, encoding)
+        capsys.readouterr()
+        admin = m.Admin(paths["defs"], paths["rx"], paths["ledger"])
+        assert admin.add_txns("2022-12-31") == 0
+        assert capsys.readouterr().out == (
+            "42 transactions were not added as they are already on the ledger 'rx'.\n"
+            "0 transactions have been added to the ledger 'rx'.\n"
+            "Definitions on 'defs' have been updated to reflect the most recent"
+            " transactions.\n"
+        )
+        # verify ledger not written to although definitions advanced
+        assert paths["rx"].read_text(encoding) == rx_221231_content
+        assert paths["defs"].read_text(encoding) == defs_221231_content
+
+        paths["defs"].write_text(defs_content, encoding)
+        admin = m.Admin(paths["defs"], paths["rx"], paths["ledger"])
+        assert admin.add_txns("2023-06-30") == 80
+        assert paths["defs"].read_text(encoding) == defs_230630_content
+        # NB order of same-date txns can differ as sorted by lineno in defs file
+        keys = sorted((txn.date, txn.payee) for txn in admin.rx_txns)
+        assert keys == sorted((txn.date, txn.payee) for txn in rx_txns_230630)
+
+    def test_final_bounded_generation(self, filepaths_defs_copy_0, encoding, capsys):
+        """Test generation is bounded by final dates and dormant defs skipped."""
+        paths = filepaths_defs_copy_0
+        admin = m.Admin(paths["defs"], paths["rx"], paths["ledger"])
+        assert admin.rx_defs.dormant == []
+        chase = admin.rx_defs["Chase"]
+        assert chase.meta["final"] == datetime.date(2022, 11, 30)
+        assert not m.is_dormant(chase)
+        end = datetime.date(2030, 12, 31)
+        assert m.get_generation_end(chase, end) == chase.meta["final"]
+        assert m.get_generation_end(admin.rx_defs["EDISON"], end) == end
+
+        # verify only creates entries through final
+        entries, new_defs = admin.create_raw_new_entries(end, [chase])
+        assert [txn.date for txn in entries] == [
+            datetime.date(2022, 10, 31),
+            datetime.date(2022, 11, 30),
+        ]
+        assert m.remove_after_final(new_defs) == []
+
+        # verify dormant definition skipped
+        dormant = chase._replace(date=datetime.date(2022, 12, 31))
+        assert m.is_dormant(dormant)
+        assert admin.create_raw_new_entries(end, [dormant]) == ([], [])
+
+        # verify dormant definitions reported
+        content = paths["defs"].read_text(encoding)
+        content = content.replace('2022-10-31 * "Chase"', '2022-12-31 * "Chase"')
+        paths["defs"].write_text(content, encoding)
+        admin = m.Admin(paths["defs"], paths["rx"], paths["ledger"])
+        assert [txn.payee for txn in admin.rx_defs.dormant] == ["Chase"]
+        admin.add_txns(datetime.date(2022, 12, 31))
+        out = capsys.readouterr().out
+        assert out.startswith(
+            "1 definitions are dormant (the final date is earlier than the"
+            " definition date) and have been skipped.\n"
+        )
+        assert '"Chase"' not in paths["rx"].read_text(encoding)
+
     @pytest.mark.usefixtures("cwd_as_temp_dir")
     def test_cli_addrx(
         self,
@@ -632,3 +958,133 @@ class TestAdmin:
         assert capsys.readouterr().out == expected_output
         assert defs_opts_path.read_text(encoding) == defs_opts_221231_content
         assert rx_opts_path.read_text(encoding) == rx_opts_221231_content
+
+    @pytest.fixture
+    def tenants(
+        self,
+        filepath_defs,
+        filepath_defs_rx,
+        filepath_defs_ledger,
+        filepath_defs_opts,
+        filepath_defs_rx_opts,
+        filepath_defs_ledger_opts,
+        temp_dir,
+    ) -> abc.Iterator[dict[str, Path]]:
+        """Directories of tenants, each with copies of defs, rx and ledger.
+
+        Tenants 'a' and 'b' use default account root names, tenant 'opts'
+        uses non-default account root names.
+        """
+        filepaths = (filepath_defs, filepath_defs_rx, filepath_defs_ledger)
+        filepaths_opts = (
+            filepath_defs_opts,
+            filepath_defs_rx_opts,
+            filepath_defs_ledger_opts,
+        )
+        d = {}
+        for tenant, paths in zip(
+            ("a", "b", "opts"), (filepaths, filepaths, filepaths_opts), strict=True
+        ):
+            dir_ = temp_dir / tenant
+            dir_.mkdir()
+            for path in paths:
+                shutil.copy(path, dir_)
+            d[tenant] = dir_
+        yield d
+
+    @pytest.fixture
+    def manifest_csv(self, tenants, temp_dir) -> abc.Iterator[Path]:  # noqa: ARG002
+        path = temp_dir / "manifest.csv"
+        lines = ["# defs, ledger, main"]
+        lines += [f"{t}/defs, {t}/rx, {t}/ledger" for t in ("a", "b")]
+        lines += ["opts/defs_opts, opts/rx_opts, opts/ledger_opts"]
+        path.write_text("\n".join(lines) + "\n\n")
+        yield path
+
+    def test_read_manifest(self, manifest_csv, tenants, temp_dir):
+        names = ("defs", "rx", "ledger")
+        expected = [tuple(str(temp_dir / t / name) for name in names) for t in tenants]
+        expected[2] = tuple(str(temp_dir / "opts" / f"{n}_opts") for n in names)
+        assert m.read_manifest(manifest_csv) == expected
+
+        path = temp_dir / "manifest.json"
+        path.write_text(
+            '[["a/defs", "a/rx", "a/ledger"],'
+            ' {"defs": "b/defs", "ledger": "b/rx", "main": "b/ledger"},'
+            ' ["opts/defs_opts", "opts/rx_opts", "opts/ledger_opts"]]'
+        )
+        assert m.read_manifest(path) == expected
+
+        path.write_text('[["a/defs", "a/rx"]]')
+        match = re.escape(
+            "Each tenant of a manifest must be defined with three paths (defs,"
+            f" ledger, main) although tenant 0 of manifest '{path}' is defined as"
+            " ['a/defs', 'a/rx']."
+        )
+        with pytest.raises(ValueError, match=match):
+            m.read_manifest(path)
+
+    def test_add_txns_batch(
+        self,
+        manifest_csv,
+        tenants,
+        defs_221231_content,
+        rx_221231_content,
+        encoding,
+        capsys,
+    ):
+        manifest = m.read_manifest(manifest_csv)
+        results = m.add_txns_batch(manifest, datetime.date(2022, 12, 31), workers=2)
+        assert [r.ledger for r in results] == [t[1] for t in manifest]
+
+        for result, tenant in zip(results[:2], ("a", "b"), strict=True):
+            assert result.ok
+            assert result.added == 42
+            assert result.seconds_load > 0
+            assert result.seconds_add > 0
+            assert result.seconds == result.seconds_load + result.seconds_add
+            dir_ = tenants[tenant]
+            assert (dir_ / "defs.beancount").read_text(encoding) == defs_221231_content
+            assert (dir_ / "rx.beancount").read_text(encoding) == rx_221231_content
+
+        # verify tenant with different account root names not administered
+        result = results[2]
+        assert not result.ok
+        assert isinstance(result.error, ValueError)
+        assert str(result.error).startswith(
+            "The account root names defined on the main ledger"
+        )
+        assert result.added == 0
+        assert result.seconds_add == 0
+
+        capsys.readouterr()
+        m.print_batch_report(results)
+        lines = capsys.readouterr().out.splitlines()
+        assert len(lines) == 4
+        assert lines[0].endswith("s): 42 transactions added.")
+        assert lines[2].startswith(f"{manifest[2][1]} (")
+        assert "FAILED - ValueError(" in lines[2]
+        assert lines[3] == (
+            "84 transactions have been added for 2 of 3 tenants. 1 tenants failed."
+        )
+
+    def test_cli_addrx_batch(self, manifest_csv, tenants, encoding, capsys):
+        """Test calling `add_txns_batch` via cli."""
+        set_cl_args(f"addrx-batch {manifest_csv} -e 2022-12-31")
+        with pytest.raises(SystemExit) as exc:
+            cli.main()
+        assert exc.value.code == 1
+        out = capsys.readouterr().out
+        assert out.endswith(
+            "84 transactions have been added for 2 of 3 tenants. 1 tenants failed.\n"
+        )
+
+        # verify all tenants administered when root names set from main ledger
+        manifest_csv.write_text("opts/defs_opts, opts/rx_opts, opts/ledger_opts\n")
+        main = tenants["opts"] / "ledger_opts.beancount"
+        set_cl_args(f"addrx-batch {manifest_csv} -e 2022-12-31 -m {main}")
+        cli.main()
+        assert capsys.readouterr().out.endswith(
+            "42 transactions have been added for 1 of 1 tenants. 0 tenants failed.\n"
+        )
+        assert (tenants["opts"] / "rx_opts.beancount").read_text(encoding)
@@ -0,0 +1,134 @@
+"""Tests for `stats` module."""
+
+import datetime
+from pathlib import Path
+
+import pytest
+
+from beanahead import errors
+from beanahead import stats as m
+from beanahead.scripts import cli
+
+from .conftest import set_cl_args
+
+
+@pytest.fixture
+def filepaths(res_dir) -> dict[str, Path]:
+    defs_dir = res_dir / "defs"
+    return {
+        "rx_def": defs_dir / "defs.beancount",
+        "rx": defs_dir / "rx_221231.beancount",
+        "main": defs_dir / "ledger.beancount",
+        "x": res_dir / "expired" / "x.beancount",
+    }
+
+
+@pytest.fixture
+def today(monkeypatch) -> datetime.date:
+    today = datetime.date(2022, 10, 6)
+    monkeypatch.setattr("beanahead.utils.TODAY", today)
+    return today
+
+
+def test_count_instances(filepaths):
+    defs = m.utils.get_unverified_txns(filepaths["rx_def"])
+    rtrn = m.count_instances(defs, datetime.date(2022, 12, 31))
+    assert len(rtrn) == 12
+    assert rtrn["EDISON"] == 3
+    assert rtrn["Erie"] == 0
+    # instances of 'Chase' are limited by definition's final date
+    assert rtrn["Chase"] == 2
+    # corresponds with transactions added through 2022-12-31
+    assert sum(rtrn.values()) == 42
+
+    # verify instances of definitions with a repeated payee are summed
+    edison = next(rx_def for rx_def in defs if rx_def.payee == "EDISON")
+    rtrn = m.count_instances([*defs, edison], datetime.date(2022, 12, 31))
+    assert len(rtrn) == 12
+    assert rtrn["EDISON"] == 6
+    assert sum(rtrn.values()) == 45
+
+
+def test_get_stats(filepaths, today):  # noqa: ARG001
+    end = datetime.date(2022, 12, 31)
+    rtrn = m.get_stats([str(path) for path in filepaths.values()], end, workers=2)
+    assert [s.path for s in rtrn] == list(filepaths.values())
+    defs, rx, main, x = rtrn
+
+    assert [s.file_key for s in rtrn] == ["rx_def", "rx", None, "x"]
+    for s, path in zip(rtrn, filepaths.values(), strict=True):
+        assert s.size == path.stat().st_size
+        assert s.parse_seconds > 0
+        assert s.load_seconds > 0
+        assert not s.costly
+
+    assert defs.entries == {"Transaction": 12}
+    assert defs.n_defs == 12
+    assert defs.n_dormant == 0
+    assert defs.n_instances == 42
+    assert defs.n_expired is None
+
+    assert rx.n_entries == 42
+    assert rx.n_expired == 2
+    assert rx.n_defs is rx.instances is None
+
+    assert main.entries == {"Commodity": 3, "Open": 37, "Transaction": 1}
+    assert main.n_errors == 0
+    assert main.n_expired is main.n_defs is None
+
+    assert x.n_expired == 3
+
+    # verify horizon date
+    rtrn = m.get_stats([filepaths["rx_def"]], "2022-11-30")
+    assert rtrn[0].instances["EDISON"] == 2
+
+    # verify flags costly beanahead files
+    rtrn = m.get_stats([str(path) for path in filepaths.values()], max_bytes=4096)
+    assert [s.costly for s in rtrn] == [True, True, False, False]
+    rtrn = m.get_stats([filepaths["x"]], max_seconds=0)
+    assert rtrn[0].costly
+
+    assert m.get_stats([]) == []
+
+    with pytest.raises(errors.BeancountFileExistsError):
+        m.get_stats([filepaths["x"].with_name("i_do_not_exist.beancount")])
+
+
+def test_format_stats(filepaths):
+    rtrn = m.get_stats([filepaths["rx"], filepaths["main"]], max_bytes=4096)
+    lines = m.format_stats(rtrn).split("\n")
+    assert lines[0].split() == [
+        "file", "kind", "KiB", "entries", "parse", "ms", "load", "ms", "errors",
+        "expired", "defs", "dormant", "instances",
+    ]  # fmt: skip
+    assert lines[1].startswith("rx_221231.beancount*  rx ")
+    assert lines[2].split()[:4] == ["ledger.beancount", "-", "3.2", "41"]
+    assert lines[2].endswith("-")
+    assert lines[4:] == [
+        "Entries by type:",
+        "rx_221231.beancount: Transaction 42",
+        "ledger.beancount: Commodity 3, Open 37, Transaction 1",
+    ]
+
+
+def test_print_stats(filepaths, capsys):
+    rtrn = m.get_stats([filepaths["rx"], filepaths["x"]], max_bytes=4096)
+    m.print_stats(rtrn)
+    out = capsys.readouterr().out
+    assert out.startswith(m.format_stats(rtrn))
+    assert out.strip().endswith(
+        "1 beanahead file(s) marked * are growing costly to rewrite:"
+        " rx_221231.beancount. Consider administering expired transactions"
+        " or archiving older entries."
+    )
+
+
+def test_cli_stats(filepaths, today, capsys):  # noqa: ARG001
+    set_cl_args(f"stats {filepaths['rx_def']} {filepaths['x']} -e 2022-12-31 -w 1")
+    cli.main()
+    lines = capsys.readouterr().out.strip().split("\n")
+    assert lines[1].split()[:2] == ["defs.beancount", "rx_def"]
+    assert lines[1].split()[-3:] == ["12", "0", "42"]
+    assert lines[2].split()[:2] == ["x.beancount", "x"]
+    assert lines[2].split()[-4] == "3"
+    assert "costly" not in lines[-1]
@@ -0,0 +1,96 @@
+"""Tests for `synthetic` module."""
+
+import datetime
+import shutil
+from collections import abc
+from pathlib import Path
+
+import pytest
+from beancount import loader
+
+from beanahead import config, utils
+from beanahead import synthetic as m
+from beanahead.rx_txns import Admin
+
+
+@pytest.fixture
+def synth_dir(temp_dir) -> abc.Iterator[Path]:
+    path = temp_dir / "synthetic"
+    yield path
+    shutil.rmtree(path, ignore_errors=True)
+
+
+@pytest.fixture
+def scale() -> abc.Iterator[m.Scale]:
+    yield m.Scale(
+        n_txns=500,
+        n_defs=20,
+        n_x_txns=30,
+        n_new=40,
+        n_accounts=10,
+        n_payees=50,
+        root_names={"name_assets": "Biens", "name_income": "Ingresos"},
+        seed=3,
+    )
+
+
+def test_scale():
+    scale = m.Scale(n_txns=5, root_names={"name_assets": "Biens"}, seed=7)
+    d = scale.to_dict()
+    assert d["end"] == "2024-01-01"
+    assert m.Scale.from_dict(d) == scale
+
+
+def test_generate(synth_dir, scale, encoding):
+    prev_names = config.get_account_root_names()
+    rtrn = m.generate(synth_dir, scale)
+    assert config.get_account_root_names() == prev_names
+
+    assert set(rtrn.paths) == set(m.FILENAMES)
+    assert all(path.is_file() for path in rtrn.paths.values())
+    assert rtrn.counts == {
+        "main": 500 + 15 + 2,
+        "rx_def": 20,
+        "rx": 60,
+        "x": 30,
+        "extraction": 40,
+    }
+
+    entries, errors, options = loader.load_file(rtrn.paths["main"])
+    assert not errors
+    assert options["name_assets"] == "Biens"
+    assert options["name_income"] == "Ingresos"
+    # main ledger includes rx and x ledgers
+    assert len(entries) == 500 + 15 + 2 + 60 + 30
+
+    for k in ("rx", "x"):
+        txns = utils.get_unverified_txns(rtrn.paths[k])
+        assert len(txns) == rtrn.counts[k]
+    assert utils.get_verified_ledger_file_key(rtrn.paths["x"]) == "x"
+    assert utils.get_verified_ledger_file_key(rtrn.paths["rx"]) == "rx"
+    x_dates = [txn.date for txn in utils.get_unverified_txns(rtrn.paths["x"])]
+    assert min(x_dates) < scale.end <= max(x_dates)
+
+    # verify manifest records scale
+    manifest = m.read_manifest(synth_dir)
+    assert manifest.scale == scale
+    assert manifest.paths == rtrn.paths
+    assert manifest.counts == rtrn.counts
+
+    # verify deterministic for seed
+    contents = {k: path.read_text(encoding) for k, path in rtrn.paths.items()}
+    m.generate(synth_dir, scale)
+    for k, path in rtrn.paths.items():
+        assert path.read_text(encoding) == contents[k]
+
+    m.generate(synth_dir, m.Scale.from_dict({**scale.to_dict(), "seed": 4}))
+    assert rtrn.paths["main"].read_text(encoding) != contents["main"]
+
+
+def test_generate_add_rx_txns(synth_dir, scale):
+    rtrn = m.generate(synth_dir, scale)
+    paths = [str(rtrn.paths[k]) for k in ("rx_def", "rx", "main")]
+    utils.set_account_root_names(paths[-1])
+    admin = Admin(*paths)
+    assert len(admin.rx_defs) == 20
+    assert admin.add_txns(scale.end + datetime.timedelta(days=90)) > 0
@@ -13,7 +13,7 @@ import beancount
 import pytest
 from beancount.core import data
 
-from beanahead import config, errors
+from beanahead import config, errors, expired, rx_txns
 from beanahead import utils as m
 from beanahead.scripts import cli
 
@@ -529,6 +529,29 @@ def test_get_options(filepath_make_rx):
     assert m.get_options(filepath_make_rx)["title"] == expected
 
 
+def test_load_file_cache(filepath_rx_copy, encoding):
+    f = m.load_file
+    path = filepath_rx_copy
+    entries, _, options = f(path)
+    assert f(path)[2] is not options  # cache disabled
+    try:
+        m.enable_load_cache()
+        entries, _, options = f(path)
+        entries_, _, options_ = f(path)
+        assert entries_ == entries
+        assert entries_ is not entries
+        assert options_ is options  # served from cache
+
+        content = path.read_text(encoding)
+        path.write_text(content.replace("2022-10-05", "2022-10-06"), encoding)
+        entries_, _, options_ = f(path)
+        assert options_ is not options
+        assert entries_ != entries
+    finally:
+        m.enable_load_cache(False)  # noqa: FBT003
+    assert m._load_cache is None
+
+
 def test_set_account_root_names(filepath_make_rx_opts, account_root_names_dflt):
     m.set_account_root_names(filepath_make_rx_opts)
     changes = {
@@ -562,6 +585,23 @@ def test_get_verified_file_key(filepaths_make, filepath_no_file, filepath_ledger
         m.get_verified_ledger_file_key(filepaths_make["rx_def"])
 
 
+def test_scan_header(filepaths_make, filepath_ledger, res_dir):
+    """Also tests `get_header_file_key`."""
+    for k, path in filepaths_make.items():
+        assert m.scan_header(path) == {"title": m.FILE_CONFIG[k]["title"]}
+        assert m.get_header_file_key(path) == k
+
+    rtrn = m.scan_header(res_dir / "defs" / "rx_opts.beancount")
+    assert rtrn == {
+        "title": m.FILE_CONFIG["rx"]["title"],
+        "name_assets": "Biens",
+        "name_income": "Ingresos",
+    }
+
+    assert m.scan_header(filepath_ledger)["title"] == "Example Beancount file"
+    assert m.get_header_file_key(filepath_ledger) is None
+
+
 class TestEntriesTxns:
     def test_extract_entries(self, entries_ledger, txns_ledger):
         txns_rtrn = m.extract_txns(entries_ledger)
@@ -600,6 +640,28 @@ class TestEntriesTxns:
         monkeypatch.setattr(attr, cut_off_txn.date + datetime.timedelta(1))
         rtrn = m.get_expired_txns(txns_ledger)
         cmn.assert_txns_equal(rtrn, txns_ledger[: i + 1])
+        # verify order of txns is not assumed
+        rtrn = m.get_expired_txns(txns_ledger[::-1])
+        cmn.assert_txns_equal(rtrn, txns_ledger[i::-1])
+
+    def test_split_expired_txns(self, txns_ledger, monkeypatch):
+        attr = "beanahead.utils.TODAY"
+        i = 13
+        cut_off_txn = txns_ledger[i]
+        monkeypatch.setattr(attr, cut_off_txn.date + datetime.timedelta(1))
+        expired, unexpired = m.split_expired_txns(txns_ledger)
+        assert expired == txns_ledger[: i + 1]
+        assert unexpired == txns_ledger[i + 1 :]
+        assert all(m.is_expired(txn) for txn in expired)
+        assert not any(m.is_expired(txn) for txn in unexpired)
+        # verify tail elements are the loaded txns, not copies
+        assert all(a is b for a, b in zip(unexpired, txns_ledger[i + 1 :], strict=True))
+
+        monkeypatch.setattr(attr, txns_ledger[0].date)
+        assert m.split_expired_txns(txns_ledger) == ([], txns_ledger)
+        monkeypatch.setattr(attr, txns_ledger[-1].date + datetime.timedelta(1))
+        assert m.split_expired_txns(txns_ledger) == (txns_ledger, [])
+        assert m.split_expired_txns([]) == ([], [])
 
     def test_remove_txns(self, txns_ledger):
         indices = [4, 17, 21]
@@ -655,6 +717,38 @@ class TestEntriesTxns:
         ]
 
 
+def test_get_account_root_key(monkeypatch, settings_alt):
+    """Test `m.get_account_root_key` and invalidation of its cache."""
+    f = m.get_account_root_key
+    assert f("Assets:US:BofA:Checking") == "name_assets"
+    assert f("Liabilities:US:Chase:Slate") == "name_liabilities"
+    assert f("Income:US:BayBook:Salary") == "name_income"
+    assert f("Assets") is None
+    assert "Assets:US:BofA:Checking" in m._account_keys
+    assert m.is_balance_sheet_account("Assets:US:BofA:Checking")
+
+    # verify cache invalidated when account root names set
+    version = config.SETTINGS_VERSION
+    config.set_account_root_names({"name_assets": "Biens"})
+    assert version + 1 == config.SETTINGS_VERSION
+    assert f("Assets:US:BofA:Checking") is None
+    assert f("Biens:US:BofA:Checking") == "name_assets"
+    assert not m.is_balance_sheet_account("Assets:US:BofA:Checking")
+    assert m.is_assets_account("Biens:US:BofA:Checking")
+
+    # verify cache invalidated when settings reset
+    config.reset_settings()
+    assert version + 2 == config.SETTINGS_VERSION
+    assert f("Assets:US:BofA:Checking") == "name_assets"
+    assert f("Biens:US:BofA:Checking") is None
+
+    # verify cache invalidated if settings replaced directly
+    monkeypatch.setattr("beanahead.config.SETTINGS", settings_alt)
+    assert f("Assets:US:BofA:Checking") is None
+    assert f("Bienes:US:BofA:Checking") == "name_assets"
+    assert config.get_account_root_names()["name_assets"] == "Bienes"
+
+
 def test_get_content(filepath_ledger):
     contents = m.get_content(filepath_ledger)
     assert contents.startswith(
@@ -796,16 +890,49 @@ def test_compose_new_content(filepath_rx_content, txns_rx_content):
         f(file_key, txns_rx_content[23:])
 
 
-def test_write_and_overwrite(temp_dir, encoding, filepath_rx_content):
+def test_has_content_crlf(temp_dir, encoding, monkeypatch):
+    """Test content compared as written in text mode on a platform using CRLF."""
+    path = temp_dir / "_test_crlf.txt"
+    content = "Cóñtént\nline 2\n"
+    path.write_bytes(content.replace("\n", "\r\n").encode(encoding))
+    try:
+        monkeypatch.setattr(m.os, "linesep", "\n")
+        assert not m.has_content(path, content)
+        monkeypatch.setattr(m.os, "linesep", "\r\n")
+        assert m.encode_as_written(content) == path.read_bytes()
+        assert m.has_content(path, content)
+        assert not m.has_content(path, content + "\n")
+    finally:
+        path.unlink()
+
+
+def test_write_and_overwrite(temp_dir, encoding, filepath_rx_content, monkeypatch):
     """Tests `m.write` and `m.overwrite_file`."""
     path = temp_dir / "_test_write.txt"
     content = "Cóñtént"
-    m.write(path, content)
+    assert m.write(path, content)
     assert path.read_text(encoding) == content
 
-    m.overwrite_file(path, filepath_rx_content)
+    # verify does not write if content unchanged
+    mtime = path.stat().st_mtime_ns
+    os.utime(path, ns=(mtime - 10**9, mtime - 10**9))
+    assert not m.write(path, content)
+    assert path.stat().st_mtime_ns == mtime - 10**9
+    assert m.has_content(path, content)
+    assert not m.has_content(path, content[:-1] + "T")
+    assert not m.has_content(temp_dir / "not_a_file.txt", content)
+
+    assert m.overwrite_file(path, filepath_rx_content)
     assert path.read_text(encoding) == filepath_rx_content
 
+    # verify content not parsed if file would not change
+    def parse_string(*_, **__):
+        raise AssertionError
+
+    with monkeypatch.context() as mp:
+        mp.setattr(m.parser, "parse_string", parse_string)
+        assert not m.overwrite_file(path, filepath_rx_content)
+
     match = re.escape(
         "_test_write.txt has not been overwritten as content would parse with"
         " the following errors: [LexerError(source={'filename': '<string>',"
@@ -815,6 +942,49 @@ def test_write_and_overwrite(temp_dir, encoding, filepath_rx_content):
         m.overwrite_file(path, filepath_rx_content[55:])
 
 
+def test_iter_new_content(filepath_rx_content, txns_rx, txns_rx_content):
+    """Tests `m.iter_entries_content` and `m.iter_new_content`."""
+    for size in (1, 2, 3, len(txns_rx), len(txns_rx) + 1):
+        chunks = list(m.iter_entries_content(iter(txns_rx), size))
+        assert len(chunks) == -(-len(txns_rx) // size)
+        assert "".join(chunks) == txns_rx_content
+        content = "".join(m.iter_new_content("rx", iter(txns_rx), size))
+        assert content == filepath_rx_content
+    assert list(m.iter_entries_content([])) == []
+
+
+def test_overwrite_file_chunks(temp_dir, encoding, filepath_rx_content, txns_rx):
+    path = temp_dir / "_test_overwrite_chunks.beancount"
+    chunks = list(m.iter_new_content("rx", txns_rx, 2))
+    assert m.overwrite_file_chunks(path, iter(chunks), len(txns_rx))
+    assert path.read_text(encoding) == filepath_rx_content
+
+    # verify does not write if content unchanged and retains mode
+    path.chmod(0o640)
+    mtime = path.stat().st_mtime_ns
+    os.utime(path, ns=(mtime - 10**9, mtime - 10**9))
+    assert not m.overwrite_file_chunks(path, iter(chunks))
+    assert path.stat().st_mtime_ns == mtime - 10**9
+    assert m.overwrite_file_chunks(path, iter(chunks[:1] + chunks[2:]))
+    if os.name != "nt":
+        assert path.stat().st_mode & 0o777 == 0o640
+
+    # verify file not changed if content invalid
+    path.write_text(filepath_rx_content, encoding)
+    match = "has not been overwritten as content would parse with the following"
+    with pytest.raises(ValueError, match=match):
+        m.overwrite_file_chunks(path, iter([chunks[0][55:], *chunks[1:]]))
+    match = re.escape(
+        f"has not been overwritten as expected {len(txns_rx)} transactions"
+        f" to be loaded from content, but loaded {len(txns_rx) - 2}."
+    )
+    with pytest.raises(ValueError, match=match):
+        m.overwrite_file_chunks(path, iter(chunks[:1] + chunks[2:]), len(txns_rx))
+    assert path.read_text(encoding) == filepath_rx_content
+    # verify no temporary files left behind
+    assert not list(temp_dir.glob(f".{path.name}.*"))
+
+
 def test_create_ledger_content(filepath_rx_content, txns_rx):
     rtrn = m.create_ledger_content("rx", txns_rx)
     assert rtrn == filepath_rx_content
@@ -850,9 +1020,43 @@ def test_inject_txns(
 ):
     injection = str(filepath_rx)
     ledger = str(filepath_ledger_copy)
-    m.inject_txns(injection, ledger)
+    rtrn = m.inject_txns(injection, ledger)
     new_contents = filepath_ledger_copy.read_text(encoding)
     assert new_contents == filepath_ledger_content + "\n" + filepath_rx_content
+    n_bytes = len(("\n" + filepath_rx_content).encode(encoding))
+    assert rtrn == (n_bytes, 12)
+
+
+def test_inject_txns_multiple(
+    filepath_rx,
+    filepath_rx_content,
+    filepath_recon_extraction,
+    filepath_ledger_copy,
+    filepath_ledger_content,
+    encoding,
+    monkeypatch,
+    capsys,
+):
+    """Test `inject_txns` streaming multiple files in small chunks."""
+    monkeypatch.setattr("beanahead.utils.INJECT_CHUNK_SIZE", 7)
+    extraction_content = filepath_recon_extraction.read_text(encoding)
+    assert extraction_content.startswith(m.HEADER)
+
+    injections = [str(filepath_rx), str(filepath_recon_extraction)]
+    n_bytes, n_entries = m.inject_txns(injections, str(filepath_ledger_copy))
+
+    injected = (
+        "\n" + filepath_rx_content + "\n" + extraction_content.removeprefix(m.HEADER)
+    )
+    new_contents = filepath_ledger_copy.read_text(encoding)
+    assert new_contents == filepath_ledger_content + injected
+    assert n_bytes == len(injected.encode(encoding))
+    assert n_entries == len(m.REGEX_ENTRY_LINE.findall(injected))
+    expected = (
+        f"{n_entries} entries ({n_bytes} bytes) from 2 file(s) have been"
+        " injected to the ledger 'example_ledger'.\n"
+    )
+    assert capsys.readouterr().out == expected
 
 
 @pytest.mark.usefixtures("cwd_as_temp_dir")
@@ -893,3 +1097,49 @@ def test_add_remove_tags(rx_txn_chase, tag_rx):
     rtrn = m.add_tags(txn, ["new-tag", "new-tag2"])  # pass as list
     expected_tags.append("new-tag2")
     assert rtrn == txn._replace(tags=frozenset(expected_tags))
+
+
+def test_refresh_today(monkeypatch):
+    today = datetime.date(2022, 11, 15)
+    # register dependent attributes with monkeypatch to restore on teardown
+    monkeypatch.setattr("beanahead.utils.TODAY", today)
+    monkeypatch.setattr("beanahead.expired.TODAY", today)
+    monkeypatch.setattr("beanahead.expired.TOMORROW", today)
+    monkeypatch.setattr("beanahead.rx_txns.END_DFLT", today)
+    monkeypatch.setattr("beanahead.utils.get_today", lambda: today)
+
+    assert not m.refresh_today()
+    assert today + datetime.timedelta(1) != expired.TOMORROW
+
+    assert m.refresh_today(datetime.date(2023, 1, 31))
+    assert datetime.date(2023, 1, 31) == m.TODAY == expired.TODAY
+    assert datetime.date(2023, 2, 1) == expired.TOMORROW
+    assert datetime.date(2023, 5, 2) == rx_txns.END_DFLT
+
+    assert m.refresh_today()  # from clock
+    assert today == m.TODAY == expired.TODAY
+    assert datetime.date(2022, 11, 16) == expired.TOMORROW
+    assert datetime.date(2023, 2, 14) == rx_txns.END_DFLT
+
+
+def test_scripted_input(capsys):
+    with m.scripted_input(["a", "b"]):
+        assert m.get_input("first") == "a"
+        with (
+            m.scripted_input([]),
+            pytest.raises(errors.BeanaheadInputError, match="nested"),
+        ):
+            m.get_input("nested")
+        assert m.get_input("second") == "b"
+        with pytest.raises(errors.BeanaheadInputError, match="third"):
+            m.get_input("third")
+    assert capsys.readouterr().out == "first: a\nnested: second: b\nthird: "
+
+    def responder(text: str) -> str | None:
+        return "y" if text.endswith("y/n") else None
+
+    with m.scripted_input(responder):
+        assert m.get_input("ok? y/n") == "y"
+        with pytest.raises(errors.BeanaheadInputError, match="choose"):
+            m.get_input("choose")
+    assert capsys.readouterr().out == "ok? y/n: y\nchoose: "
@@ -0,0 +1,182 @@
+"""Tests for `watch` module."""
+
+import shutil
+from collections import abc
+from pathlib import Path
+
+import pytest
+
+from beanahead import errors
+from beanahead import watch as m
+from beanahead.scripts import cli
+
+from .conftest import set_cl_args
+
+
+@pytest.fixture
+def watch_dir(temp_dir) -> abc.Iterator[Path]:
+    path = temp_dir / "incoming"
+    path.mkdir()
+    yield path
+    shutil.rmtree(path)
+
+
+@pytest.fixture
+def ledgers(filepaths_recon_copy) -> abc.Iterator[list[str]]:
+    yield [str(filepaths_recon_copy[k]) for k in ("rx", "x")]
+
+
+@pytest.fixture
+def responses() -> abc.Iterator[list[str]]:
+    """Input responses to reconcile the recon extraction file."""
+    yield ["y"] * 14 + ["0", "2", "0"] + ["y"]
+
+
+@pytest.fixture
+def expected_output(recon_dir, encoding) -> abc.Iterator[str]:
+    yield (recon_dir / "expected_injection.beancount").read_text(encoding)
+
+
+def test_poll(watch_dir, ledgers, filepath_recon_extraction, encoding):
+    watcher = m.Watcher(watch_dir, ledgers, settle=5)
+    assert watcher.dest == watch_dir / "reconciled"
+    assert watcher.dest.is_dir()
+    assert watcher.poll(0) == []
+
+    path = Path(shutil.copy(filepath_recon_extraction, watch_dir))
+    (watch_dir / "notes.txt").write_text("not a beancount file", encoding)
+    assert watcher.poll(10) == []  # new file, not yet settled
+    assert watcher.poll(14) == []
+    assert watcher.poll(15) == [path]
+
+    # file changed, settle period restarts
+    path.write_text(path.read_text(encoding) + "\n", encoding)
+    assert watcher.poll(16) == []
+    assert watcher.poll(20) == []
+    assert watcher.poll(21) == [path]
+
+    # not ready if already output
+    shutil.copy(path, watcher.dest)
+    assert watcher.poll(30) == []
+
+
+def test_invalid_args(watch_dir, ledgers):
+    with pytest.raises(NotADirectoryError):
+        m.Watcher(watch_dir / "not_a_dir", ledgers)
+    with pytest.raises(ValueError, match="'dest' cannot be the watched directory"):
+        m.Watcher(watch_dir, ledgers, watch_dir)
+    with pytest.raises(ValueError, match="'nope' is not a valid match policy"):
+        m.Watcher(watch_dir, ledgers, matches="nope")
+
+
+@pytest.mark.parametrize("matches", ["fail", "accept", "skip"])
+def test_process_matches(
+    matches, watch_dir, ledgers, filepath_recon_extraction, encoding
+):
+    """Test potential matches decided without requesting input."""
+    contents = [Path(ledger).read_text(encoding) for ledger in ledgers]
+    watcher = m.Watcher(watch_dir, ledgers, matches=matches)
+    path = Path(shutil.copy(filepath_recon_extraction, watch_dir))
+    result = watcher.process(path)
+    after = [Path(ledger).read_text(encoding) for ledger in ledgers]
+    if matches == "fail":
+        assert isinstance(result.error, errors.BeanaheadInputError)
+        assert not result.output.exists()
+        assert after == contents
+        return
+
+    assert result.ok, result.error
+    # each potential match decided, 18 decisions required of which 3 offer
+    # multiple matches
+    n_matched = result.output.read_text(encoding).count("matches:")
+    if matches == "accept":
+        assert n_matched == 18
+        assert after != contents
+    else:
+        assert not n_matched
+        assert after == contents
+
+
+def test_run(
+    monkeypatch,
+    watch_dir,
+    ledgers,
+    filepath_recon_extraction,
+    mock_input,
+    responses,
+    expected_output,
+    encoding,
+    capsys,
+):
+    dest = watch_dir.parent / "watch_out"
+    watcher = m.Watcher(
+        watch_dir, ledgers, dest, interval=0, settle=0, matches="prompt"
+    )
+    path = Path(shutil.copy(filepath_recon_extraction, watch_dir))
+    invalid = Path(
+        shutil.copy(filepath_recon_extraction, watch_dir / "invalid.beancount")
+    )
+    reconcile_new_txns = m.reconcile.reconcile_new_txns
+
+    def mock_reconcile(new_entries: str, *args, **kwargs):
+        if new_entries == str(invalid):
+            raise ValueError("invalid extraction")
+        reconcile_new_txns(new_entries, *args, **kwargs)
+
+    monkeypatch.setattr("beanahead.reconcile.reconcile_new_txns", mock_reconcile)
+
+    mock_input(v for v in responses)
+    results = watcher.run(max_polls=3)
+    assert [result.path for result in results] == [path, invalid]
+    ok, failed = results
+    assert ok.ok
+    assert ok.output == dest / path.name
+    assert ok.output.read_text(encoding) == expected_output
+    assert not failed.ok
+
+    out = capsys.readouterr().out
+    assert f"{path.name} ({ok.seconds:.3f}s): ok" in out
+    expected = f"invalid.beancount ({failed.seconds:.3f}s): FAILED - ValueError("
+    assert expected in out
+
+    log = (dest / m.LOG_FILENAME).read_text(encoding).splitlines()
+    assert len(log) == 2
+    assert log[0].split("\t")[1:] == [path.name, f"{ok.seconds:.6f}", "ok"]
+    assert log[1].split("\t")[1] == "invalid.beancount"
+    assert log[1].split("\t")[3].startswith("FAILED - ")
+
+    # verify files not reconciled again
+    assert watcher.run(max_polls=2) == []
+    # verify new watcher skips file output by previous watcher, retries failed
+    watcher = m.Watcher(watch_dir, ledgers, dest, interval=0, settle=0)
+    assert [result.path for result in watcher.run(max_polls=2)] == [invalid]
+    shutil.rmtree(dest)
+
+
+def test_cli_watch(
+    monkeypatch,
+    watch_dir,
+    ledgers,
+    filepath_recon_extraction,
+    mock_input,
+    responses,
+    expected_output,
+    encoding,
+    capsys,
+):
+    def sleep(_: float):
+        sleep.calls += 1
+        if sleep.calls > 1:
+            raise KeyboardInterrupt
+
+    sleep.calls = 0
+    monkeypatch.setattr("beanahead.watch.time.sleep", sleep)
+    path = Path(shutil.copy(filepath_recon_extraction, watch_dir))
+    mock_input(v for v in responses)
+    set_cl_args(f"watch {watch_dir} {' '.join(ledgers)} -s 0 -m prompt")
+    cli.main()
+    output = watch_dir / "reconciled" / path.name
+    assert output.read_text(encoding) == expected_output
+    out = capsys.readouterr().out
+    assert out.startswith(f"Watching '{watch_dir}'.")
+    assert out.endswith("Stopped watching.\n")
@@ -0,0 +1,175 @@
+"""Tests for `workloads` module.
+
+Includes memory budgets for each workload at various scales. A test fails
+if the peak memory allocated by a workload exceeds its budget. Peak memory
+varies with the platform and versions of dependencies, such that budgets
+are set well above measured peaks to only catch gross regressions.
+"""
+
+import datetime
+import shutil
+from collections import abc
+from pathlib import Path
+
+import pytest
+
+from beanahead import expired, synthetic, utils
+from beanahead import workloads as m
+from beanahead.reconcile import MSG_MULT_MATCH, MSG_SINGLE_MATCH
+from beanahead.scripts import cli
+
+from .conftest import set_cl_args
+
+MIB = 1024 * 1024
+
+SCALES = {
+    "small": synthetic.Scale(
+        n_txns=500, n_defs=10, n_x_txns=25, n_new=50, n_accounts=20, n_payees=50
+    ),
+    "medium": synthetic.Scale(
+        n_txns=2_000, n_defs=40, n_x_txns=100, n_new=200, n_accounts=20, n_payees=200
+    ),
+}
+
+# budgets of peak memory, in bytes, by workload by scale
+MEMORY_BUDGETS = {
+    "addrx": {"small": 16 * MIB, "medium": 48 * MIB},
+    "recon": {"small": 2 * MIB, "medium": 6 * MIB},
+    "exp": {"small": 2 * MIB, "medium": 4 * MIB},
+    "inject": {"small": 1 * MIB, "medium": 1 * MIB},
+}
+
+
+@pytest.fixture
+def workload_dir(temp_dir) -> abc.Iterator[Path]:
+    path = temp_dir / "workload"
+    yield path
+    shutil.rmtree(path, ignore_errors=True)
+
+
+def test_respond():
+    assert m.respond(MSG_SINGLE_MATCH) == "y"
+    assert m.respond(f"{MSG_MULT_MATCH}[0-2]/n:") == "0"
+    assert m.respond("Anything else? y/n: ") == "n"
+
+
+def test_run(workload_dir, encoding, capsys):
+    generated = synthetic.generate(workload_dir, SCALES["small"])
+    paths = generated.paths
+    contents = {k: path.read_text(encoding) for k, path in paths.items()}
+    end = generated.scale.end
+    today = utils.TODAY
+    assert today != end
+
+    # verify administered as of scale's end date and today then restored
+    m.run("exp", generated)
+    assert today == utils.TODAY == expired.TODAY
+    assert capsys.readouterr().out == ""
+    assert paths["x"].read_text(encoding) != contents["x"]
+    x_dates = [txn.date for txn in utils.get_unverified_txns(paths["x"])]
+    assert min(x_dates) == end
+    assert max(x_dates) > end + datetime.timedelta(30)
+
+    m.run("inject", generated)
+    assert paths["main"].read_text(encoding).endswith(contents["extraction"])
+
+    with pytest.raises(ValueError, match="'nope' is not a valid workload"):
+        m.run("nope", generated)
+
+
+def test_measure(workload_dir):
+    scale = SCALES["small"]
+    rtrn = m.measure("recon", scale, workload_dir, memory=False, warmup=False)
+    assert rtrn.name == "recon"
+    assert rtrn.scale == scale
+    assert rtrn.seconds > 0
+    assert rtrn.peak_bytes == rtrn.retained_bytes == 0
+    assert rtrn.report["recon.match"]["entries"] == scale.n_new
+    assert (workload_dir / "reconciled.beancount").is_file()
+    assert not (workload_dir / m.WARMUP_DIRNAME).exists()
+
+
+@pytest.mark.parametrize("scale_name", SCALES)
+@pytest.mark.parametrize("name", m.WORKLOADS)
+def test_memory_budget(name, scale_name, workload_dir):
+    rtrn = m.measure(name, SCALES[scale_name], workload_dir)
+    assert rtrn.peak_bytes > 0
+    budget = MEMORY_BUDGETS[name][scale_name]
+    assert rtrn.peak_bytes <= budget, (
+        f"Peak memory of '{name}' workload at {scale_name} scale is"
+        f" {rtrn.peak_bytes / MIB:.2f} MiB, exceeding budget of"
+        f" {budget / MIB:.2f} MiB."
+    )
+
+
+def test_get_scale():
+    scale = m.get_scale(5_000, seed=3)
+    assert scale.n_txns == 5_000
+    assert scale.n_defs == scale.n_x_txns == 50
+    assert scale.n_new == 100
+    assert scale.seed == 3
+    assert m.get_scale(10).n_defs == 1
+
+
+def test_count_entries():
+    counts = {"main": 100, "rx_def": 2, "rx": 6, "x": 3, "extraction": 5}
+    assert m.count_entries("addrx", counts) == 111
+    assert m.count_entries("recon", counts) == 14
+    assert m.count_entries("exp", counts) == 9
+    assert m.count_entries("inject", counts) == 5
+
+
+def test_percentile():
+    values = [5.0, 1.0, 4.0, 2.0, 3.0]
+    assert m.percentile(values, 50) == 3.0
+    assert m.percentile(values, 90) == 5.0
+    assert m.percentile(values, 20) == 1.0
+    assert m.percentile(values, 1) == 1.0
+    assert m.percentile([2.0], 99) == 2.0
+
+
+def test_bench(workload_dir):
+    scale = m.get_scale(200)
+    rtrn = m.bench(["recon", "inject"], scale, workload_dir, repeat=2)
+    assert [result.name for result in rtrn] == ["recon", "inject"]
+    recon, inject = rtrn
+    assert (
+        recon.entries == scale.n_new + scale.n_defs * scale.rx_periods + scale.n_x_txns
+    )
+    assert inject.entries == scale.n_new
+    for result in rtrn:
+        assert len(result.seconds) == 2
+        assert result.peak_bytes > 0
+        assert result.throughput > 0
+        assert result.percentile(50) == min(result.seconds)
+        assert result.percentile(99) == max(result.seconds)
+
+    lines = m.format_bench_report(rtrn).split("\n")
+    assert lines[0].split() == [
+        "workload", "entries", "entries/s", "p50", "ms", "p90", "ms", "p99", "ms",
+        "peak", "MiB",
+    ]  # fmt: skip
+    assert lines[1].startswith("recon ")
+    assert lines[2].split()[1] == str(inject.entries)
+
+    rtrn = m.bench(["exp"], scale, workload_dir, repeat=1, memory=False)
+    assert rtrn[0].peak_bytes is None
+    assert m.format_bench_report(rtrn).split("\n")[1].endswith(" -")
+
+    with pytest.raises(ValueError, match="'repeat' must be a positive integer"):
+        m.bench(["exp"], scale, workload_dir, repeat=0)
+
+
+def test_cli_bench(workload_dir, capsys):
+    set_cl_args(f"bench -t 100 -r 2 -w exp inject --no-memory -d {workload_dir}")
+    cli.main()
+    out = capsys.readouterr().out
+    assert out.startswith(
+        "Benchmark of 2 workload(s) on synthetic ledgers of 100 transactions"
+        " (seed 0), 2 timed run(s) each."
+    )
+    lines = out.strip().split("\n")
+    assert lines[-3].startswith("workload ")
+    assert lines[-2].startswith("exp ")
+    assert lines[-1].startswith("inject ")
+    assert (workload_dir / synthetic.MANIFEST_FILENAME).is_file()